@@ -0,0 +1,106 @@
+"""
+Microbenchmarks of the per-sample hot paths of the GUI-independent core in utils/.
+
+Run from the repository root with:
+    pip install pytest pytest-benchmark
+    python -m pytest benchmarks --benchmark-autosave
+and compare against a saved baseline with --benchmark-compare (--benchmark-compare-fail=mean:20%
+fails the run on a regression).
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from utils.acquisitionWorker import parse_sample_line
+from utils.limitProfile import LimitProfile, logistic_with_offset, fit_limit_params
+from utils.runEvaluator import RunEvaluator
+from utils.anomalyDetector import AnomalyDetector
+from utils.runWriter import RunWriter
+from utils.voutCheck import capture_vout, get_resistor_values, describe_vout
+from utils.decimate import decimate_for_view
+
+BATCH = 50  # Samples per GUI tick at a high sample rate
+
+
+@pytest.fixture(scope="module")
+def lut():
+    # Synthetic LUT, so that the benchmarks don't depend on PLookUp.csv
+    lut_pressure = np.logspace(3, -5, 21)
+    return lut_pressure, logistic_with_offset(np.log10(lut_pressure), 9.5, 900, 1.2, -1.0)
+
+
+@pytest.fixture(scope="module")
+def limit_profile(lut):
+    return LimitProfile(*fit_limit_params(*lut, np.full(21, 0.2)))
+
+
+@pytest.fixture(scope="module")
+def batch(limit_profile):
+    rng = np.random.default_rng(0)
+    pressures = np.logspace(-4, -5, BATCH)
+    midline = (limit_profile.lower_limit(pressures) + limit_profile.upper_limit(pressures)) / 2
+    voltages = midline[:, None] + rng.normal(0, 0.01, (BATCH, 8))
+    return pressures, voltages
+
+
+def test_parse_sample_line(benchmark):
+    line = "2.851,2.853,2.849,2.850,2.852,2.848,2.851,2.850,2.5E-5"
+    assert benchmark(parse_sample_line, line) is not None
+
+
+def test_within_limits(benchmark, limit_profile, batch):
+    pressures, voltages = batch
+    assert benchmark(limit_profile.within_limits, pressures, voltages).shape == (BATCH, 8)
+
+
+def test_run_evaluator(benchmark, limit_profile, batch):
+    pressures, voltages = batch
+    evaluator = RunEvaluator(limit_profile)
+
+    def evaluate():
+        evaluator.reset()
+        return evaluator.evaluate(pressures, voltages, "Gauge Tube")
+
+    changed, captured = benchmark(evaluate)
+    assert len(changed) == 8 and len(captured) == 8
+
+
+def test_anomaly_detector(benchmark, lut, batch):
+    pressures, voltages = batch
+    detector = AnomalyDetector(*lut, np.full(21, 0.2))
+
+    def update():
+        detector.reset()
+        return detector.update(pressures, voltages)
+
+    assert benchmark(update) == []
+
+
+def test_capture_vout(benchmark, batch):
+    pressures, voltages = batch
+    assert benchmark(capture_vout, pressures, voltages[:, 0]) is not None
+
+
+def test_get_resistor_values(benchmark):
+    assert benchmark(get_resistor_values, 10.05) == (169, "10k")
+
+
+@pytest.mark.parametrize("mode", ["Gauge Tube", "Pressure Sensor Assembly"])
+def test_describe_vout(benchmark, mode):
+    assert benchmark(describe_vout, 10.02, mode)["text"]
+
+
+def test_run_writer_row(benchmark, tmp_path):
+    writer = RunWriter(str(tmp_path / "run.csv"), compression="none")
+    row = [950.0, 951.0, 949.5, 950.2, 950.8, 949.9, 950.1, 950.4, 2.5E-5, 12.345]
+    benchmark(writer.write_row, row)
+    writer.close()
+
+
+def test_decimate_for_view(benchmark):
+    rng = np.random.default_rng(0)
+    x = np.logspace(3, -5, 20000)
+    y = rng.normal(500, 50, 20000)
+    x_kept, _ = benchmark(decimate_for_view, x, y, (1e-5, 1e3), (0, 1000), 800)
+    assert len(x_kept) <= 1600
@@ -0,0 +1,87 @@
+import os
+import logging
+import customtkinter as ctk
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class DiagnosticsTab(ctk.CTkFrame):
+    def __init__(self, parent, root, refresh_ms=1000, snapshot_interval_s=60, snapshot_path=os.path.join("Logs", "diagnostics.jsonl")):
+        super().__init__(parent)
+
+        self.root = root
+        self.refresh_ms = refresh_ms
+        self.snapshot_every = max(1, int(snapshot_interval_s * 1000 / refresh_ms))
+        self.snapshot_path = snapshot_path
+        self.refresh_count = 0
+
+        # Configure grid layout for the entire tab
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # Create a frame to center all content
+        content_frame = ctk.CTkFrame(self)
+        content_frame.grid(row=0, column=0, padx=215, pady=20, sticky="nsew")
+        content_frame.grid_columnconfigure(0, weight=1)
+        content_frame.grid_rowconfigure(1, weight=1)
+
+        self.title_label = ctk.CTkLabel(content_frame, text="Acquisition Pipeline Metrics", font=("Helvetica", 16))
+        self.title_label.grid(row=0, column=0, padx=10, pady=10, sticky="n")
+
+        self.metrics_text = ctk.CTkTextbox(content_frame, font=("Courier", 13), wrap="none")
+        self.metrics_text.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
+
+        self.snapshot_button = ctk.CTkButton(content_frame, text="Write Snapshot", command=self.write_snapshot)
+        self.snapshot_button.grid(row=2, column=0, padx=10, pady=10, sticky="n")
+
+        self.root.after(self.refresh_ms, self.refresh)
+
+    def refresh(self):
+        """
+        Periodically redraw the metrics and write a snapshot to disk.
+        The metrics are only redrawn while the Diagnostics tab is shown.
+        """
+        registry.update_rates()
+        if self.root.notebook.get() == "Diagnostics":
+            self.show_metrics(registry.snapshot())
+
+        self.refresh_count += 1
+        if self.refresh_count % self.snapshot_every == 0:
+            self.write_snapshot()
+
+        # Schedule the next refresh
+        self.root.after(self.refresh_ms, self.refresh)
+
+    def show_metrics(self, snapshot):
+        """
+        Redraw the metrics textbox from a registry snapshot.
+        """
+        lines = ["Counters (total, per second)"]
+        for name, value in snapshot["counters"].items():
+            lines.append(f"  {name:<32}{value:>12}{snapshot['rates'].get(name, 0.0):>12.1f}")
+        lines.append("")
+        lines.append("Gauges")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"  {name:<32}{value:>12.3f}")
+        lines.append("")
+        lines.append(f"Latency [ms]{'count':>32}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+        for name, stats in snapshot["histograms"].items():
+            lines.append(
+                f"  {name:<32}{stats['count']:>10}{stats['mean'] * 1000:>10.2f}{stats['p50'] * 1000:>10.2f}"
+                f"{stats['p95'] * 1000:>10.2f}{stats['max'] * 1000:>10.2f}"
+            )
+
+        self.metrics_text.configure(state="normal")
+        self.metrics_text.delete("1.0", "end")
+        self.metrics_text.insert("1.0", "\n".join(lines))
+        self.metrics_text.configure(state="disabled")
+
+    def write_snapshot(self):
+        """
+        Write the current metrics to the snapshot file.
+        """
+        try:
+            registry.write_snapshot(self.snapshot_path)
+        except OSError as e:
+            logger.error("Error writing diagnostics snapshot: %s", e)
@@ -1,12 +1,34 @@
 import customtkinter as ctk
 from tkinter import messagebox
-import pandas as pd
 import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import threading
-from scipy.optimize import curve_fit
-# import logging
+import time
+import logging
+from collections import OrderedDict
+from utils.logReader import LogReader
+from utils.historySpill import HistorySpill
+from utils.limitProfile import LimitProfile, logistic_with_offset, load_lut, fit_limit_params, DEFAULT_PERCENTAGE_ADJUSTMENTS
+from utils.metrics import registry
+from utils.curveFitter import OnlineCurveFitter
+from utils.voutCheck import capture_vout, describe_vout
+from utils.runEvaluator import RunEvaluator
+from utils.anomalyDetector import AnomalyDetector
+from utils.sampleRing import RECEIVED_NS, SENSORS, PRESSURE
+from utils.decimate import decimate_for_view
+from utils.uiScheduler import ui
+
+logger = logging.getLogger(__name__)
+
+class TimedFigureCanvas(FigureCanvasTkAgg):
+    """
+    Tk canvas that records how long each full redraw takes.
+    """
+    def draw(self):
+        with registry.histogram("plot.canvas_draw_seconds").time():
+            super().draw()
 
 
 class SensorTab(ctk.CTkFrame):
@@ -16,9 +38,20 @@ class SensorTab(ctk.CTkFrame):
         self.file_manager = file_manager
         self.x_data = [[] for _ in range(8)]
         self.y_data = [[] for _ in range(8)]
+        self.history_spill = HistorySpill()  # Samples evicted from x_data/y_data, reloaded when zoomed into
+        self.history_reloads = [None] * 8  # Pending debounced reload per sensor
         self.pass_fail_labels = []
         self.data_plotted = False
 
+        # Historical runs overlaid on the sensor plots, keyed by filename -> visible
+        self.log_reader = LogReader()
+        self.overlay_runs = OrderedDict()
+        self.overlay_collections = [None] * 8
+
+        # Seconds from the serial read to the end of each GUI stage for the latest sample
+        self.stage_latency = {"ingest": 0.0, "plot": 0.0}
+        self.plotted_received_ns = None  # Receive time of the latest sample waiting to be drawn
+
         # Load LUT data
         # self.lut_pressure, self.lut_average, self.lut_values = self.load_lut_data("LUT of gauge tubes.csv")
         self.lut_pressure, self.lut_average, self.lut_values = self.load_lut_data("PLookUp.csv")
@@ -27,8 +60,26 @@ class SensorTab(ctk.CTkFrame):
         self.lower_params, self.upper_params = self.calculate_logistic_limits()
 
         # Precompute logistic curves for LUT pressures
-        self.lower_limits = [self.logistic_with_offset(np.log10(p), *self.lower_params) for p in self.lut_pressure]
-        self.upper_limits = [self.logistic_with_offset(np.log10(p), *self.upper_params) for p in self.lut_pressure]
+        self.lower_limits = [logistic_with_offset(np.log10(p), *self.lower_params) for p in self.lut_pressure]
+        self.upper_limits = [logistic_with_offset(np.log10(p), *self.upper_params) for p in self.lut_pressure]
+
+        # Active limit profile, used for the pass/fail masks cached alongside parsed runs
+        self.limit_profile = LimitProfile(self.lower_params, self.upper_params)
+        self.log_reader.limit_profile = self.limit_profile
+
+        # Latched verdicts and captured Vout of the live run
+        self.evaluator = RunEvaluator(self.limit_profile)
+
+        # Drift and channel faults that the binary limit check doesn't show until a limit is crossed
+        self.anomaly_detector = AnomalyDetector(self.lut_pressure, self.lut_average, DEFAULT_PERCENTAGE_ADJUSTMENTS)
+
+        # Background fits of each sensor's live data, starting from the middle of the limit band
+        self.curve_fitter = OnlineCurveFitter(
+            self.limit_profile, self.lut_pressure, (np.asarray(self.lower_params) + np.asarray(self.upper_params)) / 2
+        )
+        self.curve_fitter.start()
+        self.fit_version = None
+        self.predicted_fail = [False] * 8
 
         # Configure grid layout for the entire tab
         self.grid_columnconfigure(0, weight=1)
@@ -40,78 +91,155 @@ class SensorTab(ctk.CTkFrame):
         content_frame.grid_columnconfigure(0, weight=1)
         content_frame.grid_rowconfigure(0, weight=1)
 
-        # Create tabs for each sensor
-        self.tabview = ctk.CTkTabview(content_frame)
+        # Create tabs for each sensor, after an overview of all of them
+        self.tabview = ctk.CTkTabview(content_frame, command=self.redraw_visible)
         self.tabview.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
 
+        self.create_overview_tab()
         for i in range(8):
             self.create_sensor_tab(i)
 
     def load_lut_data(self, file_path):
         """
-        Load LUT data from a CSV file and calculate averages and percentage differences.
+        Load LUT data from a CSV file and calculate averages.
         """
         try:
-            df = pd.read_csv(file_path)
-            # df['Average'] = df[['Tube 1', 'Tube 2', 'Tube 3', 'Tube 4', 'Tube 5']].mean(axis=1)
-            df['Average'] = df[['PLookUp']].mean(axis=1)
-            df['Pressure'] = df['Pressure'] * 0.00133322  # Convert mTorr to mBar
-            # lut_values = df[['Tube 1', 'Tube 2', 'Tube 3', 'Tube 4', 'Tube 5']].values.tolist()
-            lut_values = df[['PLookUp']].values.tolist()
-
-            # # Calculate percentage differences
-            # percentage_differences = []
-            # for row in lut_values:
-            #     min_val = min(row)
-            #     max_val = max(row)
-            #     percentage_diff = ((max_val - min_val) / min_val)
-            #     percentage_differences.append(percentage_diff)
-
-            return df['Pressure'].tolist(), np.array(df['Average'].tolist()), lut_values#, percentage_differences
+            return load_lut(file_path)
         except Exception as e:
-            print(f"Error loading LUT data: {e}")
+            logger.error("Error loading LUT data: %s", e)
             return [], np.array([]), []
 
     def calculate_logistic_limits(self):
         """
         Fit logistic functions to the LUT data to calculate the upper and lower limit lines.
+        The tolerance band is DEFAULT_PERCENTAGE_ADJUSTMENTS; try other bands against past runs
+        with utils.yieldAnalysis before changing it.
         """
-        p_log = np.log10(self.lut_pressure)  # Use log10(pressure) for fitting
+        return fit_limit_params(self.lut_pressure, self.lut_average, DEFAULT_PERCENTAGE_ADJUSTMENTS)
 
-        # Define custom percentage adjustments
-        #                                   1    2    3     4      5      6     7      8     9     10    11    12    13    14    15
-        # percentage_adjustments = np.array([0.1, 0.1, 0.09, 0.09, 0.10, 0.100, 0.130, 0.13, 0.15, 0.18, 0.20, 0.30, 0.40, 0.60, 0.80])
-                                          # 1     2    3      4     5     6     7     8     9      10     11    12     13    14    15    16    17    18    19   20   21
-        percentage_adjustments = np.array([0.1, 0.13, 0.16, 0.18, 0.20, 0.20, 0.20, 0.20, 0.220, 0.240, 0.250, 0.350, 0.45, 0.50, 0.55, 0.60, 0.62, 0.65, 0.7, 0.8, 0.9])
-        # percentage_adjustments = np.array([0.1, 0.1, 0.14, 0.15, 0.17, 0.18, 0.18, 0.18, 0.190, 0.200, 0.250, 0.350, 0.45, 0.50, 0.55, 0.60, 0.62, 0.65, 0.7, 0.8, 0.9])
+    def create_overview_tab(self):
+        """
+        Create the overview tab: one figure with a 2x4 grid of axes showing all sensors.
 
+        The LUT and limit lines are static, so they are rendered once into a cached background
+        and each update only blits the 8 data series on top of it.
+        """
+        tab = self.tabview.add("Overview")
+
+        fig, axes = plt.subplots(2, 4, sharex=True, sharey=True)
+        fig.subplots_adjust(left=0.07, right=0.98, top=0.94, bottom=0.1, wspace=0.08, hspace=0.2)
+        self.overview_lines = []
+        self.overview_labels = []
+        for i, ax in enumerate(axes.flat):
+            ax.set_title(f"Sensor {i + 1}", fontsize=10)
+            ax.set_xscale("log")
+            ax.tick_params(labelsize=8)
+
+            # Static background
+            ax.plot(self.lut_pressure, self.lut_average, color="red", linestyle="-", linewidth=1)
+            ax.plot(self.lut_pressure, self.upper_limits, color="green", linewidth=1)
+            ax.plot(self.lut_pressure, self.lower_limits, color="green", linewidth=1)
+
+            # Dynamic series, drawn only when blitting
+            line, = ax.plot([], [], color="blue", marker="o", markersize=2, linestyle="", animated=True)
+            label = ax.text(0.05, 0.95, "", fontsize=10, transform=ax.transAxes, verticalalignment="top", animated=True)
+            self.overview_lines.append(line)
+            self.overview_labels.append(label)
+        for ax in axes[1]:
+            ax.set_xlabel("Pressure [mbar]", fontsize=9)
+        for ax in axes[:, 0]:
+            ax.set_ylabel("Voltage [mV]", fontsize=9)
+
+        # Fixed limits so that blitting doesn't have to autoscale; widened when data falls outside
+        limit_values = np.concatenate((self.lut_average, self.upper_limits, self.lower_limits))
+        self.overview_extent = [min(self.lut_pressure), max(self.lut_pressure), limit_values.min(), limit_values.max()]
+        self.apply_overview_extent(axes.flat[0])
+
+        canvas = TimedFigureCanvas(fig, master=tab)
+        canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        canvas.mpl_connect("draw_event", self.on_overview_draw)
 
+        self.overview_axes = axes.flat[0]  # Axes share x and y, so one sets the limits of all
+        self.overview_canvas = canvas
+        self.overview_background = None
 
-        # Ensure the array matches the number of pressure points
-        if len(percentage_adjustments) != len(self.lut_pressure):
-            raise ValueError("Percentage adjustments array must have the same length as the pressure array.")
+    def apply_overview_extent(self, ax):
+        xmin, xmax, ymin, ymax = self.overview_extent
+        ax.set_xlim(xmin / 2, xmax * 2)
+        margin = (ymax - ymin) * 0.05
+        ax.set_ylim(ymin - margin, ymax + margin)
 
-        # Calculate the adjusted limit curves
-        lower_v = self.lut_average * (1 - percentage_adjustments)
-        upper_v = self.lut_average * (1 + percentage_adjustments)
+    def extend_overview(self, pressures, voltages):
+        """
+        Widen the overview limits to include new points. Returns True if they changed.
+        """
+        pressures = np.asarray(pressures)
+        voltages = np.asarray(voltages)
+        if not len(pressures):
+            return False
+        extent = [
+            min(self.overview_extent[0], pressures.min()), max(self.overview_extent[1], pressures.max()),
+            min(self.overview_extent[2], np.nanmin(voltages)), max(self.overview_extent[3], np.nanmax(voltages))
+        ]
+        if extent == self.overview_extent:
+            return False
+        self.overview_extent = extent
+        self.apply_overview_extent(self.overview_axes)
+        self.overview_background = None
+        return True
+
+    def on_overview_draw(self, event):
+        """
+        Cache the static background after each full redraw (first show, resize, new limits).
+        """
+        canvas = self.overview_canvas
+        self.overview_background = canvas.copy_from_bbox(canvas.figure.bbox)
+        self.draw_overview_series()
+
+    def draw_overview_series(self):
+        for i, (line, label) in enumerate(zip(self.overview_lines, self.overview_labels)):
+            line.set_data(self.x_data[i], self.y_data[i])
+            if self.predicted_fail[i] and self.pass_fail_labels[i].get_text() != "Fail":
+                ui.apply(label, text="Predicted Fail", color="orange")
+            else:
+                ui.apply(label, text=self.pass_fail_labels[i].get_text(), color=self.pass_fail_labels[i].get_color())
+            line.axes.draw_artist(line)
+            label.axes.draw_artist(label)
 
-        # Lower limit fit
-        lower_params, _ = curve_fit(
-            self.logistic_with_offset,
-            p_log,
-            lower_v,
-            p0=[min(lower_v), max(lower_v) - min(lower_v), 1, np.median(p_log)]
-        )
+    def update_overview(self):
+        """
+        Redraw the overview's data series on top of the cached static background.
+        """
+        canvas = self.overview_canvas
+        if self.overview_background is None:
+            canvas.draw_idle()  # Renders the background, then the series in on_overview_draw
+            return
+        with registry.histogram("plot.overview_blit_seconds").time():
+            canvas.restore_region(self.overview_background)
+            self.draw_overview_series()
+            canvas.blit(canvas.figure.bbox)
+
+    def redraw_visible(self):
+        """
+        Request a redraw of the tab the operator is looking at. Requests are coalesced into one
+        draw per frame, after the frame's label changes have been applied.
+        """
+        ui.request((id(self), "redraw"), self.draw_visible)
 
-        # Upper limit fit
-        upper_params, _ = curve_fit(
-            self.logistic_with_offset,
-            p_log,
-            upper_v,
-            p0=[min(upper_v), max(upper_v) - min(upper_v), 1, np.median(p_log)]
-        )
+    def draw_visible(self):
+        """
+        Redraw only the tab the operator is looking at; hidden canvases are redrawn when shown.
+        """
+        if self.plotted_received_ns is not None:
+            self.stage_latency["plot"] = (time.perf_counter_ns() - self.plotted_received_ns) / 1e9
+            registry.histogram("latency.plot_seconds").observe(self.stage_latency["plot"])
+            self.plotted_received_ns = None
 
-        return lower_params, upper_params
+        current = self.tabview.get()
+        if current == "Overview":
+            self.update_overview()
+        elif current:
+            self.tabview.tab(current).canvas.draw_idle()
 
     def create_sensor_tab(self, sensor_index):
         """
@@ -143,9 +271,11 @@ class SensorTab(ctk.CTkFrame):
         # Plot sensor data (dynamic)
         line_sensor, = ax.plot([], [], label=f"Sensor {sensor_index + 1} Data", color="blue", marker="o", linestyle="")
         ax.legend()
+        line_projection, prediction_label = self.add_projection_artists(ax)
+        line_history = self.add_history_artist(sensor_index, ax)
 
         # Embed the Matplotlib figure in the tab
-        canvas = FigureCanvasTkAgg(fig, master=tab)
+        canvas = TimedFigureCanvas(fig, master=tab)
         canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
         # Add Matplotlib toolbar
@@ -160,17 +290,115 @@ class SensorTab(ctk.CTkFrame):
         self.tabview.tab(f"Sensor {sensor_index + 1}").canvas = canvas
         self.tabview.tab(f"Sensor {sensor_index + 1}").line_sensor = line_sensor
         self.tabview.tab(f"Sensor {sensor_index + 1}").ax = ax
+        self.tabview.tab(f"Sensor {sensor_index + 1}").line_projection = line_projection
+        self.tabview.tab(f"Sensor {sensor_index + 1}").prediction_label = prediction_label
+        self.tabview.tab(f"Sensor {sensor_index + 1}").line_history = line_history
+
+    def add_projection_artists(self, ax):
+        """
+        Add the projected response curve and the predicted verdict to a sensor plot.
+        """
+        line_projection, = ax.plot([], [], label="_nolegend_", color="orange", linestyle="--", linewidth=1.5)
+        prediction_label = ax.text(
+            0.95, 0.95, "", color="orange", fontsize=10, transform=ax.transAxes,
+            verticalalignment="top", horizontalalignment="right"
+        )
+        return line_projection, prediction_label
+
+    def add_history_artist(self, sensor_index, ax):
+        """
+        Add the line showing evicted samples reloaded from the run log, and reload them when the
+        operator zooms or pans (ax.clear() drops the callbacks, so this is redone after it).
+        """
+        line_history, = ax.plot([], [], label="_nolegend_", color="blue", marker="o", markersize=3, linestyle="", alpha=0.6)
+        ax.callbacks.connect("xlim_changed", lambda ax: self.schedule_history_reload(sensor_index))
+        ax.callbacks.connect("ylim_changed", lambda ax: self.schedule_history_reload(sensor_index))
+        return line_history
+
+    def trim_live_history(self):
+        """
+        Keep the live history within the retention window (by sample count and/or pressure range).
+        Older samples are spilled to a temporary file and reloaded from there when zoomed into.
+        """
+        retention_samples = self.file_manager.live_retention_samples
+        retention_decades = self.file_manager.live_retention_decades
+        pressures = self.x_data[0]  # All sensors share the pressure column
+        evict = 0
+        if retention_samples and len(pressures) > retention_samples * 1.25:  # Trim in chunks, not every batch
+            evict = len(pressures) - retention_samples
+        if retention_decades and len(pressures) > evict:
+            p_log = np.log10(np.asarray(pressures[evict:]))
+            within = np.flatnonzero(np.abs(p_log - p_log[-1]) <= retention_decades)
+            evict += int(within[0]) if len(within) else 0
+        if not evict:
+            return
+
+        self.history_spill.append(pressures[:evict], np.column_stack([self.y_data[i][:evict] for i in range(8)]))
+        for i in range(8):
+            del self.x_data[i][:evict]
+            del self.y_data[i][:evict]
+        registry.counter("plot.samples_evicted").inc(evict)
+
+    def schedule_history_reload(self, sensor_index, delay_ms=300):
+        """
+        Reload evicted samples for the new view once zooming/panning has paused.
+        """
+        if not len(self.history_spill):
+            return
+        if self.history_reloads[sensor_index] is not None:
+            self.after_cancel(self.history_reloads[sensor_index])
+        self.history_reloads[sensor_index] = self.after(delay_ms, lambda: self.reload_history(sensor_index))
+
+    def reload_history(self, sensor_index):
+        """
+        Load the evicted samples in the current view from the spill file, at screen resolution.
+        """
+        self.history_reloads[sensor_index] = None
+        tab = self.tabview.tab(f"Sensor {sensor_index + 1}")
+        ax = tab.ax
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        evicted_range = self.history_spill.pressure_range()
+        if evicted_range is None or max(xlim) < evicted_range[0] or min(xlim) > evicted_range[1]:
+            if len(tab.line_history.get_xdata()):
+                tab.line_history.set_data([], [])
+                tab.canvas.draw_idle()
+            return
+
+        width_px = ax.bbox.width
+
+        def load_task():
+            try:
+                with registry.histogram("plot.history_reload_seconds").time():
+                    pressure, voltages = self.history_spill.read(xlim)
+                    voltage = voltages[:, sensor_index]
+                    valid = ~np.isnan(voltage)
+                    x, y = decimate_for_view(pressure[valid], voltage[valid], xlim, ylim, width_px)
+                self.after(0, lambda: self.show_history(sensor_index, x, y))
+            except Exception as e:
+                logger.error("Error reloading history of sensor %d: %s", sensor_index + 1, e)
+
+        threading.Thread(target=load_task, daemon=True).start()
+
+    def show_history(self, sensor_index, x, y):
+        tab = self.tabview.tab(f"Sensor {sensor_index + 1}")
+        tab.line_history.set_data(x, y)
+        tab.canvas.draw_idle()
 
     def clear_all_plots(self):
         """
         Clear all points from the plots and reset the pass/fail labels.
         """
+        self.history_spill.reset()
         for i in range(8):
             self.x_data[i] = []
             self.y_data[i] = []
-            self.pass_fail_labels[i].set_text("")
+            ui.apply(self.pass_fail_labels[i], text="")  # Drawn right below
             self.tabview.tab(f"Sensor {i + 1}").line_sensor.set_data([], [])
+            self.tabview.tab(f"Sensor {i + 1}").line_history.set_data([], [])
             self.tabview.tab(f"Sensor {i + 1}").canvas.draw()
+        self.curve_fitter.reset()
+        self.apply_fit_results()
+        self.update_overview()
 
     def plot_from_file(self, filename):
         """
@@ -179,34 +407,18 @@ class SensorTab(ctk.CTkFrame):
         def plot_task():
             try:
                 # Load and process data in the background thread
-                df = pd.read_csv(filename)
-
-                # Extract pressure and sensor voltages
-                pressure_data = df.iloc[:, -1].tolist()  # Pressure is the last column
-                sensor_data = df.iloc[:, :-1]  # Sensor voltages are the first 8 columns
+                run = self.log_reader.read_run(filename)
 
                 processed_data = []
                 for i in range(8):  # Loop through each sensor
-                    x_data = []
-                    y_data = []
-                    pass_x = []
-                    pass_y = []
-                    fail_x = []
-                    fail_y = []
-
-                    for p, v in zip(pressure_data, sensor_data.iloc[:, i].tolist()):
-                        if p == 0 or v is None or np.isnan(v):
-                            continue  # skip invalid rows, just like serial
-                        x_data.append(p)
-                        y_data.append(v)
-                        if self.check_point_within_limits(p, v):
-                            pass_x.append(p)
-                            pass_y.append(v)
-                        else:
-                            fail_x.append(p)
-                            fail_y.append(v)
-
-                    processed_data.append((x_data, y_data, pass_x, pass_y, fail_x, fail_y))
+                    x_data, y_data = run.sensor_points(i)
+                    passed = run.sensor_pass_mask(i, self.limit_profile)
+
+                    processed_data.append((
+                        x_data.tolist(), y_data.tolist(),
+                        x_data[passed].tolist(), y_data[passed].tolist(),
+                        x_data[~passed].tolist(), y_data[~passed].tolist()
+                    ))
 
                 # Schedule GUI updates in the main thread
                 self.after(0, lambda: self.update_plots(processed_data, filename))
@@ -243,269 +455,260 @@ class SensorTab(ctk.CTkFrame):
             # Plot fail points only if there are any
             if fail_x:
                 ax.scatter(fail_x, fail_y, label=f"Sensor {i + 1} Failure", color="purple", marker="o")
-                self.pass_fail_labels[i].set_text("Fail")
-                self.pass_fail_labels[i].set_color("red")
+                verdict, color = "Fail", "red"
             else:
-                self.pass_fail_labels[i].set_text("Pass")
-                self.pass_fail_labels[i].set_color("green")
+                verdict, color = "Pass", "green"
+            ui.set(self.pass_fail_labels[i], text=verdict, color=color)
 
             # Add pass/fail text back to the plot
-            ax.text(
-                0.05, 0.95, self.pass_fail_labels[i].get_text(),
-                color=self.pass_fail_labels[i].get_color(),
-                fontsize=12, transform=ax.transAxes, verticalalignment="top"
-            )
-
-            # Check the selected mode
-            
-            
-            # Check if pressure is <= 2.5E-5 mbar and capture Vout
-            for pressure, voltage in zip(x_data, y_data):
-                if pressure <= 2.5E-5:
-                    mode = self.file_manager.mode_var.get()  # Get the selected mode
-                    if mode == "Gauge Tube":
-                        if not hasattr(self, f"captured_voltage_{i}"):  # Capture voltage once
-                            captured_voltage = voltage
-                            setattr(self, f"captured_voltage_{i}", captured_voltage)
-
-                            # Get resistor values
-                            resistor_values = self.get_resistor_values(captured_voltage)
-                            if resistor_values:
-                                r9, r10 = resistor_values
-                                print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} mV, R9 = {r9} ohm, R10 = {r10}")
-                                ax.text(
-                                    0.05, 0.05, f"Vout = {captured_voltage:.2f} mV\nR9 = {r9} Ω\nR10 = {r10}",
-                                    color="blue", fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                                )
-                            else:
-                                print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} mV is out of range!")
-                                ax.text(
-                                    0.05, 0.05, f"Vout = {captured_voltage:.4f} mV\nOut of Range!",
-                                    color="red", fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                                )
-                    elif mode == "Pressure Sensor Assembly":
-                    # Print Vout on the plot
-                        if not hasattr(self, f"captured_voltage_{i}"):  # Capture voltage once
-                            captured_voltage = (voltage/1000)*300
-                            setattr(self, f"captured_voltage_{i}", captured_voltage)
-                            print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} V")
-                            # Determine pass/fail based on Vout range
-                            if 2.97 <= round(captured_voltage,2) <= 3.03:
-                                status_text = "Pass"
-                                status_color = "green"
-                            else:
-                                status_text = "Fail"
-                                status_color = "red"
-
-                            print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} V ({status_text})")
-                            ax.text(
-                                0.05, 0.05, f"Vout = {captured_voltage:.4f} V\n{status_text}",
-                                color=status_color, fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                            )
+            ax.text(0.05, 0.95, verdict, color=color, fontsize=12, transform=ax.transAxes, verticalalignment="top")
+
+            # Capture Vout from the first point at or below VOUT_CAPTURE_PRESSURE
+            vout = capture_vout(x_data, y_data)
+            if vout is not None:
+                self.add_vout_annotation(i, describe_vout(vout, self.file_manager.mode_var.get()))
 
             # Set plot labels and legend
             ax.set_title(f"Sensor {i + 1}: Voltage vs Pressure", fontsize=14)
             ax.set_xlabel("Gauge Pressure [mbar]", fontsize=12)
             ax.set_ylabel("Sensor Voltage [mV]", fontsize=12)
             ax.set_xscale("log")
+
+            # ax.clear() removed any overlaid runs and the live projection, so add them back
+            self.overlay_collections[i] = None
+            tab = self.tabview.tab(f"Sensor {i + 1}")
+            ui.forget(tab.prediction_label)
+            tab.line_projection, tab.prediction_label = self.add_projection_artists(ax)
+            tab.line_history = self.add_history_artist(i, ax)
+            self.render_overlay(i)
             ax.legend()
 
             # Redraw the canvas
             self.tabview.tab(f"Sensor {i + 1}").canvas.draw()
 
+        # Show the whole run on the overview
+        self.extend_overview(
+            np.concatenate([data[0] for data in processed_data]), np.concatenate([data[1] for data in processed_data])
+        )
+        self.update_overview()
+
         # Show confirmation popup
         messagebox.showinfo("Plot Data", f"Data from {filename} has been plotted!")
 
 
-    def process_serial_data(self, raw_data, logging_var, file_manager):
+    def add_overlay_runs(self, filenames):
         """
-        Process raw data received from the serial port and dynamically update the plots.
+        Load historical runs in the background and overlay them on every sensor plot.
         """
-        try:
-            # Debug: Print the raw data received
-            print(f"Raw data received: {raw_data}")
+        def load_task():
+            try:
+                # Parse (or fetch from cache) each run before touching the GUI
+                for filename in filenames:
+                    self.log_reader.read_run(filename)
+                self.after(0, lambda: self.show_overlay_runs(filenames))
+            except Exception as e:
+                self.after(0, lambda: messagebox.showerror("Error", f"Failed to load overlay runs: {e}"))
 
-            # Parse the data
-            data_parts = raw_data.split(",")
-            if len(data_parts) != 9:
-                print("Error: Invalid data format received.")  # Debugging statement
-                return  # Ignore invalid data
+        threading.Thread(target=load_task, daemon=True).start()
 
-            # Validate and convert sensor voltages and pressure
-            try:
-                sensor_voltages = [(float(value) / 300) * 1000 for value in data_parts[:8]]  # Convert volts to millivolts
-                pressure = float(data_parts[8])  # Pressure remains unchanged
-            except ValueError as e:
-                print(f"Error: Could not convert data to float: {e}")  # Debugging statement
-                return  # Ignore invalid data
-
-            # Ignore zero pressure values
-            if pressure == 0:
-                print("Warning: Pressure value is zero. Ignoring this data point.")
-                return
-
-            # Evaluate and plot each sensor's data point
-            for i in range(8):
-                voltage = sensor_voltages[i]
-                ax = self.tabview.tab(f"Sensor {i + 1}").ax
-                line_sensor = self.tabview.tab(f"Sensor {i + 1}").line_sensor
-
-                # Update the data for the line plot
-                self.x_data[i].append(pressure)
-                self.y_data[i].append(voltage)
-                line_sensor.set_data(self.x_data[i], self.y_data[i])
-
-                # Check if the point passes or fails
-                if self.check_point_within_limits(pressure, voltage):
-                    # Update pass/fail labels and legend only if the state changes
-                    if not hasattr(self, f"state_{i}") or getattr(self, f"state_{i}") != "Fail":
-                        # Only update to "Pass" if the state is not already "Fail"
-                        self.pass_fail_labels[i].set_text("Pass")
-                        self.pass_fail_labels[i].set_color("green")
-                        setattr(self, f"state_{i}", "Pass")
-                        # Update the legend
-                        legend = ax.get_legend()
-                        if legend:
-                            legend_texts = [t.get_text() for t in legend.get_texts()]
-                            legend_texts = [t for t in legend_texts if f"Sensor {i + 1}" not in t]
-                            legend_texts.append(f"Sensor {i + 1} Pass")
-                            ax.legend(legend_texts)
-                else:
-                    # Update to "Fail" and ensure it remains
-                    self.pass_fail_labels[i].set_text("Fail")
-                    self.pass_fail_labels[i].set_color("red")
-                    setattr(self, f"state_{i}", "Fail")
-                    # Update the legend
-                    legend = ax.get_legend()
-                    if legend:
-                        legend_texts = [t.get_text() for t in legend.get_texts()]
-                        legend_texts = [t for t in legend_texts if f"Sensor {i + 1}" not in t]
-                        legend_texts.append(f"Sensor {i + 1} Fail")
-                        ax.legend(legend_texts)
-
-                   
-                # Check if pressure is <= 2.5E-5 mbar and capture Vout
-                if 0 < pressure <= 2.5E-5:  # Ensure pressure is greater than 0
-                     # Check the selected mode
-                    mode = self.file_manager.mode_var.get()  # Get the selected mode
-                    if mode == "Gauge Tube": 
-                        if not hasattr(self, f"captured_voltage_{i}"):  # Capture voltage once
-                            captured_voltage = voltage
-                            setattr(self, f"captured_voltage_{i}", captured_voltage)
-
-                            # Get resistor values
-                            resistor_values = self.get_resistor_values(captured_voltage)
-                            if resistor_values:
-                                r9, r10 = resistor_values
-                                print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} mV, R9 = {r9} ohm, R10 = {r10}")
-                                ax.text(
-                                    0.05, 0.05, f"Vout = {captured_voltage:.2f} mV\nR9 = {r9} Ω\nR10 = {r10}",
-                                    color="blue", fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                                )
-                            else:
-                                print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} mV is out of range!")
-                                ax.text(
-                                    0.05, 0.05, f"Vout = {captured_voltage:.2f} mV\nOut of Range!",
-                                    color="red", fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                                )
-                    elif mode == "Pressure Sensor Assembly":
-                    # Print Vout on the plot
-                        if not hasattr(self, f"captured_voltage_{i}"):  # Capture voltage once
-                            captured_voltage = (voltage/1000)*300
-                            setattr(self, f"captured_voltage_{i}", captured_voltage)
-                            print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} V")
-                            # Determine pass/fail based on Vout range
-                            if 2.97 <= round(captured_voltage,2) <= 3.03:
-                                status_text = "Pass"
-                                status_color = "green"
-                            else:
-                                status_text = "Fail"
-                                status_color = "red"
-
-                            print(f"Sensor {i + 1}: Vout = {captured_voltage:.2f} V ({status_text})")
-                            ax.text(
-                                0.05, 0.05, f"Vout = {captured_voltage:.4f} V\n{status_text}",
-                                color=status_color, fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
-                            )
-
-                # Redraw only the updated canvas
-                self.tabview.tab(f"Sensor {i + 1}").canvas.draw_idle()
-
-            # Save the data to a CSV file if logging is enabled
-            if logging_var.get():
-                data_row = sensor_voltages + [pressure]
-                file_manager.save_to_csv(file_manager.filename_var.get(), data_row, logging_var.get())
+    def show_overlay_runs(self, filenames):
+        """
+        Mark the given runs as visible overlays and re-render all plots.
+        """
+        for filename in filenames:
+            self.overlay_runs[filename] = True
+        self.render_all_overlays()
 
-        except Exception as e:
-            print(f"Error processing serial data: {e}")
+    def set_overlay_visible(self, filename, visible):
+        """
+        Toggle a loaded overlay run on or off.
+        """
+        if filename in self.overlay_runs:
+            self.overlay_runs[filename] = visible
+            self.render_all_overlays()
 
-    def check_point_within_limits(self, pressure, voltage):
+    def clear_overlays(self):
         """
-        Check if a given point (pressure, voltage) falls within the logistic limit lines.
+        Remove all overlaid runs from the plots.
+        """
+        self.overlay_runs.clear()
+        self.render_all_overlays()
+
+    def render_all_overlays(self):
+        """
+        Re-render the overlay collection on every sensor plot and redraw the canvases.
+        """
+        for i in range(8):
+            self.render_overlay(i)
+            self.tabview.tab(f"Sensor {i + 1}").canvas.draw_idle()
+
+    def render_overlay(self, sensor_index):
+        """
+        Draw all visible overlay runs for one sensor as a single LineCollection.
+        Parsed runs come from the LogReader cache, so toggling does not re-read disk.
+        """
+        ax = self.tabview.tab(f"Sensor {sensor_index + 1}").ax
+
+        segments = []
+        for filename, visible in self.overlay_runs.items():
+            if not visible:
+                continue
+            try:
+                run = self.log_reader.read_run(filename)
+            except OSError as e:
+                logger.error("Error reading overlay run %s: %s", filename, e)
+                continue
+            pressure, voltage = run.sensor_points(sensor_index)
+            if len(pressure):
+                segments.append(np.column_stack((pressure, voltage)))
+
+        collection = self.overlay_collections[sensor_index]
+        if collection is None:
+            collection = LineCollection([], cmap="tab20", linewidths=1.0, alpha=0.6, label="Overlay Runs", zorder=1)
+            ax.add_collection(collection, autolim=False)
+            self.overlay_collections[sensor_index] = collection
+
+        collection.set_segments(segments)
+        collection.set_array(np.arange(len(segments), dtype=float))
+        collection.set_visible(bool(segments))
+        collection.set_label("Overlay Runs" if segments else "_nolegend_")
+
+        # Recompute the data limits from the plotted lines so that they shrink again when large
+        # overlays are hidden, then include the visible overlay extents when autoscaling
+        ax.relim()
+        if segments:
+            ax.update_datalim(np.concatenate(segments))
+        ax.autoscale_view()
+
+    def process_samples(self, samples):
+        """
+        Add a batch of samples from the acquisition process to the plots and update the pass/fail evaluation.
 
         Parameters:
-            pressure (float): The pressure value to test.
-            voltage (float): The voltage value to test.
+            samples (array): Rows laid out as utils.sampleRing.SAMPLE_FIELDS, shape (n, 11).
 
-        Returns:
-            bool: True if the point is within the limits, False otherwise.
+        Parsing and logging happen in the acquisition process; the time from the serial read
+        until the batch reached the GUI and until it was plotted is kept in stage_latency.
         """
-        # Handle zero pressure by using the previous valid pressure
-        if pressure == 0:
-            if hasattr(self, 'last_valid_pressure'):
-                pressure = self.last_valid_pressure
-            else:
-                print("Error: No valid previous pressure value available.")
-                return False  # Cannot check limits without a valid pressure
+        try:
+            received_ns = samples[:, RECEIVED_NS]
+            pressures = samples[:, PRESSURE]
+            sensor_voltages = samples[:, SENSORS]
+
+            ingest_latency = (time.perf_counter_ns() - received_ns) / 1e9
+            self.stage_latency["ingest"] = float(ingest_latency[-1])
+            registry.histogram("latency.ingest_seconds").observe_many(ingest_latency)
+
+            # Append the batch to the live history, evicting the oldest samples beyond the retention window
+            for i in range(8):
+                self.x_data[i].extend(pressures.tolist())
+                self.y_data[i].extend(sensor_voltages[:, i].tolist())
+            self.trim_live_history()
 
-        # Store the current pressure as the last valid pressure
-        self.last_valid_pressure = pressure
+            # Fitting happens on the fitter thread
+            self.curve_fitter.add_samples(pressures, sensor_voltages)
 
-        # Calculate the logistic limits
-        p_log = np.log10(pressure)
-        lower_limit = self.logistic_with_offset(p_log, *self.lower_params)
-        upper_limit = self.logistic_with_offset(p_log, *self.upper_params)
+            # Evaluate every point of the batch at once
+            changed, captured = self.evaluator.evaluate(pressures, sensor_voltages, self.file_manager.mode_var.get())
+            self.anomaly_detector.update(pressures, sensor_voltages)
 
-        # Check if the voltage is within the limits
-        return lower_limit <= voltage <= upper_limit
+            # Update the data for the line plots
+            for i in range(8):
+                self.tabview.tab(f"Sensor {i + 1}").line_sensor.set_data(self.x_data[i], self.y_data[i])
+
+            # Update pass/fail labels and legend only if the state changes
+            for i in changed:
+                state = self.evaluator.verdicts[i]
+                ui.set(self.pass_fail_labels[i], text=state, color="green" if state == "Pass" else "red")
+                ax = self.tabview.tab(f"Sensor {i + 1}").ax
+                legend = ax.get_legend()
+                if legend:
+                    legend_texts = [t.get_text() for t in legend.get_texts()]
+                    legend_texts = [t for t in legend_texts if f"Sensor {i + 1}" not in t]
+                    legend_texts.append(f"Sensor {i + 1} {state}")
+                    ax.legend(legend_texts)
+
+            # Print Vout on the plot once it has been captured
+            for i in captured:
+                self.add_vout_annotation(i, self.evaluator.vout[i])
+
+            # Redraw only the visible canvas, once the frame's label changes are applied
+            self.apply_fit_results()
+            self.extend_overview(pressures, sensor_voltages)
+            self.plotted_received_ns = int(received_ns[-1])
+            self.redraw_visible()
 
-    def logistic_with_offset(self, x, C, L, k, x0):
+        except Exception as e:
+            logger.error("Error processing samples: %s", e)
+
+    def apply_fit_results(self):
         """
-        Logistic function with an offset.
+        Show the latest background fits: the projected curve below the lowest pressure reached
+        and a predicted failure if the projection leaves the limits.
         """
-        return C + L / (1 + np.exp(-k * (x - x0)))
+        version, results = self.curve_fitter.latest_results()
+        if version == self.fit_version:
+            return
+        self.fit_version = version
+
+        for i, result in enumerate(results):
+            tab = self.tabview.tab(f"Sensor {i + 1}")
+            if result is None or not len(result.projected_pressure):
+                tab.line_projection.set_data([], [])
+                ui.set(tab.prediction_label, text="")
+                self.predicted_fail[i] = False
+                continue
+
+            tab.line_projection.set_data(result.projected_pressure, result.projected_voltage)
+            self.predicted_fail[i] = result.predicted_fail
+            if result.predicted_fail:
+                ui.set(tab.prediction_label, text=f"Predicted Fail below {result.predicted_fail_pressure:.2g} mbar", color="red")
+            else:
+                ui.set(tab.prediction_label, text="Predicted Pass", color="orange")
+        registry.gauge("fit.predicted_failures").set(sum(self.predicted_fail))
 
-    def get_resistor_values(self, voltage):
+    def add_vout_annotation(self, sensor_index, vout):
         """
-        Get the resistor values (R9 and R10) based on the sensor voltage.
+        Show a describe_vout() result in the corner of a sensor plot.
+        """
+        logger.info("Sensor %d: %s", sensor_index + 1, vout["summary"])
+        ax = self.tabview.tab(f"Sensor {sensor_index + 1}").ax
+        ax.text(
+            0.05, 0.05, vout["text"],
+            color=vout["color"], fontsize=10, transform=ax.transAxes, verticalalignment="bottom"
+        )
 
-        Parameters:
-            voltage (float): The captured sensor voltage in mV.
-
-        Returns:
-            tuple: (R9, R10) resistor values or None if out of range.
-        """
-        resistor_table = [
-            (9.00, 150, "18k"), (9.05, 150, "36k"), (9.10, 150, "100M"),
-            (9.15, 154, "8.2k"), (9.20, 154, "12k"), (9.25, 154, "18k"),
-            (9.30, 154, "100k"), (9.35, 158, "6.8k"), (9.40, 158, "8.2k"),
-            (9.45, 158, "12k"), (9.50, 158, "22k"), (9.55, 158, "100k"),
-            (9.60, 162, "8.2k"), (9.65, 162, "10k"), (9.70, 162, "15k"),
-            (9.75, 162, "30k"), (9.80, 162, "100k"), (9.85, 165, "12k"),
-            (9.90, 165, "22k"), (9.95, 165, "47k"), (10.00, 169, "6.8k"),
-            (10.05, 169, "10k"), (10.10, 169, "15k"), (10.15, 169, "22k"),
-            (10.20, 169, "100k"), (10.25, 174, "6.8k"), (10.30, 174, "8.2k"),
-            (10.35, 174, "10k"), (10.40, 174, "15k"), (10.45, 174, "22k"),
-            (10.50, 174, "100k"), (10.55, 178, "8.2k"), (10.60, 178, "10k"),
-            (10.65, 178, "15k"), (10.70, 178, "30k"), (10.75, 178, "100k"),
-            (10.80, 182, "10k"), (10.85, 182, "12k"), (10.90, 182, "18k"),
-            (10.95, 182, "30k"), (11.00, 182, "100k")
-        ]
+    def vout_captured(self):
+        """
+        Return whether each sensor's Vout has been captured in the current run.
+        """
+        return self.evaluator.vout_captured()
+
+    def reset_run_state(self):
+        """
+        Forget the latched verdicts, captured Vout, anomaly alarms and curve fits so that a new run is evaluated from scratch.
+        """
+        self.evaluator.reset()
+        self.anomaly_detector.reset()
+        self.curve_fitter.reset()  # The next unit's projection must not include this unit's data
+        self.apply_fit_results()
+        for i in range(8):
+            ui.set(self.pass_fail_labels[i], text="")
+
+            # Remove the previous run's Vout annotations
+            tab = self.tabview.tab(f"Sensor {i + 1}")
+            for text in list(tab.ax.texts):
+                if text is not self.pass_fail_labels[i] and text is not tab.prediction_label:
+                    text.remove()
 
-        # Check if the voltage is out of range
-        if voltage < 9.0 or voltage > 11.0:
-            return None
+    def current_verdicts(self):
+        """
+        Return the live verdict of each sensor: "Pass", "Fail" or None if not yet evaluated.
+        """
+        return list(self.evaluator.verdicts)
 
-        # Find the closest voltage in the table
-        closest_entry = min(resistor_table, key=lambda x: abs(x[0] - voltage))
-        return closest_entry[1], closest_entry[2]
\ No newline at end of file
+    def current_anomalies(self):
+        """
+        Return the latched anomaly alarms of each sensor as text, empty if there are none.
+        """
+        return [self.anomaly_detector.describe(i) for i in range(8)]
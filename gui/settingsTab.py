@@ -1,21 +1,27 @@
+import os
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 
 
 class SettingsTab(ctk.CTkFrame):
-    def __init__(self, parent, file_manager, logging_var, sensor_tab):
+    # Replay speed options; 0 replays as fast as the live path can consume samples
+    REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "100x": 100.0, "Max": 0}
+
+    def __init__(self, parent, file_manager, logging_var, sensor_tab, acquisition, report_generator):
         super().__init__(parent)
 
         self.file_manager = file_manager
+        self.acquisition = acquisition
         self.logging_var = logging_var
         self.sensor_tab = sensor_tab
+        self.report_generator = report_generator
 
         # Configure grid layout for the entire tab
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        # Create a frame to center all content
-        content_frame = ctk.CTkFrame(self)
+        # Create a frame to center all content (scrollable, as the settings no longer fit the window)
+        content_frame = ctk.CTkScrollableFrame(self)
         content_frame.grid(row=0, column=0, padx=480, pady=20, sticky="nsew")
         content_frame.grid_columnconfigure(0, weight=1)
         content_frame.grid_rowconfigure(0, weight=1)
@@ -58,6 +64,48 @@ class SettingsTab(ctk.CTkFrame):
         )
         self.mode_toggle.grid(row=9, column=0, padx=20, pady=10, sticky="n")
 
+        # Overlay historical runs for comparison
+        self.overlay_button = ctk.CTkButton(content_frame, text="Overlay Runs", command=self.overlay_runs)
+        self.overlay_button.grid(row=10, column=0, padx=20, pady=(20, 10), sticky="n")
+
+        self.clear_overlay_button = ctk.CTkButton(content_frame, text="Clear Overlays", command=self.clear_overlays)
+        self.clear_overlay_button.grid(row=11, column=0, padx=20, pady=10, sticky="n")
+
+        self.overlay_frame = ctk.CTkScrollableFrame(content_frame, label_text="Overlaid Runs", height=120)
+        self.overlay_frame.grid(row=12, column=0, padx=20, pady=10, sticky="nsew")
+        self.overlay_checkboxes = {}
+
+        # Replay a recorded run through the live ingest path
+        self.replay_label = ctk.CTkLabel(content_frame, text="Replay Speed:", font=ctk.CTkFont(size=14))
+        self.replay_label.grid(row=13, column=0, padx=20, pady=(20, 5), sticky="n")
+
+        self.replay_speed_menu = ctk.CTkOptionMenu(content_frame, values=list(self.REPLAY_SPEEDS))
+        self.replay_speed_menu.set("1x")
+        self.replay_speed_menu.grid(row=14, column=0, padx=20, pady=10, sticky="n")
+
+        self.replay_button = ctk.CTkButton(content_frame, text="Replay Run", command=self.replay_run)
+        self.replay_button.grid(row=15, column=0, padx=20, pady=10, sticky="n")
+
+        self.stop_replay_button = ctk.CTkButton(content_frame, text="Use Live Device", command=self.stop_replay)
+        self.stop_replay_button.grid(row=16, column=0, padx=20, pady=10, sticky="n")
+
+        # End-of-run reports
+        self.report_on_stop_var = ctk.BooleanVar(value=self.file_manager.report_on_stop)
+        self.report_on_stop_checkbox = ctk.CTkCheckBox(
+            content_frame, text="Report on Test Stop", variable=self.report_on_stop_var, command=self.update_report_on_stop
+        )
+        self.report_on_stop_checkbox.grid(row=17, column=0, padx=20, pady=(20, 10), sticky="n")
+
+        self.report_button = ctk.CTkButton(content_frame, text="Generate Report", command=self.generate_report)
+        self.report_button.grid(row=18, column=0, padx=20, pady=10, sticky="n")
+
+        # Stop the test automatically once every channel's verdict is settled
+        self.auto_stop_var = ctk.BooleanVar(value=self.file_manager.auto_stop)
+        self.auto_stop_checkbox = ctk.CTkCheckBox(
+            content_frame, text="Auto Stop When Settled", variable=self.auto_stop_var, command=self.update_auto_stop
+        )
+        self.auto_stop_checkbox.grid(row=19, column=0, padx=20, pady=(20, 10), sticky="n")
+
     def save_settings(self):
         """
         Save the settings to the file manager.
@@ -80,7 +128,7 @@ class SettingsTab(ctk.CTkFrame):
         filename = filedialog.askopenfilename(
             initialdir="Logs",  # Default directory
             title="Select Data File",
-            filetypes=(("CSV Files", "*.csv"), ("All Files", "*.*"))
+            filetypes=(("CSV Files", "*.csv *.csv.gz"), ("All Files", "*.*"))
         )
 
         if filename:  # If a file is selected
@@ -91,6 +139,101 @@ class SettingsTab(ctk.CTkFrame):
         else:
             messagebox.showinfo("Plot Data", "No file selected.")
 
+    def overlay_runs(self):
+        """
+        Open file explorer to select one or more historical runs to overlay on the plots.
+        """
+        filenames = filedialog.askopenfilenames(
+            initialdir="Logs",  # Default directory
+            title="Select Runs to Overlay",
+            filetypes=(("CSV Files", "*.csv *.csv.gz"), ("All Files", "*.*"))
+        )
+        if not filenames:
+            return
+
+        for filename in filenames:
+            if filename not in self.overlay_checkboxes:
+                visible_var = ctk.BooleanVar(value=True)
+                checkbox = ctk.CTkCheckBox(
+                    self.overlay_frame,
+                    text=os.path.basename(filename),
+                    variable=visible_var,
+                    command=lambda f=filename, v=visible_var: self.sensor_tab.set_overlay_visible(f, v.get())
+                )
+                checkbox.pack(anchor="w", padx=5, pady=2)
+                self.overlay_checkboxes[filename] = checkbox
+
+        self.sensor_tab.add_overlay_runs(list(filenames))
+
+    def clear_overlays(self):
+        """
+        Remove all overlaid runs from the plots.
+        """
+        for checkbox in self.overlay_checkboxes.values():
+            checkbox.destroy()
+        self.overlay_checkboxes.clear()
+        self.sensor_tab.clear_overlays()
+
+    def replay_run(self):
+        """
+        Select a recorded run to play back through the live path instead of the Arduino.
+        """
+        filename = filedialog.askopenfilename(
+            initialdir="Logs",  # Default directory
+            title="Select Run to Replay",
+            filetypes=(("CSV Files", "*.csv *.csv.gz"), ("All Files", "*.*"))
+        )
+        if not filename:
+            return
+
+        self.acquisition.set_replay(filename, self.REPLAY_SPEEDS[self.replay_speed_menu.get()])
+        messagebox.showinfo(
+            "Replay Run",
+            f"{os.path.basename(filename)} will be replayed at {self.replay_speed_menu.get()} speed.\n"
+            "Initialize Comms and Start Test on the Status tab to begin."
+        )
+
+    def stop_replay(self):
+        """
+        Go back to the real Arduino on the next Initialize Comms.
+        """
+        self.acquisition.set_replay(None)
+        messagebox.showinfo("Replay Run", "The live device will be used on the next Initialize Comms.")
+
+    def update_report_on_stop(self):
+        """
+        Enable or disable the automatic end-of-run report and save to settings.ini.
+        """
+        self.file_manager.report_on_stop = self.report_on_stop_var.get()
+        self.file_manager.save_settings(self.logging_var.get())
+
+    def update_auto_stop(self):
+        """
+        Enable or disable automatic test completion (from the next test) and save to settings.ini.
+        """
+        self.file_manager.auto_stop = self.auto_stop_var.get()
+        self.file_manager.save_settings(self.logging_var.get())
+
+    def generate_report(self):
+        """
+        Select a recorded run and generate its report in the background.
+        """
+        filename = filedialog.askopenfilename(
+            initialdir="Logs",  # Default directory
+            title="Select Run to Report",
+            filetypes=(("CSV Files", "*.csv *.csv.gz"), ("All Files", "*.*"))
+        )
+        if not filename:
+            return
+
+        def on_done(pdf_path, result):
+            if pdf_path:
+                self.after(0, lambda: messagebox.showinfo("Generate Report", f"Report written to {pdf_path}"))
+            else:
+                self.after(0, lambda: messagebox.showerror("Error", f"Failed to generate report: {result}"))
+
+        self.report_generator.generate(filename, self.file_manager.run_mode(filename), on_done)
+
     def change_theme(self, new_theme):
         """
         Change the appearance mode of the application.
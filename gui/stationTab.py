@@ -0,0 +1,215 @@
+import time
+import logging
+import customtkinter as ctk
+from tkinter import messagebox
+from utils.stationQueue import StationQueue, PENDING, RUNNING, DONE, SKIPPED
+from utils.completionPolicy import STOP_ACQUISITION_ERROR
+from utils.metrics import registry
+from utils.uiScheduler import ui
+
+logger = logging.getLogger(__name__)
+
+
+class StationTab(ctk.CTkFrame):
+    """
+    Station mode: test a batch of scanned serial numbers back to back.
+
+    Each unit is logged to its own file named after its serial number and test attempt, with the
+    exact serial number in the run metadata. When a test stops (automatically or by the operator) the next unit
+    starts as soon as the fixture acknowledges heartbeats without errors and the changeover
+    time for swapping the DUT has passed.
+    """
+    def __init__(self, parent, root, status_tab, sensor_tab, file_manager, logging_var, tick_ms=500):
+        super().__init__(parent)
+
+        self.root = root
+        self.status_tab = status_tab
+        self.sensor_tab = sensor_tab
+        self.file_manager = file_manager
+        self.logging_var = logging_var
+        self.tick_ms = tick_ms
+        self.queue = StationQueue()
+        self.active = False
+        self.next_start = None  # time.monotonic() after which the next unit may start
+
+        self.status_tab.test_stopped_callbacks.append(self.on_test_stopped)
+
+        # Configure grid layout for the entire tab
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        # Create a frame to center all content
+        content_frame = ctk.CTkFrame(self)
+        content_frame.grid(row=0, column=0, padx=300, pady=20, sticky="nsew")
+        content_frame.grid_columnconfigure((0, 1), weight=1)
+        content_frame.grid_rowconfigure(2, weight=1)
+
+        self.serial_entry = ctk.CTkEntry(content_frame, placeholder_text="Scan or enter serial number")
+        self.serial_entry.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        self.serial_entry.bind("<Return>", lambda event: self.add_serial())  # Barcode scanners end with Enter
+
+        self.add_button = ctk.CTkButton(content_frame, text="Add", command=self.add_serial)
+        self.add_button.grid(row=0, column=1, padx=10, pady=10, sticky="w")
+
+        self.status_label = ctk.CTkLabel(content_frame, text="Station idle", font=("Helvetica", 16))
+        self.status_label.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="n")
+
+        self.queue_text = ctk.CTkTextbox(content_frame, font=("Courier", 13), wrap="none")
+        self.queue_text.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
+
+        self.start_button = ctk.CTkButton(content_frame, text="Start Batch", command=self.toggle_batch)
+        self.start_button.grid(row=3, column=0, padx=10, pady=10, sticky="e")
+
+        self.start_now_button = ctk.CTkButton(content_frame, text="Start Next Now", command=self.start_now)
+        self.start_now_button.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+
+        self.skip_button = ctk.CTkButton(content_frame, text="Skip Next Unit", command=self.skip_next)
+        self.skip_button.grid(row=4, column=0, padx=10, pady=10, sticky="e")
+
+        self.clear_button = ctk.CTkButton(content_frame, text="Clear Pending", command=self.clear_pending)
+        self.clear_button.grid(row=4, column=1, padx=10, pady=10, sticky="w")
+
+        self.refresh_queue()
+
+    def add_serial(self):
+        """
+        Add the entered serial number to the batch.
+        """
+        serial_number = self.serial_entry.get()
+        if self.queue.add(serial_number):
+            logger.info("Queued unit %s", serial_number.strip())
+        self.serial_entry.delete(0, "end")
+        self.refresh_queue()
+
+    def toggle_batch(self):
+        if self.active:
+            self.pause_batch()
+        else:
+            self.start_batch()
+
+    def start_batch(self):
+        if not self.queue.pending():
+            messagebox.showinfo("Station", "Add serial numbers to the batch first.")
+            return
+        if not self.status_tab.acquisition.is_connected:
+            self.status_tab.initialize_comms()
+            if not self.status_tab.acquisition.is_connected:
+                return
+        if not self.logging_var.get():
+            logger.info("Enabling data logging for station mode.")
+            self.logging_var.set(1)
+
+        self.queue.begin_batch()
+        self.active = True
+        self.next_start = time.monotonic()  # No changeover before the first unit
+        ui.set(self.start_button, text="Pause Batch")
+        logger.info("Station batch %s started with %d units.", self.queue.batch_id, len(self.queue.pending()))
+        self.tick()
+
+    def pause_batch(self):
+        """
+        Don't start further units; the unit under test finishes normally.
+        """
+        self.active = False
+        ui.set(self.start_button, text="Start Batch")
+        ui.set(self.status_label, text="Station paused")
+
+    def start_now(self):
+        """
+        Skip the rest of the changeover time.
+        """
+        self.next_start = time.monotonic()
+
+    def skip_next(self):
+        unit = self.queue.next_unit()
+        if unit:
+            self.queue.skip_unit(unit)
+            self.refresh_queue()
+
+    def clear_pending(self):
+        self.queue.clear()
+        self.refresh_queue()
+
+    def tick(self):
+        """
+        Sequence the batch: start the next unit once the fixture is ready.
+        """
+        if not self.active:
+            return
+
+        current = self.queue.current()
+        if current:
+            ui.set(self.status_label, text=f"Testing {current.serial_number}")
+        else:
+            unit = self.queue.next_unit()
+            if unit is None:
+                self.finish_batch()
+                return
+            if not self.status_tab.fixture_ready():
+                ui.set(self.status_label, text=f"Next: {unit.serial_number} - waiting for fixture")
+            elif time.monotonic() < self.next_start:
+                remaining = self.next_start - time.monotonic()
+                ui.set(self.status_label, text=f"Next: {unit.serial_number} - load the unit, starting in {remaining:.0f} s")
+            else:
+                self.start_unit(unit)
+
+        self.root.after(self.tick_ms, self.tick)
+
+    def start_unit(self, unit):
+        """
+        Reset the plots and start the test of one unit, logged under its serial number and attempt.
+        """
+        log_filename = self.file_manager.unit_log_filename(unit.serial_number)
+        self.file_manager.filename_var.set(log_filename)
+        self.sensor_tab.clear_all_plots()
+
+        started = self.status_tab.start_test({
+            'serial_number': unit.serial_number,
+            'batch_id': self.queue.batch_id,
+            'batch_position': self.queue.position(unit)
+        }, show_errors=False)
+        if not started:
+            self.next_start = time.monotonic() + 5  # Retry shortly
+            return
+
+        self.queue.start_unit(unit, log_filename)
+        logger.info("Station: started unit %s (%s)", unit.serial_number, log_filename)
+        self.refresh_queue()
+
+    def on_test_stopped(self, stop_reason):
+        unit = self.queue.current()
+        if unit is None:
+            return
+        self.queue.finish_unit(unit, stop_reason, self.sensor_tab.current_verdicts())
+        self.next_start = time.monotonic() + self.file_manager.station_changeover_s
+        registry.counter("station.units_tested").inc()
+        registry.gauge("station.units_per_hour").set(self.queue.units_per_hour())
+        logger.info("Station: unit %s finished: %s (%s)", unit.serial_number, unit.result, stop_reason)
+        self.refresh_queue()
+        if stop_reason == STOP_ACQUISITION_ERROR:
+            # The fixture must be reconnected before the batch can go on
+            self.pause_batch()
+            ui.set(self.status_label, text=f"Station paused: acquisition error while testing {unit.serial_number}")
+
+    def finish_batch(self):
+        done = [unit for unit in self.queue.units if unit.state == DONE]
+        summary = f"Batch complete: {len(done)} units, {self.queue.units_per_hour():.1f} units/h"
+        logger.info("Station: %s, summary in %s", summary, self.queue.summary_filename)
+        self.queue.end_batch()
+        self.pause_batch()
+        ui.set(self.status_label, text=summary)
+
+    def refresh_queue(self):
+        """
+        Redraw the list of units and their results.
+        """
+        lines = [f"{'#':>3}  {'Serial Number':<24}{'State':<10}{'Result':<12}{'Time [s]':>8}"]
+        for position, unit in enumerate(self.queue.units, start=1):
+            state = {PENDING: "pending", RUNNING: "testing", DONE: "done", SKIPPED: "skipped"}[unit.state]
+            duration = "" if unit.duration_s is None else f"{unit.duration_s:.0f}"
+            lines.append(f"{position:>3}  {unit.serial_number:<24}{state:<10}{unit.result:<12}{duration:>8}")
+
+        self.queue_text.configure(state="normal")
+        self.queue_text.delete("1.0", "end")
+        self.queue_text.insert("1.0", "\n".join(lines))
+        self.queue_text.configure(state="disabled")
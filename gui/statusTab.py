@@ -1,19 +1,30 @@
 import customtkinter as ctk
 from tkinter import messagebox
-from threading import Lock
 import time
+import logging
+from utils.completionPolicy import CompletionPolicy, STOP_OPERATOR, STOP_ACQUISITION_ERROR
+from utils.uiScheduler import ui
+
+logger = logging.getLogger(__name__)
 
 class StatusTab(ctk.CTkFrame):
-    def __init__(self, parent, root, ser_manager, update_active, heartbeat_active, logging_var, sensor_tab):
+    def __init__(self, parent, root, acquisition, update_active, heartbeat_active, logging_var, sensor_tab, report_generator, fleet_store):
         super().__init__(parent)
 
         self.root = root
-        self.ser_manager = ser_manager
+        self.acquisition = acquisition
         self.update_active = update_active
         self.heartbeat_active = heartbeat_active
         self.logging_var = logging_var
         self.sensor_tab = sensor_tab
-        self.serial_lock = Lock()
+        self.report_generator = report_generator
+        self.fleet_store = fleet_store
+        self.completion_policy = CompletionPolicy(enabled=False)
+        self.test_started = None  # time.monotonic() at the start of the current test
+        self.test_started_callbacks = []  # Called after each test starts, e.g. to reset the published verdicts
+        self.test_stopped_callbacks = []  # Called with the stop reason after each test, e.g. by station mode
+        self.heartbeat_ok = False  # The latest heartbeat since the last test started or stopped was acknowledged
+        self.has_error = False  # The fixture reported an error in its latest status
 
         # Configure grid layout for the entire tab
         self.grid_columnconfigure(0, weight=1)
@@ -41,28 +52,39 @@ class StatusTab(ctk.CTkFrame):
         self.start_stop_button = ctk.CTkButton(widget_frame, text="Start Test", command=self.toggle_test, state="disabled")
         self.start_stop_button.grid(row=2, column=0, padx=10, pady=10, sticky="n")
 
+        # Result of the latest end-of-run report
+        self.report_label = ctk.CTkLabel(widget_frame, text="", font=("Helvetica", 12), wraplength=300)
+        self.report_label.grid(row=4, column=0, padx=10, pady=(0, 10), sticky="n")
+
         # Create a frame for error indicators
         error_frame = ctk.CTkFrame(widget_frame)
         error_frame.grid(row=3, column=0, padx=20, pady=20, sticky="nsew")
-        error_frame.grid_columnconfigure(0, weight=1)
+        error_frame.grid_columnconfigure((0, 1), weight=1)
 
         # Error indicators
         self.error_indicators = {}
         error_types = ["SD card initialisation", "SD card log", "ADC", "RS485"]
         for i, error in enumerate(error_types):
             label = ctk.CTkLabel(error_frame, text=f"{error}: N/A", font=("Helvetica", 14), fg_color="gray", corner_radius=5)
-            label.grid(row=i, column=0, padx=10, pady=5, sticky="nsew")
+            label.grid(row=i, column=0, columnspan=2, padx=10, pady=5, sticky="nsew")
             self.error_indicators[error] = label
 
+        # Anomaly indicators of each sensor channel, two per row below the fixture errors
+        self.anomaly_indicators = []
+        for i in range(8):
+            label = ctk.CTkLabel(error_frame, text=f"Sensor {i + 1}: N/A", font=("Helvetica", 14), fg_color="gray", corner_radius=5)
+            label.grid(row=len(error_types) + i // 2, column=i % 2, padx=10, pady=5, sticky="nsew")
+            self.anomaly_indicators.append(label)
+
     def initialize_comms(self):
         """
         Initialize the serial communication with the Arduino device.
         """
         # Close the serial port if it's already open
-        self.ser_manager.close()
+        self.acquisition.close()
 
         # Initialize the serial communication
-        error_status = self.ser_manager.initialize()
+        error_status = self.acquisition.initialize()
         if not error_status:
             messagebox.showerror("Error", "Failed to initialize serial communication!")
             return
@@ -71,11 +93,11 @@ class StatusTab(ctk.CTkFrame):
         self.update_error_status(error_status)
 
         # Update the status label and buttons
-        self.status_label.configure(text="Status: Initialized")
-        self.initialize_button.configure(state="disabled")
-        self.start_stop_button.configure(state="normal")
+        ui.set(self.status_label, text="Status: Initialized (Replay)" if self.acquisition.replay_file else "Status: Initialized")
+        ui.set(self.initialize_button, state="disabled")
+        ui.set(self.start_stop_button, state="normal")
         self.heartbeat_active.set(True)
-        print("Starting heartbeat...")
+        logger.info("Starting heartbeat...")
         self.root.after(2000, self.heartbeat)
 
     def update_error_status(self, error_status):
@@ -85,118 +107,199 @@ class StatusTab(ctk.CTkFrame):
         error_types = ["SD card initialisation", "SD card log", "ADC", "RS485"]
         has_error = False  # Track if any error is active
 
+        # Indicators that didn't change are skipped by the UI scheduler
         for i, error in enumerate(error_types):
             if error_status[i] == "1":
-                self.error_indicators[error].configure(text=f"{error}: ERROR", fg_color="red")
+                ui.set(self.error_indicators[error], text=f"{error}: ERROR", fg_color="red")
                 has_error = True  # An error is active
             elif error_status[i] == "0":
-                self.error_indicators[error].configure(text=f"{error}: OK", fg_color="green")
+                ui.set(self.error_indicators[error], text=f"{error}: OK", fg_color="green")
             else:
-                self.error_indicators[error].configure(text=f"{error}: N/A", fg_color="gray")
+                ui.set(self.error_indicators[error], text=f"{error}: N/A", fg_color="gray")
 
         # Disable the "Start Test" button if there is any error
+        self.has_error = has_error
         if has_error:
-            self.start_stop_button.configure(state="disabled")
+            ui.set(self.start_stop_button, state="disabled")
         else:
-            self.start_stop_button.configure(state="normal")
+            ui.set(self.start_stop_button, state="normal")
 
     def toggle_test(self):
         if self.update_active.get():
-            # Stop Test
-            with self.serial_lock:
-                self.ser_manager.send_command("r")
-                confirmation = self.ser_manager.ser.readline().decode('utf-8').strip()
-                while confirmation != "":
-                    print(f"Confirmation Debug: confirmation={confirmation}")
-                    confirmation = self.ser_manager.ser.readline().decode('utf-8').strip()
-            self.update_active.set(False)
-            self.start_stop_button.configure(text="Start Test")
-            print("Test stopped!")
+            self.stop_test(STOP_OPERATOR)
+        else:
+            self.start_test()
+
+    def start_test(self, run_metadata=None, show_errors=True):
+        """
+        Start a test, logging to the current filename.
+
+        Parameters:
+            run_metadata (dict): Extra values for the run's metadata file, e.g. the serial number.
+            show_errors (bool): Show a message box if the Arduino doesn't confirm the start.
+
+        Returns:
+            bool: True if the test started.
+        """
+        file_manager = self.sensor_tab.file_manager
+
+        # Stop heartbeat before starting the test; the fixture must acknowledge again before the next one
+        self.heartbeat_active.set(False)
+        self.heartbeat_ok = False
+        logger.info("Stopping heartbeat...")
+        # Clear the graph only if data has been plotted from a file
+        if self.sensor_tab.data_plotted:
+            self.sensor_tab.clear_all_plots()
+
+        run_start_ns = self.acquisition.start_test(
+            file_manager.filename_var.get(), self.logging_var.get(), file_manager.run_writer_options()
+        )
+        if run_start_ns is None:
+            if show_errors:
+                messagebox.showerror("Error", "Timeout waiting for confirmation from Arduino.")
+            else:
+                logger.error("Timeout waiting for confirmation from Arduino.")
             self.heartbeat_active.set(True)
-            self.root.after(5000, self.heartbeat)
+            self.root.after(1000, self.heartbeat)
+            return False
+
+        file_manager.start_run(self.logging_var.get(), run_start_ns, run_metadata)
+        self.sensor_tab.reset_run_state()  # Verdicts and Vout of the previous run no longer apply
+        self.completion_policy = CompletionPolicy(
+            file_manager.auto_stop, file_manager.auto_stop_on_all_fail, True,
+            file_manager.auto_stop_delay_s, file_manager.typical_run_minutes()
+        )
+        self.test_started = time.monotonic()
+        self.update_active.set(True)
+        ui.set(self.start_stop_button, text="Stop Test")
+        logger.info("Test started!")
+
+        for callback in self.test_started_callbacks:
+            callback()
+        return True
+
+    def fixture_ready(self):
+        """
+        True when the fixture is connected, acknowledging heartbeats and reporting no errors.
+        """
+        return self.acquisition.is_connected and self.heartbeat_ok and not self.has_error and not self.update_active.get()
+
+    def stop_test(self, stop_reason):
+        """
+        Stop the running test, record why it stopped and finalize the run log.
+        """
+        file_manager = self.sensor_tab.file_manager
+        self.acquisition.stop_test()
+        self.update_active.set(False)
+        self.heartbeat_ok = False  # Until the restarted heartbeat is acknowledged
+
+        time_saved_s = None
+        if stop_reason != STOP_OPERATOR:
+            time_saved_s = self.completion_policy.time_saved(time.monotonic() - self.test_started)
+        file_manager.finish_run(
+            self.logging_var.get(), stop_reason, time_saved_s, self.sensor_tab.current_anomalies(),
+            self.completion_policy.settled_for()
+        )
+        file_manager.close_run()  # The acquisition process finalized the run log in stop_test()
+        if self.logging_var.get():
+            self.fleet_store.ingest_in_background(file_manager.filename_var.get())  # For cross-run queries
+            if file_manager.report_on_stop:
+                self.generate_report(file_manager.filename_var.get())
+
+        ui.set(self.start_stop_button, text="Start Test")
+        logger.info("Test stopped (%s)!", stop_reason)
+        self.heartbeat_active.set(True)
+        self.root.after(5000, self.heartbeat)
+
+        for callback in self.test_stopped_callbacks:
+            callback(stop_reason)
+
+    def handle_acquisition_error(self, message):
+        """
+        Stop the running test when the acquisition process reports that its serial loop failed.
+        The acquisition process has already closed the run log.
+        """
+        logger.error("Acquisition error: %s", message)
+        if self.update_active.get():
+            self.stop_test(STOP_ACQUISITION_ERROR)
+        ui.set(self.status_label, text=f"Status: Acquisition error ({message})")
+
+    def update_anomalies(self, anomalies):
+        """
+        Show the latched anomaly alarms of each sensor, e.g. from SensorTab.current_anomalies().
+        """
+        for i, alarms in enumerate(anomalies):
+            if alarms:
+                ui.set(self.anomaly_indicators[i], text=f"Sensor {i + 1}: {alarms}", fg_color="orange")
+            else:
+                ui.set(self.anomaly_indicators[i], text=f"Sensor {i + 1}: OK", fg_color="green")
+
+    def check_completion(self, pressures):
+        """
+        Stop the test automatically once the completion policy says every verdict is settled.
+        Called after each batch of samples has been evaluated.
+        """
+        self.completion_policy.observe(pressures)
+        stop_reason = self.completion_policy.evaluate(self.sensor_tab.current_verdicts(), self.sensor_tab.vout_captured())
+        if stop_reason and self.update_active.get():
+            logger.info("All channel verdicts settled (%s), stopping the test automatically.", stop_reason)
+            self.stop_test(stop_reason)
+            ui.set(self.status_label, text=f"Status: Test auto-stopped ({stop_reason.replace('_', ' ')})")
+
+    def generate_report(self, filename):
+        """
+        Render the end-of-run report in the background and show where it was written.
+        """
+        ui.set(self.report_label, text="Generating report...")
+        mode = self.sensor_tab.file_manager.run_mode(filename)
+        self.report_generator.generate(
+            filename, mode,
+            on_done=lambda pdf_path, result: self.root.after(0, lambda: self.show_report_result(pdf_path, result))
+        )
+
+    def show_report_result(self, pdf_path, result):
+        if pdf_path:
+            failed = [str(row["Sensor"]) for row in result if row["Verdict"] == "Fail"]
+            vout_failed = [str(row["Sensor"]) for row in result if row["Vout check"] == "Fail"]
+            summary = f"Failed sensors: {', '.join(failed)}" if failed else "All sensors passed"
+            if vout_failed:
+                summary += f"\nVout out of range: {', '.join(vout_failed)}"
+            ui.set(self.report_label, text=f"Report: {pdf_path}\n{summary}")
         else:
-            # Stop heartbeat before starting the test
-            self.heartbeat_active.set(False)
-            print("Stopping heartbeat...")
-            # Clear the graph only if data has been plotted from a file
-            if self.sensor_tab.data_plotted:
-                self.sensor_tab.clear_all_plots()
-
-            confirm = False
-            timeout = 2  # Timeout in seconds
-            start_time = time.time()
-
-            with self.serial_lock:
-                confirmation = self.ser_manager.ser.readline().decode('utf-8').strip()
-                while confirmation != "":
-                    print(f"Confirmation Debug: confirmation={confirmation}")
-                    confirmation = self.ser_manager.ser.readline().decode('utf-8').strip()
-
-                self.ser_manager.send_command("p")
-                while not confirm:
-                    # Check for timeout
-                    if time.time() - start_time > timeout:
-                        self.ser_manager.send_command("p")
-                        # print("Timeout waiting for confirmation from Arduino.")
-                        # messagebox.showerror("Error", "Timeout waiting for confirmation from Arduino.")
-                        # return
-
-                    # Read confirmation from Arduino
-                    confirmation = self.ser_manager.ser.readline().decode('utf-8').strip()
-                    print(f"Confirmation Debug: confirmation={confirmation}")
-                    if confirmation == "Simulated button press from serial.":
-                        print("Button press confirmed!")
-                        confirm = True
-                    time.sleep(0.1)
-
-            self.update_active.set(True)
-            self.start_stop_button.configure(text="Stop Test")
-            print("Test started!")
+            ui.set(self.report_label, text=f"Report failed: {result}")
 
     def heartbeat(self):
         """
         Periodically send a heartbeat signal to check if the serial connection is active.
         """
         if not self.heartbeat_active.get():
-            print("Heartbeat stopped.")
+            logger.info("Heartbeat stopped.")
             return
 
-        with self.serial_lock:
-            try:
-                if self.ser_manager.ser:
-                    print("Sending heartbeat...")
-                    response = self.ser_manager.ser.readline().decode('utf-8').strip()
-                    while response != "":
-                        # Parse error status if present
-                        if response.startswith("1") or response.startswith("0"):
-                            error_status_list = response.split(", ")
-                            print(f"Heartbeat Debug: response={response}")
-                            self.update_error_status(error_status_list)
-                        response = self.ser_manager.ser.readline().decode('utf-8').strip()
-
-                    self.ser_manager.ser.write(b'ENQ\n')  # Send heartbeat command
-                    response = self.ser_manager.ser.readline().decode('utf-8').strip()
-                    print(f"Heartbeat response: {response}")
-
-                    if response == "ACK":
-                        print("Heartbeat successful.")
-                    else:
-                        print("Heartbeat failed.")
-                        raise Exception("No ACK received.")
-                else:
-                    print("Serial connection is not active.")
-                    raise Exception("Serial connection lost.")
-            except Exception as e:
-                print(f"Heartbeat error: {e}")
-                # Mark the connection as not initialized
-                self.ser_manager.close()
-                self.status_label.configure(text="Status: Not Initialized")
-                self.initialize_button.configure(state="normal")
-                self.start_stop_button.configure(state="disabled")
-                # Reset error indicators to "N/A"
-                for label in self.error_indicators.values():
-                    label.configure(text="N/A", fg_color="gray")
-                return
+        try:
+            if self.acquisition.is_connected:
+                logger.debug("Sending heartbeat...")
+                alive, error_status_list = self.acquisition.heartbeat()
+                if error_status_list:
+                    self.update_error_status(error_status_list)
+                if not alive:
+                    raise Exception("No ACK received.")
+                self.heartbeat_ok = True
+            else:
+                logger.warning("Serial connection is not active.")
+                raise Exception("Serial connection lost.")
+        except Exception as e:
+            logger.error("Heartbeat error: %s", e)
+            self.heartbeat_ok = False
+            # Mark the connection as not initialized
+            self.acquisition.close()
+            ui.set(self.status_label, text="Status: Not Initialized")
+            ui.set(self.initialize_button, state="normal")
+            ui.set(self.start_stop_button, state="disabled")
+            # Reset error indicators to "N/A"
+            for label in self.error_indicators.values():
+                ui.set(label, text="N/A", fg_color="gray")
+            return
 
         # Schedule the next heartbeat
         self.root.after(1000, self.heartbeat)
\ No newline at end of file
@@ -1,17 +1,24 @@
 import threading
 import queue
+import logging
+import multiprocessing
 import customtkinter as ctk
 from gui.statusTab import StatusTab
 from gui.sensorTab import SensorTab
 from gui.settingsTab import SettingsTab
-from utils.serialManager import SerialManager
+from gui.diagnosticsTab import DiagnosticsTab
+from gui.stationTab import StationTab
+from utils.acquisitionManager import AcquisitionManager
+from utils.liveFeed import LiveFeedPublisher, samples_ring_name
+from utils.sampleRing import RECEIVED_NS, PRESSURE
 from utils.fileManager import FileManager
+from utils.reportGenerator import ReportGenerator
+from utils.fleetStore import FleetStore
+from utils.uiScheduler import ui
+from utils.logManager import setup_logging
 from tkinter import messagebox
 from PIL import Image, ImageTk  # Import PIL for image processing
-# import logging
-
-# Configure logging
-# logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
 
 class PressureSensorApp(ctk.CTk):
     def __init__(self):
@@ -48,11 +55,32 @@ class PressureSensorApp(ctk.CTk):
         # Add tabs to the notebook
         self.notebook.add("Status")
         self.notebook.add("Sensors")
+        self.notebook.add("Station")
         self.notebook.add("Settings")
+        self.notebook.add("Diagnostics")
+
+        # Widget and plot updates of all tabs are coalesced into one flush per frame
+        ui.attach(self)
 
         # Initialize shared variables
-        self.ser_manager = SerialManager()
-        self.file_manager = FileManager()
+        self.file_manager = FileManager(ctk.StringVar)
+
+        # Configure logging; formatting and output happen on a background listener thread
+        self.log_listener = setup_logging(self.file_manager.log_level, self.file_manager.log_rate_limit_s)
+
+        # Serial reading and run logging happen in a separate acquisition process
+        # The sample ring and the verdicts are also published for other tools at the station (utils.liveFeed)
+        self.acquisition = AcquisitionManager(ring_name=samples_ring_name())
+        try:
+            self.acquisition.start(self.file_manager.log_level, self.file_manager.log_rate_limit_s)
+            self.live_feed = LiveFeedPublisher()
+        except FileExistsError as e:
+            # Another instance is running and owns the live feed; don't take it over
+            logger.error("Cannot start: %s", e)
+            messagebox.showerror("Error", "The Pressure Sensor GUI is already running on this PC.")
+            self.acquisition.shutdown()
+            self.destroy()
+            raise SystemExit(1)
         self.update_active = ctk.BooleanVar(value=False)
         self.heartbeat_active = ctk.BooleanVar(value=False)
         self.logging_var = ctk.IntVar(value=1)
@@ -61,12 +89,28 @@ class PressureSensorApp(ctk.CTk):
         self.sensor_tab = SensorTab(self.notebook.tab("Sensors"), self.file_manager)
         self.sensor_tab.grid(row=0, column=0, sticky="nsew")  # Add SensorTab to the "Sensors" tab
 
-        self.status_tab = StatusTab(self.notebook.tab("Status"), self, self.ser_manager, self.update_active, self.heartbeat_active, self.logging_var, self.sensor_tab)
+        # End-of-run reports are rendered in a background process pool
+        self.report_generator = ReportGenerator(
+            self.sensor_tab.lut_pressure, self.sensor_tab.lut_average, self.sensor_tab.limit_profile,
+            self.sensor_tab.log_reader, self.file_manager.report_dir
+        )
+
+        # Finished runs are summarised into a columnar store for fleet-wide queries (python -m utils.fleetStore)
+        self.fleet_store = FleetStore(limit_profile=self.sensor_tab.limit_profile, log_reader=self.sensor_tab.log_reader)
+
+        self.status_tab = StatusTab(self.notebook.tab("Status"), self, self.acquisition, self.update_active, self.heartbeat_active, self.logging_var, self.sensor_tab, self.report_generator, self.fleet_store)
         self.status_tab.grid(row=0, column=0, sticky="nsew")  # Add StatusTab to the "Status" tab
+        self.status_tab.test_started_callbacks.append(self.live_feed.reset)  # Subscribers shouldn't see the previous run's verdicts
+
+        self.station_tab = StationTab(self.notebook.tab("Station"), self, self.status_tab, self.sensor_tab, self.file_manager, self.logging_var)
+        self.station_tab.grid(row=0, column=0, sticky="nsew")  # Add StationTab to the "Station" tab
 
-        self.settings_tab = SettingsTab(self.notebook.tab("Settings"), self.file_manager, self.logging_var, self.sensor_tab)
+        self.settings_tab = SettingsTab(self.notebook.tab("Settings"), self.file_manager, self.logging_var, self.sensor_tab, self.acquisition, self.report_generator)
         self.settings_tab.grid(row=0, column=0, sticky="nsew")  # Add SettingsTab to the "Settings" tab
 
+        self.diagnostics_tab = DiagnosticsTab(self.notebook.tab("Diagnostics"), self)
+        self.diagnostics_tab.grid(row=0, column=0, sticky="nsew")  # Add DiagnosticsTab to the "Diagnostics" tab
+
         # Handle app close event
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -95,32 +139,30 @@ class PressureSensorApp(ctk.CTk):
             # self.canvas.create_image(600, 350, image=self.watermark_image, anchor="center")
             self.canvas.create_image(600, 350, image=self.watermark_image, anchor="center", tags="watermark")
         except Exception as e:
-            print(f"Error loading watermark image: {e}")
+            logger.error("Error loading watermark image: %s", e)
 
     def update_all_plots(self):
         """
         Custom animation loop to update all sensor plots and handle errors.
         """
-        if self.update_active.get() and self.ser_manager.ser:
-            try:
-                with self.ser_manager.serial_lock:
-                    if self.ser_manager.ser.in_waiting > 0:
-                        raw_data = self.ser_manager.ser.readline().decode('utf-8').strip()
-                        print(raw_data)
-                        if raw_data:
-                            # Check if the response contains error status
-                            if "Error status format" in raw_data:
-                                # Parse the next line for error status
-                                error_status = self.ser_manager.ser.readline().decode('utf-8').strip()
-                                print(error_status)
-                                error_status_list = error_status.split(", ")
-                                self.status_tab.update_error_status(error_status_list)
-                            else:
-                                # Process normal sensor data
-                                self.sensor_tab.process_serial_data(raw_data, self.logging_var, self.file_manager)
-            except Exception as e:
-                print(f"Error reading serial data: {e}")
-                # pass
+        try:
+            # Error status and failures reported by the acquisition process
+            for event in self.acquisition.poll_events():
+                if event[0] == "error_status":
+                    self.status_tab.update_error_status(event[1])
+                elif event[0] == "acquisition_error":
+                    self.status_tab.handle_acquisition_error(event[1])
+
+            # Plot everything acquired since the last tick
+            if self.update_active.get():
+                samples = self.acquisition.read_samples()
+                if len(samples):
+                    self.sensor_tab.process_samples(samples)
+                    self.live_feed.publish_verdicts(int(samples[-1, RECEIVED_NS]), self.sensor_tab.current_verdicts())
+                    self.status_tab.update_anomalies(self.sensor_tab.current_anomalies())
+                    self.status_tab.check_completion(samples[:, PRESSURE])
+        except Exception as e:
+            logger.error("Error updating plots: %s", e)
 
         # Schedule the next update
         self.after(50, self.update_all_plots)
@@ -131,17 +173,24 @@ class PressureSensorApp(ctk.CTk):
         """
         if self.update_active.get():
             # Send stop test command to Arduino
-            self.ser_manager.send_command("r")
-            # logging.debug("Stop test command sent to Arduino.")
+            self.acquisition.send_command("r")
+            logger.info("Stop test command sent to Arduino.")
 
-        # Close the serial connection
-        self.ser_manager.close()
+        # Close the serial connection and finalize the run log
+        self.acquisition.close()
+        self.file_manager.close_run()
 
         # Confirm exit
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
+            self.acquisition.shutdown()
+            self.live_feed.close()
+            self.report_generator.shutdown()
+            self.sensor_tab.curve_fitter.stop()
+            self.log_listener.stop()
             self.destroy()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Required for the acquisition process in the frozen main.exe
     app = PressureSensorApp()
     app.mainloop()
\ No newline at end of file
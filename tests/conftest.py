@@ -0,0 +1,59 @@
+"""
+Shared fixtures of the unit tests. Run from the repository root with:
+    python -m pytest tests
+"""
+import csv
+import json
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+
+from utils.limitProfile import LimitProfile, logistic_with_offset, fit_limit_params
+from utils.runWriter import CSV_HEADER
+
+
+@pytest.fixture(scope="session")
+def lut():
+    # Synthetic LUT, so that the tests don't depend on PLookUp.csv
+    lut_pressure = np.logspace(3, -5, 21)
+    return lut_pressure, logistic_with_offset(np.log10(lut_pressure), 9.5, 900, 1.2, -1.0)
+
+
+@pytest.fixture(scope="session")
+def limit_profile(lut):
+    return LimitProfile(*fit_limit_params(*lut, np.full(21, 0.2)))
+
+
+@pytest.fixture(scope="session")
+def make_run(limit_profile):
+    """
+    Return a function making a pump-down run of n samples: (pressures, voltages) with every
+    sensor on the middle of the limit band, except for the sensors in `failing`, which leave
+    the band below 1e-2 mbar.
+    """
+    def make(n=400, failing=(), seed=0):
+        rng = np.random.default_rng(seed)
+        pressures = np.logspace(3, -5, n)
+        midline = (limit_profile.lower_limit(pressures) + limit_profile.upper_limit(pressures)) / 2
+        voltages = midline[:, None] * (1 + rng.normal(0, 0.002, (n, 8)))
+        for sensor in failing:
+            voltages[pressures < 1e-2, sensor] = limit_profile.upper_limit(pressures[pressures < 1e-2]) * 1.5
+        return pressures, voltages
+    return make
+
+
+@pytest.fixture(scope="session")
+def write_run_log():
+    """
+    Return a function writing a run log with its metadata file, as the GUI does.
+    """
+    def write(path, pressures, voltages, mode="Gauge Tube", run_start=None):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            for i, (pressure, row) in enumerate(zip(pressures, voltages)):
+                writer.writerow(list(row) + [pressure, i * 0.1])
+        run_start = run_start or datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+        with open(str(path)[:-len(".csv")] + ".json", "w") as file:
+            json.dump({"run_start": run_start.isoformat(), "mode": mode}, file)
+    return write
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from utils.anomalyDetector import AnomalyDetector, DRIFT, STUCK, NOISY, SATURATED, FLATLINED
+
+
+@pytest.fixture(scope="module")
+def faulty_run(lut):
+    lut_pressure, lut_average = lut
+    rng = np.random.default_rng(1)
+    n = 600
+    pressures = np.logspace(3, -5, n)
+    expected = np.interp(np.log10(pressures), np.log10(lut_pressure[::-1]), lut_average[::-1])
+    voltages = expected[:, None] * (1 + rng.normal(0, 0.002, (n, 8)))
+    voltages[:, 1] *= np.linspace(1, 1.3, n)  # Drifts out of the band
+    voltages[200:400, 2] = voltages[200, 2]  # Stuck while the pressure falls
+    voltages[300:, 3] += rng.normal(0, 0.3, n - 300) * expected[300:]  # Noisy
+    voltages[500:, 4] = 1e6  # Saturated
+    return pressures, voltages
+
+
+def feed(lut, pressures, voltages, batch_size):
+    detector = AnomalyDetector(*lut, np.full(21, 0.2))
+    for first in range(0, len(pressures), batch_size):
+        detector.update(pressures[first:first + batch_size], voltages[first:first + batch_size])
+    return detector
+
+
+def test_faults_are_detected(lut, faulty_run):
+    detector = feed(lut, *faulty_run, batch_size=50)
+    assert detector.alarms[0] == set()
+    assert DRIFT in detector.alarms[1]
+    assert STUCK in detector.alarms[2]
+    assert NOISY in detector.alarms[3]
+    assert SATURATED in detector.alarms[4]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 64])
+def test_batch_size_does_not_change_the_result(lut, faulty_run, batch_size):
+    whole = feed(lut, *faulty_run, batch_size=len(faulty_run[0]))
+    batched = feed(lut, *faulty_run, batch_size=batch_size)
+
+    # The flatline check runs at the end of each batch; every other alarm is per sample
+    assert [alarms - {FLATLINED} for alarms in batched.alarms] == [alarms - {FLATLINED} for alarms in whole.alarms]
+    for state in ("ewma", "step_ewma", "baseline", "cusum_high", "cusum_low", "stuck_count", "saturated_count"):
+        assert np.allclose(getattr(batched, state), getattr(whole, state)), state
+
+
+def test_gauge_dropouts_are_ignored(lut, faulty_run):
+    pressures, voltages = faulty_run
+    detector = AnomalyDetector(*lut, np.full(21, 0.2))
+    assert detector.update(np.zeros(10), voltages[:10]) == []
+    assert detector.samples == 0
+
+
+def test_reset_clears_the_alarms(lut, faulty_run):
+    detector = feed(lut, *faulty_run, batch_size=100)
+    detector.reset()
+    assert all(not alarms for alarms in detector.alarms)
+    assert detector.describe(1) == ""
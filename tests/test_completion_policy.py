@@ -0,0 +1,67 @@
+from utils.completionPolicy import CompletionPolicy, STOP_ALL_FAILED, STOP_ALL_PASSED, STOP_ALL_SETTLED
+from utils.voutCheck import VOUT_CAPTURE_PRESSURE
+
+CAPTURED = [True] * 8
+
+
+def pumped_down(policy):
+    policy.observe([1e-3, VOUT_CAPTURE_PRESSURE / 2])
+    return policy
+
+
+def test_all_failed_stops_after_the_delay():
+    policy = CompletionPolicy(delay_s=2.0)
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=10.0) is None
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=11.9) is None
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=12.0) == STOP_ALL_FAILED
+
+
+def test_all_failed_can_be_disabled():
+    policy = CompletionPolicy(stop_on_all_fail=False, delay_s=0)
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=0) == STOP_ALL_SETTLED  # Failed channels are settled
+    policy = CompletionPolicy(stop_on_all_fail=False, stop_when_settled=False, delay_s=0)
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=0) is None
+
+
+def test_passing_sensors_need_the_pump_down_and_vout():
+    policy = CompletionPolicy(delay_s=0)
+    policy.observe([1e-3])
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=0) is None
+    pumped_down(policy)
+    assert policy.evaluate(["Pass"] * 8, [False] + [True] * 7, now=1) is None
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=2) == STOP_ALL_PASSED
+
+
+def test_mixed_verdicts_stop_as_settled():
+    policy = pumped_down(CompletionPolicy(delay_s=0))
+    assert policy.evaluate(["Pass"] * 7 + ["Fail"], CAPTURED, now=0) == STOP_ALL_SETTLED
+
+
+def test_unsettling_restarts_the_delay():
+    policy = pumped_down(CompletionPolicy(delay_s=5.0))
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=0) is None
+    assert policy.evaluate(["Pass"] * 7 + [None], CAPTURED, now=3) is None
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=6) is None
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=11) == STOP_ALL_PASSED
+
+
+def test_disabled_policy_never_stops_but_tracks_settling():
+    policy = CompletionPolicy(enabled=False, delay_s=0)
+    assert policy.settled_for(now=0) is None
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=10.0) is None
+    assert policy.evaluate(["Fail"] * 8, [False] * 8, now=20.0) is None
+    assert policy.settled_for(now=25.0) == 15.0
+
+
+def test_reset_forgets_the_run():
+    policy = pumped_down(CompletionPolicy(delay_s=0))
+    policy.evaluate(["Fail"] * 8, [False] * 8, now=0)
+    policy.reset()
+    assert policy.settled_for(now=1) is None
+    assert policy.evaluate(["Pass"] * 8, CAPTURED, now=1) is None  # Not pumped down in this run
+
+
+def test_time_saved():
+    assert CompletionPolicy(expected_run_minutes=0).time_saved(60) is None
+    assert CompletionPolicy(expected_run_minutes=10).time_saved(240) == 360.0
+    assert CompletionPolicy(expected_run_minutes=1).time_saved(240) == 0.0
@@ -0,0 +1,46 @@
+import numpy as np
+
+from utils.decimate import decimate_for_view
+
+
+def column_of(x, xlim, width_px):
+    position = (np.log10(x) - np.log10(xlim[0])) / (np.log10(xlim[1]) - np.log10(xlim[0]))
+    return np.clip((position * width_px).astype(int), 0, width_px - 1)
+
+
+def test_few_points_are_kept_unchanged():
+    x, y = np.logspace(0, -3, 10), np.arange(10.0)
+    dx, dy = decimate_for_view(x, y, (1e-3, 1), (0, 10), 100)
+    assert np.array_equal(dx, x) and np.array_equal(dy, y)
+
+
+def test_points_outside_the_view_are_dropped():
+    x, y = np.logspace(2, -5, 1000), np.linspace(0, 100, 1000)
+    dx, dy = decimate_for_view(x, y, (1e-3, 1), (10, 90), 2000)
+    assert len(dx) and dx.min() >= 1e-3 and dx.max() <= 1 and dy.min() >= 10 and dy.max() <= 90
+
+
+def test_column_extremes_are_kept():
+    rng = np.random.default_rng(0)
+    x = 10 ** rng.uniform(-5, 2, 50000)
+    y = rng.normal(0, 1, 50000)
+    y[123] = 50.0  # A spike must survive the decimation
+    xlim, ylim, width_px = (1e-5, 1e2), (-100, 100), 200
+
+    dx, dy = decimate_for_view(x, y, xlim, ylim, width_px)
+    assert len(dx) <= 2 * width_px
+    assert 50.0 in dy
+
+    columns, decimated_columns = column_of(x, xlim, width_px), column_of(dx, xlim, width_px)
+    for column in np.unique(columns):
+        kept = dy[decimated_columns == column]
+        assert kept.min() == y[columns == column].min()
+        assert kept.max() == y[columns == column].max()
+
+
+def test_linear_axis():
+    x = np.linspace(0, 10, 10000)
+    y = np.sin(x)
+    dx, dy = decimate_for_view(x, y, (0, 10), (-2, 2), 50, log_x=False)
+    assert len(dx) <= 100
+    assert np.isclose(dy.max(), 1, atol=1e-4) and np.isclose(dy.min(), -1, atol=1e-4)
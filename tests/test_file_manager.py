@@ -0,0 +1,25 @@
+import os
+import pytest
+
+from utils.fileManager import FileManager
+
+
+@pytest.fixture
+def file_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # FileManager reads and creates settings.ini in the working directory
+    return FileManager()
+
+
+def test_unit_logs_are_numbered_by_attempt(file_manager):
+    first = file_manager.unit_log_filename("UNIT_5")
+    assert first == os.path.join("Logs", "UNIT_5_1.csv")
+    assert file_manager.unit_log_filename("UNIT_5") == first  # Not used yet
+
+    with open(first, "w") as file:
+        file.write("data\n")
+    assert file_manager.unit_log_filename("UNIT_5") == os.path.join("Logs", "UNIT_5_2.csv")
+    assert file_manager.unit_log_filename("UNIT") == os.path.join("Logs", "UNIT_1.csv")
+
+
+def test_unit_log_names_are_safe(file_manager):
+    assert file_manager.unit_log_filename("SN 12/34.5") == os.path.join("Logs", "SN_12_34_5_1.csv")
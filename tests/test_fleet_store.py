@@ -0,0 +1,155 @@
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime, timezone
+import pytest
+
+import utils.fleetStore as fleetStore
+from utils.fleetStore import FleetStore
+from utils.logCache import LogCache
+from utils.logReader import LogReader
+
+
+@pytest.fixture
+def logs(tmp_path, make_run, write_run_log):
+    """
+    Five gauge tube runs in March and April, the last two with a failing sensor, and one assembly run.
+    """
+    folder = tmp_path / "Logs"
+    folder.mkdir()
+    for i in range(5):
+        failing = (2,) if i >= 3 else ()
+        run_start = datetime(2025, 3 + i // 3, 1 + i, 12, tzinfo=timezone.utc)
+        write_run_log(str(folder / f"run_{i}.csv"), *make_run(200, failing, seed=i), run_start=run_start)
+    write_run_log(
+        str(folder / "run_5.csv"), *make_run(200, seed=5), mode="Pressure Sensor Assembly",
+        run_start=datetime(2025, 4, 20, 12, tzinfo=timezone.utc)
+    )
+    return folder
+
+
+@pytest.fixture
+def store(tmp_path, logs, limit_profile):
+    log_reader = LogReader(log_cache=LogCache(str(tmp_path / ".cache"), settle_s=0))
+    store = FleetStore(str(tmp_path / ".fleet"), limit_profile, log_reader)
+    assert store.ingest_folder(str(logs)) == 6
+    return store
+
+
+def test_ingest_is_incremental(store, logs):
+    assert store.ingest_folder(str(logs)) == 0
+    assert sorted(store.index["partitions"]) == [
+        "mode=Gauge_Tube/month=2025-03", "mode=Gauge_Tube/month=2025-04", "mode=Pressure_Sensor_Assembly/month=2025-04"
+    ]
+    # The index is persisted
+    assert FleetStore(store.root).index == store.index
+
+
+def test_query_with_filters_and_groups(store):
+    result = store.query("runs", [("mode", "==", "Gauge Tube")], ["month"], {"passed": "mean", "run_id": "count"})
+    assert result["month"].tolist() == ["2025-03", "2025-04"]
+    assert result["run_id_count"].tolist() == [3, 2]
+    assert result["passed_mean"].tolist() == [1.0, 0.0]
+
+    result = store.query("sensors", [("sensor", "==", 3)], ["mode"], {"passed": "mean"})
+    assert dict(zip(result["mode"], result["passed_mean"])) == {"Gauge Tube": 0.6, "Pressure Sensor Assembly": 1.0}
+
+
+def test_filters_on_derived_columns(store):
+    result = store.query("runs", [("month", "==", "2025-04")], aggregates={"run_id": "count"})
+    assert result["run_id_count"].tolist() == [3]
+    result = store.query("runs", [("week", "!=", "none"), ("mode", "==", "Gauge Tube")], aggregates={"run_id": "count"})
+    assert result["run_id_count"].tolist() == [5]
+
+
+def test_last_runs(store):
+    result = store.query("runs", [("mode", "==", "Gauge Tube")], aggregates={"passed": "mean"}, last_runs=2)
+    assert result["passed_mean"].tolist() == [0.0]
+    result = store.query("runs", [("month", "==", "2025-03")], last_runs=2)
+    assert len(result) == 2 and set(result["month"]) == {"2025-03"}
+
+
+def test_run_start_filter_prunes_partitions(store):
+    result = store.query("runs", [("run_start", ">=", "2025-04-01T00:00:00+00:00")], aggregates={"run_id": "count"})
+    assert result["run_id_count"].tolist() == [3]
+
+
+def test_unknown_columns_and_tables_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.query("runs", [("bogus", "==", 1)])
+    with pytest.raises(ValueError):
+        store.query("runs", group_by=["bogus"], aggregates={"run_id": "count"})
+    with pytest.raises(ValueError):
+        store.query("bogus")
+    with pytest.raises(ValueError):
+        store.query("runs", aggregates={"run_id": "bogus"})
+
+
+def test_changed_run_replaces_its_rows(store, logs, make_run, write_run_log):
+    path = str(logs / "run_0.csv")
+    write_run_log(path, *make_run(200, failing=(0, 1), seed=0), run_start=datetime(2025, 3, 1, 12, tzinfo=timezone.utc))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert store.ingest_folder(str(logs)) == 1
+
+    result = store.query("runs", [("filename", "==", "run_0.csv")], aggregates={"passed": "max", "run_id": "count"})
+    assert result["run_id_count"].tolist() == [1] and result["passed_max"].tolist() == [False]
+    assert store.query("runs", aggregates={"run_id": "count"})["run_id_count"].tolist() == [6]
+    assert store.index["partitions"]["mode=Gauge_Tube/month=2025-03"]["runs"] == 3
+
+
+def test_compaction_keeps_every_row(store, logs, make_run, write_run_log, monkeypatch):
+    monkeypatch.setattr(fleetStore, "COMPACT_AFTER", 3)
+    before = store.query("bins", aggregates={"points": "sum"})
+    for i in range(6, 9):
+        write_run_log(str(logs / f"run_{i}.csv"), *make_run(200, seed=i), run_start=datetime(2025, 3, 20 + i, 12, tzinfo=timezone.utc))
+    store.ingest_folder(str(logs))
+
+    partition = "mode=Gauge_Tube/month=2025-03"
+    assert len(store.partition_files(partition, "bins")) == 1
+    after = store.query("bins", aggregates={"points": "sum"})
+    assert after["points_sum"].iloc[0] == before["points_sum"].iloc[0] + 3 * 200 * 8
+    assert store.query("runs", [("month", "==", "2025-03")], aggregates={"run_id": "count"})["run_id_count"].tolist() == [6]
+
+
+def test_two_stores_on_the_same_root(tmp_path, logs, limit_profile):
+    root = str(tmp_path / ".fleet")
+    first = FleetStore(root, limit_profile, LogReader())
+    second = FleetStore(root, limit_profile, LogReader())  # Its index is read before the first store ingests
+    runs = sorted(str(path) for path in logs.glob("run_*.csv"))
+    threads = [threading.Thread(target=lambda: first.ingest_run(runs[0]))]
+    threads += [threading.Thread(target=lambda: second.ingest_run(runs[1]))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    first.ingest_run(runs[2])
+    second.ingest_run(runs[3])
+
+    index = FleetStore(root).index
+    assert len(index["runs"]) == 4 and index["next_run_id"] == 4
+    assert sorted(entry["run_id"] for entry in index["runs"].values()) == [0, 1, 2, 3]
+    result = first.query("runs", aggregates={"run_id": "count"})
+    assert result["run_id_count"].tolist() == [4]
+    assert second.query("sensors", aggregates={"run_id": "count"})["run_id_count"].tolist() == [4 * 8]
+    assert not os.path.exists(os.path.join(root, "index.lock"))
+
+
+def test_lock_of_a_dead_process_is_taken_over(tmp_path, logs, limit_profile):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    store = FleetStore(str(tmp_path / ".fleet"), limit_profile, LogReader())
+    os.makedirs(store.root)
+    with open(store.lock_path, "w") as file:
+        file.write(str(dead.pid))
+    assert store.ingest_run(str(logs / "run_0.csv"))
+    assert not os.path.exists(store.lock_path)
+
+
+def test_lock_of_a_running_process_is_waited_for(tmp_path, logs, limit_profile):
+    store = FleetStore(str(tmp_path / ".fleet"), limit_profile, LogReader())
+    with FleetStore(store.root).index_lock():
+        with pytest.raises(TimeoutError):
+            with store.index_lock(timeout=0.2):
+                pass
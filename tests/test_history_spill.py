@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from utils.historySpill import HistorySpill
+
+
+def test_only_chunks_in_the_window_are_read():
+    spill = HistorySpill(min_chunk_rows=100)
+    pressures = np.logspace(3, -5, 1000)
+    voltages = np.arange(8000.0).reshape(1000, 8)
+    for first in range(0, 1000, 100):
+        spill.append(pressures[first:first + 100], voltages[first:first + 100])
+    assert len(spill) == 1000 and len(spill.chunks) == 10
+    assert spill.pressure_range() == pytest.approx((1e-5, 1e3))
+
+    p, v = spill.read((1e-2, 1e-1))
+    assert 100 <= len(p) <= 300  # Only the chunks overlapping the window
+    inside = (pressures >= 1e-2) & (pressures <= 1e-1)
+    assert set(pressures[inside]) <= set(p)
+    assert np.array_equal(v, voltages[np.isin(pressures, p)])
+
+
+def test_small_evictions_are_merged():
+    spill = HistorySpill(min_chunk_rows=100)
+    for first in range(0, 250, 10):
+        spill.append(np.full(10, 10.0 ** -first), np.zeros((10, 8)))
+    assert [chunk[1] for chunk in spill.chunks] == [100, 100, 50]
+
+
+def test_reset():
+    spill = HistorySpill()
+    spill.append([1.0], np.zeros((1, 8)))
+    spill.reset()
+    assert len(spill) == 0 and spill.pressure_range() is None
+    assert spill.read((0.1, 10))[1].shape == (0, 8)
@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pytest
+
+from utils.logCache import LogCache
+from utils.logReader import LogReader
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LogCache(str(tmp_path / ".cache"), settle_s=0)
+
+
+@pytest.fixture
+def log(tmp_path, make_run, write_run_log):
+    path = str(tmp_path / "run_1.csv")
+    write_run_log(path, *make_run(50))
+    return path
+
+
+def columns():
+    return {"pressure": np.arange(3.0)}
+
+
+def test_sidecar_is_reused_while_the_log_is_unchanged(cache, log):
+    assert cache.load(log) is None
+    cache.store(log, columns())
+    assert cache.load(log)["pressure"].tolist() == [0.0, 1.0, 2.0]
+
+
+def test_size_change_invalidates(cache, log):
+    cache.store(log, columns())
+    with open(log, "a") as file:
+        file.write("1,2,3,4,5,6,7,8,1e-3,9\n")
+    assert cache.load(log) is None
+
+
+def test_touched_log_with_the_same_contents_is_still_valid(cache, log):
+    cache.store(log, columns())
+    stat = os.stat(log)
+    os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.load(log) is not None
+
+
+def test_same_size_different_contents_invalidates(cache, log):
+    cache.store(log, columns())
+    stat = os.stat(log)
+    with open(log, "r+b") as file:
+        file.seek(-3, os.SEEK_END)
+        last = file.read(1)
+        file.seek(-3, os.SEEK_END)
+        file.write(b"8" if last != b"8" else b"7")
+    os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert os.path.getsize(log) == stat.st_size
+    assert cache.load(log) is None
+
+
+def test_log_still_being_written_is_not_cached(tmp_path, log):
+    cache = LogCache(str(tmp_path / ".cache"), settle_s=60)
+    cache.store(log, columns())
+    assert not os.path.exists(cache.sidecar_path(log))
+
+
+def test_least_recently_used_sidecars_are_evicted(tmp_path, make_run, write_run_log):
+    cache = LogCache(str(tmp_path / ".cache"), settle_s=0)
+    logs = []
+    for i in range(3):
+        logs.append(str(tmp_path / f"run_{i}.csv"))
+        write_run_log(logs[-1], *make_run(20))
+        cache.store(logs[-1], {"pressure": np.random.default_rng(i).random(20000)})
+        os.utime(cache.sidecar_path(logs[-1]), (i, i))
+    cache.max_bytes = os.path.getsize(cache.sidecar_path(logs[0])) * 2.5
+    cache.evict()
+    assert [os.path.exists(cache.sidecar_path(log)) for log in logs] == [False, True, True]
+
+
+def test_reader_uses_the_sidecar(cache, log, limit_profile):
+    run = LogReader(log_cache=cache, limit_profile=limit_profile).read_run(log)
+    cached = LogReader(log_cache=cache).load_run(os.path.abspath(log), [log])
+    assert np.array_equal(cached.voltages, run.voltages)
+    assert limit_profile.key in cached.pass_masks
@@ -0,0 +1,31 @@
+import logging
+
+from utils.logManager import RateLimitFilter
+
+
+def record(msg, *args, level=logging.WARNING):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+def test_repeats_with_different_arguments_are_throttled():
+    rate_limit = RateLimitFilter(interval=60)
+    assert rate_limit.filter(record("Invalid data format received: %s", "a,b"))
+    assert not rate_limit.filter(record("Invalid data format received: %s", "c,d"))
+    assert not rate_limit.filter(record("Invalid data format received: %s", "e,f"))
+    assert rate_limit.filter(record("Another message"))
+    assert rate_limit.filter(record("Invalid data format received: %s", "g", level=logging.ERROR))
+
+
+def test_suppressed_count_is_reported():
+    rate_limit = RateLimitFilter(interval=60)
+    rate_limit.filter(record("Lost %d samples", 1))
+    rate_limit.filter(record("Lost %d samples", 2))
+    rate_limit.last_emitted[("test", logging.WARNING, "Lost %d samples")] = (0.0, 1)  # The interval has passed
+    next_record = record("Lost %d samples", 3)
+    assert rate_limit.filter(next_record)
+    assert next_record.getMessage() == "Lost 3 samples (suppressed 1 similar messages)"
+
+
+def test_zero_interval_disables_the_limit():
+    rate_limit = RateLimitFilter(interval=0)
+    assert all(rate_limit.filter(record("Same")) for _ in range(3))
@@ -0,0 +1,40 @@
+import os
+import json
+import numpy as np
+import pytest
+
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def test_observe_many_matches_observe():
+    values = np.random.default_rng(0).random(3000)
+    one_by_one, batched = Histogram(window=1024), Histogram(window=1024)
+    for value in values:
+        one_by_one.observe(float(value))
+    batched.observe_many(values[:1000])
+    batched.observe_many(values[1000:])
+    batched.observe_many(np.array([]))
+    assert batched.snapshot() == pytest.approx(one_by_one.snapshot())
+    assert list(batched.recent) == list(one_by_one.recent)
+
+
+def test_registry_returns_the_same_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("a") is registry.counter("a")
+    assert registry.histogram("a") is not registry.counter("a")
+    registry.counter("a").inc(3)
+    assert registry.counter("a").snapshot() == 3
+
+
+def test_snapshot_file_is_rotated(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("lines").inc()
+    path = str(tmp_path / "metrics.jsonl")
+    registry.write_snapshot(path)
+    max_bytes = os.path.getsize(path) * 2
+    for _ in range(20):
+        registry.write_snapshot(path, max_bytes=max_bytes, backup_count=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics.jsonl", "metrics.jsonl.1", "metrics.jsonl.2"]
+    for name in ("metrics.jsonl", "metrics.jsonl.1"):
+        with open(tmp_path / name) as file:
+            assert len([json.loads(line) for line in file]) <= 2
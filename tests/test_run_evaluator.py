@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from utils.runEvaluator import RunEvaluator
+from utils.yieldAnalysis import classify_run, DEFAULT_BIN_EDGES, PASS, FAIL, NO_DATA, VERDICT_NAMES
+from utils.voutCheck import VOUT_CAPTURE_PRESSURE
+
+
+@pytest.mark.parametrize("failing", [(), (2,), (0, 5, 7)])
+def test_classify_run_matches_the_live_evaluation(limit_profile, make_run, failing):
+    pressures, voltages = make_run(failing=failing)
+    evaluator = RunEvaluator(limit_profile)
+    for first in range(0, len(pressures), 32):
+        evaluator.evaluate(pressures[first:first + 32], voltages[first:first + 32], "Gauge Tube")
+
+    verdicts, bin_failed, bin_channels = classify_run(
+        pressures, voltages, limit_profile.lower_params[None], limit_profile.upper_params[None], DEFAULT_BIN_EDGES
+    )
+    assert [VERDICT_NAMES[int(verdict)] for verdict in verdicts[0]] == evaluator.verdicts
+    assert (verdicts[0] == FAIL).sum() == len(failing)
+    assert bin_failed.max() == len(failing)
+    assert bin_channels.max() == 8
+
+
+def test_classify_run_against_several_candidates(limit_profile, make_run):
+    pressures, voltages = make_run(failing=(1,))
+    # A much wider band passes everything
+    wide_lower = limit_profile.lower_params.copy()
+    wide_upper = limit_profile.upper_params.copy()
+    wide_lower[1] *= 0.1
+    wide_upper[1] *= 10
+    verdicts, _, _ = classify_run(
+        pressures, voltages, np.array([limit_profile.lower_params, wide_lower]),
+        np.array([limit_profile.upper_params, wide_upper]), DEFAULT_BIN_EDGES
+    )
+    assert verdicts[0].tolist() == [PASS, FAIL] + [PASS] * 6
+    assert verdicts[1].tolist() == [PASS] * 8
+
+
+def test_channels_without_data(limit_profile, make_run):
+    pressures, voltages = make_run()
+    voltages[:, 6] = np.nan
+    verdicts, _, _ = classify_run(
+        pressures, voltages, limit_profile.lower_params[None], limit_profile.upper_params[None], DEFAULT_BIN_EDGES
+    )
+    assert verdicts[0, 6] == NO_DATA and (verdicts[0, :6] == PASS).all()
+
+
+def test_fail_is_latched_and_vout_captured_once(limit_profile, make_run):
+    pressures, voltages = make_run(failing=(3,))
+    evaluator = RunEvaluator(limit_profile)
+    changed, captured = evaluator.evaluate(pressures[:100], voltages[:100], "Gauge Tube")
+    assert changed == list(range(8)) and captured == []
+
+    low = (pressures <= 1e-2) & (pressures > VOUT_CAPTURE_PRESSURE)
+    changed, _ = evaluator.evaluate(pressures[low], voltages[low], "Gauge Tube")
+    assert changed == [3]
+    changed, _ = evaluator.evaluate(pressures[:10], voltages[:10], "Gauge Tube")
+    assert changed == [] and evaluator.verdicts[3] == "Fail"
+
+    below = pressures <= VOUT_CAPTURE_PRESSURE
+    _, captured = evaluator.evaluate(pressures[below], voltages[below], "Gauge Tube")
+    assert captured == list(range(8)) and evaluator.vout_captured() == [True] * 8
+    _, captured = evaluator.evaluate(pressures[below], voltages[below], "Gauge Tube")
+    assert captured == []
+    evaluator.reset()
+    assert evaluator.verdicts == [None] * 8 and evaluator.vout_captured() == [False] * 8
@@ -0,0 +1,84 @@
+import csv
+import numpy as np
+
+from utils.runWriter import (
+    CSV_HEADER, RunWriter, SegmentCompressor, run_base_filename, run_segment_files, segment_filename, find_runs
+)
+from utils.logCache import LogCache
+from utils.logReader import LogReader
+
+
+def row(i):
+    return [1000.0 + i] * 8 + [10.0 ** (3 - i / 100), i * 0.1]
+
+
+def read_back(path, tmp_path):
+    return LogReader(log_cache=LogCache(str(tmp_path / ".cache"), settle_s=0)).parse_run(path, run_segment_files(path))
+
+
+def test_segment_names():
+    assert segment_filename("Logs/run_5.csv", 0) == "Logs/run_5.csv"
+    assert segment_filename("Logs/run_5.csv", 2) == "Logs/run_5.part002.csv"
+    assert run_base_filename("Logs/run_5.part002.csv.gz") == "Logs/run_5.csv"
+
+
+def test_rotation_and_gzip_segments_read_as_one_run(tmp_path):
+    path = str(tmp_path / "run_1.csv")
+    compressor = SegmentCompressor()
+    writer = RunWriter(path, max_segment_bytes=2000, compression="gzip", compressor=compressor)
+    for i in range(100):
+        writer.write_row(row(i))
+    writer.close()
+    compressor.jobs.join()
+
+    segments = run_segment_files(path)
+    assert len(segments) > 2
+    assert all(segment.endswith(".gz") for segment in segments[1:])
+    assert find_runs(str(tmp_path)) == [path]
+
+    run = read_back(path, tmp_path)
+    assert run.voltages[:, 0].tolist() == [1000.0 + i for i in range(100)]
+    assert np.allclose(run.time, np.arange(100) * 0.1)
+
+
+def test_unsegmented_run_stays_plain_csv(tmp_path):
+    path = str(tmp_path / "run_1.csv")
+    writer = RunWriter(path, compressor=SegmentCompressor())
+    writer.write_row(row(0))
+    writer.close()
+    assert run_segment_files(path) == [path]
+
+
+def test_appending_continues_after_the_last_segment(tmp_path):
+    path = str(tmp_path / "run_1.csv")
+    writer = RunWriter(path, max_segment_bytes=500, compression="none")
+    for i in range(20):
+        writer.write_row(row(i))
+    writer.close()
+    segments = run_segment_files(path)
+
+    writer = RunWriter(path, max_segment_bytes=500, compression="none")
+    writer.write_row(row(20))
+    writer.close()
+    assert run_segment_files(path)[:len(segments)] == segments
+    assert read_back(path, tmp_path).voltages[:, 0].tolist() == [1000.0 + i for i in range(21)]
+
+
+def test_old_log_with_a_different_header_is_not_appended_to(tmp_path):
+    path = str(tmp_path / "run_1.csv")
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER[:9])
+        writer.writerow(row(0)[:9])
+
+    writer = RunWriter(path, compression="none")
+    writer.write_row(row(1))
+    writer.close()
+
+    segments = run_segment_files(path)
+    assert segments == [path, segment_filename(path, 1)]
+    with open(path, newline="") as file:
+        assert len(list(csv.reader(file))) == 2  # Untouched
+    with open(segments[1], newline="") as file:
+        assert next(csv.reader(file)) == CSV_HEADER
+    assert read_back(path, tmp_path).voltages[:, 0].tolist() == [1000.0, 1001.0]
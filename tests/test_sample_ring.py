@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+import uuid
+import pytest
+
+from utils.sampleRing import SampleRing, SampleRingReader, OWNER_PID, process_alive
+
+
+@pytest.fixture
+def ring():
+    ring = SampleRing.create(capacity=8, width=3)
+    yield ring
+    ring.close()
+
+
+def rows(first, count):
+    return [[float(seq), 0.0, 0.0] for seq in range(first, first + count)]
+
+
+def test_reader_gets_each_sample_once(ring):
+    reader = SampleRingReader(ring, from_start=True)
+    for row in rows(0, 5):
+        ring.write(row)
+    assert reader.read()[:, 0].tolist() == [0, 1, 2, 3, 4]
+    assert len(reader.read()) == 0
+    ring.write(rows(5, 1)[0])
+    assert reader.read()[:, 0].tolist() == [5]
+    assert reader.lost == 0
+
+
+def test_wraparound_keeps_order(ring):
+    reader = SampleRingReader(ring, from_start=True)
+    for first in range(0, 30, 6):
+        for row in rows(first, 6):
+            ring.write(row)
+        assert reader.read()[:, 0].tolist() == list(range(first, first + 6))
+    assert ring.write_seq == 30
+    assert reader.lost == 0
+
+
+def test_overrun_reports_lost_samples(ring):
+    reader = SampleRingReader(ring, from_start=True)
+    for row in rows(0, 20):
+        ring.write(row)
+    samples = reader.read()
+    assert samples[:, 0].tolist() == list(range(12, 20))  # The last `capacity` samples
+    assert reader.lost == 12
+    assert reader.next_seq == 20
+
+
+def test_new_reader_starts_at_the_write_position(ring):
+    for row in rows(0, 3):
+        ring.write(row)
+    reader = SampleRingReader(ring)
+    assert len(reader.read()) == 0
+    ring.write(rows(3, 1)[0])
+    assert reader.read()[:, 0].tolist() == [3]
+
+
+def test_attached_ring_sees_the_owners_samples(ring):
+    other = SampleRing.attach(ring.name, untrack=False)  # Same process, same resource tracker
+    try:
+        ring.write([1.0, 2.0, 3.0])
+        assert SampleRingReader(other, from_start=True).read().tolist() == [[1.0, 2.0, 3.0]]
+    finally:
+        other.close()
+
+
+OWNER_SCRIPT = """
+import sys
+from utils.sampleRing import SampleRing
+ring = SampleRing.create(capacity=4, width=3, name=sys.argv[1])
+ring.write([1.0, 2.0, 3.0])
+print("ready", flush=True)
+sys.stdin.readline()
+ring.close()
+"""
+
+
+def test_named_ring_of_a_running_owner_is_not_taken_over():
+    name = f"test_ring_{uuid.uuid4().hex[:8]}"
+    owner = subprocess.Popen(
+        [sys.executable, "-c", OWNER_SCRIPT, name], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()}
+    )
+    try:
+        assert owner.stdout.readline().strip() == "ready"
+        with pytest.raises(FileExistsError):
+            SampleRing.create(capacity=4, width=3, name=name)
+        # The owner's ring is untouched
+        reader = SampleRing.attach(name)
+        try:
+            assert reader.write_seq == 1 and int(reader.header[OWNER_PID]) == owner.pid
+        finally:
+            reader.close()
+    finally:
+        owner.communicate("\n", timeout=10)
+    assert owner.returncode == 0
+
+
+def test_named_ring_of_a_dead_owner_is_replaced():
+    name = f"test_ring_{uuid.uuid4().hex[:8]}"
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    assert not process_alive(dead.pid)
+
+    stale = SampleRing.create(capacity=4, width=3, name=name)
+    stale.write([1.0, 2.0, 3.0])
+    stale.header[OWNER_PID] = dead.pid
+    stale.owner = False  # Left behind, as if its owner crashed
+    stale.close()
+
+    ring = SampleRing.create(capacity=4, width=3, name=name)
+    try:
+        assert ring.write_seq == 0
+        assert int(ring.header[OWNER_PID]) == os.getpid()
+    finally:
+        ring.close()
@@ -0,0 +1,75 @@
+import csv
+import pytest
+
+from utils.stationQueue import StationQueue, PENDING, RUNNING, DONE, SKIPPED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = StationQueue(summary_folder=str(tmp_path))
+    for serial_number in ("SN1", "SN2", "SN3"):
+        assert queue.add(serial_number)
+    return queue
+
+
+def test_blank_and_duplicate_pending_serials_are_rejected(queue):
+    assert not queue.add("  ")
+    assert not queue.add("SN1 ")
+    assert [unit.serial_number for unit in queue.pending()] == ["SN1", "SN2", "SN3"]
+
+
+def test_units_run_in_order(queue):
+    queue.begin_batch()
+    unit = queue.next_unit()
+    assert unit.serial_number == "SN1" and queue.position(unit) == 1
+    queue.start_unit(unit, "Logs/run_1.csv")
+    assert unit.state == RUNNING and queue.current() is unit
+    assert queue.next_unit().serial_number == "SN2"
+
+    queue.finish_unit(unit, "all_passed", ["Pass"] * 8)
+    assert unit.state == DONE and unit.result == "Pass" and unit.duration_s is not None
+    assert queue.current() is None
+    assert queue.units_per_hour() > 0
+
+
+def test_results(queue):
+    queue.begin_batch()
+    verdicts = [["Pass"] * 8, ["Pass"] * 7 + ["Fail"], ["Pass"] * 7 + [None]]
+    for unit, unit_verdicts in zip(list(queue.units), verdicts):
+        queue.start_unit(unit, f"{unit.serial_number}.csv")
+        queue.finish_unit(unit, "operator", unit_verdicts)
+    assert [unit.result for unit in queue.units] == ["Pass", "Fail", "Incomplete"]
+
+
+def test_skip_and_clear(queue):
+    queue.skip_unit(queue.next_unit())
+    assert queue.units[0].state == SKIPPED
+    assert queue.next_unit().serial_number == "SN2"
+
+    unit = queue.next_unit()
+    queue.start_unit(unit, "run.csv")
+    queue.clear()
+    assert [unit.state for unit in queue.units] == [SKIPPED, RUNNING]
+    assert queue.next_unit() is None
+
+
+def test_tested_serial_can_be_queued_again(queue):
+    unit = queue.next_unit()
+    queue.start_unit(unit, "run.csv")
+    queue.finish_unit(unit, "operator", ["Fail"] * 8)
+    assert queue.add("SN1")
+    assert queue.units[-1].state == PENDING
+
+
+def test_finished_units_are_appended_to_the_batch_summary(queue):
+    queue.begin_batch()
+    for unit in list(queue.units[:2]):
+        queue.start_unit(unit, f"{unit.serial_number}.csv")
+        queue.finish_unit(unit, "all_passed", ["Pass"] * 8)
+    with open(queue.summary_filename, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0][:5] == ["Serial Number", "Result", "Stop Reason", "Duration [s]", "Log File"]
+    assert [row[0] for row in rows[1:]] == ["SN1", "SN2"]
+
+    queue.end_batch()
+    assert queue.batch_id is None and queue.units_per_hour() == 0.0
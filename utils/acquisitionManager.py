@@ -0,0 +1,174 @@
+import time
+import queue
+import logging
+import itertools
+import multiprocessing
+from utils.sampleRing import SampleRing, SampleRingReader
+from utils.acquisitionWorker import acquisition_main
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class AcquisitionManager:
+    """
+    GUI-side handle on the acquisition process.
+
+    The acquisition process owns the serial port and the run log and streams samples into a
+    shared-memory ring buffer, so a slow redraw or a modal dialog in the GUI can no longer
+    delay serial reads. Commands are sent over a queue and block until the process replies.
+    """
+    def __init__(self, ring_capacity=65536, ring_name=None):
+        self.ring_capacity = ring_capacity
+        self.ring_name = ring_name  # A fixed name lets other local tools read the live samples
+        self.process = None
+        self.ring = None
+        self.reader = None
+        self.cmd_queue = None
+        self.event_queue = None
+        self.events = []  # Asynchronous events received while waiting for a reply
+        self.request_ids = itertools.count()
+        self.replay_file = None  # Recorded run to play back instead of opening the COM port
+        self.replay_speed = 1.0
+        self.is_connected = False
+
+    def start(self, log_level="INFO", log_rate_limit_s=1.0):
+        """
+        Create the sample ring and start the acquisition process.
+        """
+        # Always spawn: forking a process that has Tk running is not safe
+        context = multiprocessing.get_context("spawn")
+        self.ring = SampleRing.create(self.ring_capacity, name=self.ring_name)
+        self.reader = SampleRingReader(self.ring)
+        self.cmd_queue = context.Queue()
+        self.event_queue = context.Queue()
+        self.process = context.Process(
+            target=acquisition_main,
+            args=(self.cmd_queue, self.event_queue, self.ring.name, log_level, log_rate_limit_s),
+            name="acquisition",
+            daemon=True
+        )
+        self.process.start()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def request(self, command, *args, timeout=15):
+        """
+        Send a command to the acquisition process and wait for its result.
+        Returns None if the process does not reply in time.
+        """
+        if not self.is_alive():
+            logger.error("Acquisition process is not running.")
+            return None
+
+        request_id = next(self.request_ids)
+        self.cmd_queue.put((request_id, command, args))
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.is_alive():
+                logger.error("No reply from acquisition process to %s.", command)
+                return None
+            try:
+                event = self.event_queue.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if event[0] == "reply" and event[1] == request_id:
+                return event[2]
+            self.events.append(event)
+
+    def set_replay(self, filename, speed=1.0):
+        """
+        Play back a recorded run instead of talking to the Arduino on the next initialize().
+        Pass filename=None to go back to the real device. A speed of 0 replays as fast as possible.
+        """
+        self.replay_file = filename
+        self.replay_speed = speed
+
+    def initialize(self):
+        """
+        Open the serial port (or replay) in the acquisition process and perform the handshake.
+
+        Returns:
+            list or bool: The initial error status, or False if initialization failed.
+        """
+        error_status = self.request("connect", self.replay_file, self.replay_speed)
+        self.is_connected = bool(error_status)
+        return error_status or False
+
+    def start_test(self, filename, logging_enabled, writer_options):
+        """
+        Start a test and begin streaming (and, if enabled, logging) samples.
+
+        Returns:
+            int or None: perf_counter_ns at which the run started, or None if the start failed.
+        """
+        # Only samples from this run should reach the plots
+        self.reader = SampleRingReader(self.ring)
+        return self.request("start_test", filename, logging_enabled, writer_options, timeout=30)
+
+    def stop_test(self):
+        """
+        Stop the test and finalize the run log.
+        """
+        return self.request("stop_test")
+
+    def heartbeat(self):
+        """
+        Returns:
+            tuple: (alive, latest error status list or None)
+        """
+        result = self.request("heartbeat", timeout=5)
+        return tuple(result) if result else (False, None)
+
+    def send_command(self, command):
+        return self.request("send", command)
+
+    def close(self):
+        """
+        Close the serial connection (the acquisition process keeps running).
+        """
+        self.is_connected = False
+        if self.is_alive():
+            self.request("close")
+
+    def shutdown(self):
+        """
+        Stop the acquisition process and release the sample ring.
+        """
+        if self.is_alive():
+            self.request("shutdown", timeout=5)
+            self.process.join(timeout=5)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def read_samples(self):
+        """
+        Return the samples acquired since the previous call, laid out as utils.sampleRing.SAMPLE_FIELDS.
+        """
+        registry.gauge("ring.backlog").set(self.ring.write_seq - self.reader.next_seq)
+        samples = self.reader.read()
+        registry.gauge("ring.samples_lost").set(self.reader.lost)
+        return samples
+
+    def poll_events(self):
+        """
+        Return asynchronous events from the acquisition process, e.g. ("error_status", [...]).
+        Metrics events are merged into the registry and not returned.
+        """
+        while True:
+            try:
+                self.events.append(self.event_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        events, self.events = self.events, []
+        result = []
+        for event in events:
+            if event[0] == "metrics":
+                registry.set_remote("acquisition", event[1])
+            elif event[0] != "reply":
+                result.append(event)
+        return result
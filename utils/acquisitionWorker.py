@@ -0,0 +1,217 @@
+import os
+import time
+import queue
+import logging
+from utils.serialManager import SerialManager
+from utils.runWriter import RunWriter, SegmentCompressor
+from utils.sampleRing import SampleRing
+from utils.metrics import registry
+from utils.logManager import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_sample_line(line):
+    """
+    Parse a data line from the Arduino.
+
+    Returns:
+        tuple: (sensor voltages [mV], pressure [mbar]) or None if the line is not a valid sample.
+    """
+    data_parts = line.split(",")
+    if len(data_parts) != 9:
+        return None
+    try:
+        sensor_voltages = [(float(value) / 300) * 1000 for value in data_parts[:8]]  # Convert volts to millivolts
+        pressure = float(data_parts[8])  # Pressure remains unchanged
+    except ValueError:
+        return None
+    return sensor_voltages, pressure
+
+
+class AcquisitionWorker:
+    """
+    Runs in its own process and owns the serial port and the run log.
+
+    Samples are read, timestamped, parsed, logged and published to a shared-memory SampleRing
+    as fast as they arrive, so nothing the GUI does can hold up data capture. The GUI drives
+    the worker with (request_id, command, args) tuples on cmd_queue and receives
+    ("reply", request_id, result) tuples plus asynchronous events on event_queue.
+    """
+    def __init__(self, cmd_queue, event_queue, ring_name, log_level="INFO", log_rate_limit_s=1.0):
+        self.cmd_queue = cmd_queue
+        self.event_queue = event_queue
+        self.ring_name = ring_name
+        self.log_level = log_level
+        self.log_rate_limit_s = log_rate_limit_s
+        self.ser_manager = SerialManager()
+        self.compressor = SegmentCompressor()
+        self.ring = None
+        self.run_writer = None
+        self.run_start_ns = None
+        self.streaming = False
+        self.running = True
+        self.last_metrics = 0.0
+
+    def run(self):
+        log_listener = setup_logging(self.log_level, self.log_rate_limit_s, log_file=os.path.join("Logs", "acquisition.log"))
+        self.ring = SampleRing.attach(self.ring_name, untrack=False)  # Shares the GUI process's resource tracker
+        logger.info("Acquisition process started.")
+        try:
+            while self.running:
+                self.handle_commands()
+                received = self.read_samples() if self.streaming else 0
+                self.publish_metrics()
+                if not received:
+                    time.sleep(0.002)  # Idle: don't spin while waiting for the next line
+        finally:
+            self.close()
+            self.ring.close()
+            logger.info("Acquisition process stopped.")
+            log_listener.stop()
+
+    def handle_commands(self):
+        """
+        Execute any commands sent by the GUI and reply with their results.
+        """
+        while True:
+            try:
+                request_id, command, args = self.cmd_queue.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                result = getattr(self, f"cmd_{command}")(*args)
+            except Exception as e:
+                logger.error("Error executing acquisition command %s: %s", command, e)
+                result = None
+            self.event_queue.put(("reply", request_id, result))
+
+    def cmd_connect(self, replay_file, replay_speed):
+        self.close()
+        self.ser_manager.set_replay(replay_file, replay_speed)
+        return self.ser_manager.initialize()
+
+    def cmd_start_test(self, filename, logging_enabled, writer_options):
+        if not self.ser_manager.start_test():
+            return None
+        self.run_start_ns = time.perf_counter_ns()
+        if logging_enabled:
+            self.run_writer = RunWriter(filename, compressor=self.compressor, **writer_options)
+        self.streaming = True
+        return self.run_start_ns
+
+    def cmd_stop_test(self):
+        self.streaming = False
+        self.ser_manager.stop_test()
+        self.close_run()
+        return True
+
+    def cmd_heartbeat(self):
+        if not self.ser_manager.ser:
+            return False, None
+        try:
+            return self.ser_manager.heartbeat()
+        except Exception as e:
+            logger.error("Heartbeat error: %s", e)
+            return False, None
+
+    def cmd_send(self, command):
+        self.ser_manager.send_command(command)
+        return True
+
+    def cmd_close(self):
+        self.close()
+        return True
+
+    def cmd_shutdown(self):
+        self.running = False
+        return True
+
+    def read_samples(self, max_lines=1000):
+        """
+        Read, log and publish every line waiting on the serial port.
+
+        Returns:
+            int: Number of lines read.
+        """
+        lines = 0
+        try:
+            while lines < max_lines and self.ser_manager.ser.in_waiting > 0:
+                raw_data, received_ns = self.ser_manager.read_line()
+                lines += 1
+                registry.counter("serial.lines_read").inc()
+                logger.debug("Serial line received: %s", raw_data)
+                if raw_data:
+                    self.handle_line(raw_data, received_ns)
+        except Exception as e:
+            logger.error("Error reading serial data: %s", e)
+            self.streaming = False
+            self.close_run()
+            self.event_queue.put(("acquisition_error", str(e)))
+        return lines
+
+    def handle_line(self, raw_data, received_ns):
+        # Check if the response contains error status
+        if "Error status format" in raw_data:
+            # Parse the next line for error status
+            error_status = self.ser_manager.ser.readline().decode('utf-8').strip()
+            logger.info("Error status: %s", error_status)
+            self.event_queue.put(("error_status", error_status.split(", ")))
+            return
+
+        sample = parse_sample_line(raw_data)
+        if sample is None:
+            registry.counter("ingest.parse_failures").inc()
+            logger.warning("Invalid data format received: %s", raw_data)
+            return
+        sensor_voltages, pressure = sample
+
+        # Ignore zero pressure values
+        if pressure == 0:
+            logger.warning("Pressure value is zero. Ignoring this data point.")
+            return
+
+        registry.counter("ingest.samples").inc()
+        registry.histogram("latency.parse_seconds").observe((time.perf_counter_ns() - received_ns) / 1e9)
+
+        elapsed_s = round((received_ns - self.run_start_ns) / 1e9, 6)
+        if self.run_writer is not None:
+            with registry.histogram("log.csv_write_seconds").time():
+                self.run_writer.write_row(sensor_voltages + [pressure, elapsed_s])
+            registry.histogram("latency.log_seconds").observe((time.perf_counter_ns() - received_ns) / 1e9)
+
+        self.ring.write([received_ns] + sensor_voltages + [pressure, elapsed_s])
+
+    def publish_metrics(self, interval_s=1.0):
+        """
+        Periodically send this process's metrics to the GUI for the Diagnostics tab.
+        """
+        now = time.monotonic()
+        if now - self.last_metrics < interval_s:
+            return
+        self.last_metrics = now
+        registry.gauge("ring.write_seq").set(self.ring.write_seq)
+        self.event_queue.put(("metrics", registry.snapshot()))
+
+    def close_run(self):
+        if self.run_writer is not None:
+            self.run_writer.close()
+            self.run_writer = None
+
+    def close(self):
+        if self.streaming:
+            self.streaming = False
+            try:
+                self.ser_manager.send_command("r")
+            except Exception as e:
+                logger.error("Error stopping test: %s", e)
+        self.close_run()
+        self.ser_manager.close()
+
+
+def acquisition_main(cmd_queue, event_queue, ring_name, log_level, log_rate_limit_s):
+    """
+    Entry point of the acquisition process.
+    """
+    AcquisitionWorker(cmd_queue, event_queue, ring_name, log_level, log_rate_limit_s).run()
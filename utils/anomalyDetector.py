@@ -0,0 +1,245 @@
+import logging
+import numpy as np
+from scipy.signal import lfilter
+from utils.limitProfile import DEFAULT_PERCENTAGE_ADJUSTMENTS
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Alarm kinds, in the order they are listed
+DRIFT = "drift"  # EWMA of the residual close to a limit
+SHIFT = "shift"  # CUSUM of the residual, a sustained change from the channel's baseline
+NOISY = "noisy"  # Large sample-to-sample steps of the residual
+STUCK = "stuck"  # Identical readings while the LUT average moves
+SATURATED = "saturated"  # Pinned at a rail or beyond anything the limits allow
+FLATLINED = "flatlined"  # Not following the LUT average over a pressure decade
+ALARMS = (DRIFT, SHIFT, NOISY, STUCK, SATURATED, FLATLINED)
+
+
+def ewma(values, smoothing, previous):
+    """
+    EWMA along the rows of values, continuing from the previous row's EWMA.
+    """
+    filtered, _ = lfilter([smoothing], [1, smoothing - 1], values, axis=0, zi=((1 - smoothing) * previous)[None, :])
+    return filtered
+
+
+def cusum(increments, previous):
+    """
+    One-sided CUSUM S = max(0, S + increment) along the rows, continuing from previous.
+    """
+    totals = previous + np.cumsum(increments, axis=0)
+    return totals - np.minimum(0.0, np.minimum.accumulate(totals, axis=0))
+
+
+def run_lengths(flags, increments, previous):
+    """
+    Counter along the rows that adds increments while flags is set and restarts at 0 where it
+    isn't, continuing from previous.
+
+    Returns:
+        tuple: (counts, index of each row's latest unflagged row or -1 if it is in an earlier batch)
+    """
+    rows = np.arange(len(flags))[:, None]
+    last_reset = np.maximum.accumulate(np.where(flags, -1, rows), axis=0)
+    totals = np.cumsum(np.broadcast_to(increments, flags.shape), axis=0)
+    reset_totals = np.take_along_axis(totals, np.maximum(last_reset, 0), axis=0)
+    return np.where(last_reset >= 0, totals - reset_totals, previous + totals), last_reset
+
+
+class AnomalyDetector:
+    """
+    Online drift and fault detection for the live stream, alongside the pass/fail evaluation.
+
+    Each reading is turned into a residual from the LUT average at its pressure, in units of the
+    tolerance the limits are fitted to, so 1.0 is a reading on the edge of the tolerance band
+    whatever the pressure.
+    Per channel the detector keeps an EWMA of the residual (drifting towards a limit), a two-sided
+    CUSUM of the change of its fractional deviation from the LUT average since the warm-up
+    samples (a unit that starts drifting while still well inside the band; a gain error alone
+    keeps the fractional deviation constant), an EWMA of the absolute residual steps and counters
+    for stuck and saturated readings.
+
+    All of it is carried from batch to batch as a few values per channel and every batch is
+    updated with whole-array operations, so each sample costs the same however long the run.
+    Alarms are latched for the rest of the run, like a "Fail" verdict, so that a transient one is
+    still shown when the operator looks.
+    """
+    def __init__(self, lut_pressure, lut_average, percentage_adjustments=DEFAULT_PERCENTAGE_ADJUSTMENTS, sensors=8,
+                 rails=(None, None), ewma_lambda=0.1, ewma_limit=0.7, cusum_k=0.05, cusum_h=1.0, noise_limit=0.5,
+                 stuck_samples=20, stuck_change=0.5, saturated_samples=10, flat_decades=1.0, flat_fraction=0.1, warmup=20):
+        self.sensors = sensors
+        self.ewma_lambda = ewma_lambda
+        self.ewma_limit = ewma_limit  # Alarm when the EWMA is this far towards a limit
+        self.cusum_k = cusum_k  # Change of the fractional deviation allowed before the CUSUM accumulates
+        self.cusum_h = cusum_h  # CUSUM alarm threshold
+        self.noise_limit = noise_limit  # Alarm when the EWMA of the residual steps exceeds this
+        self.stuck_samples = stuck_samples
+        self.stuck_change = stuck_change  # Change of the LUT average a stuck reading must have missed
+        self.saturated_samples = saturated_samples
+        self.flat_decades = flat_decades  # Pressure span over which a channel must follow the LUT average
+        self.flat_fraction = flat_fraction  # Flatlined below this fraction of the expected change
+        self.warmup = warmup  # Samples that set the CUSUM baseline before the residual alarms are armed
+
+        # LUT average and tolerance as functions of log10(pressure), ascending for np.interp
+        log_pressure = np.log10(np.asarray(lut_pressure, dtype=float))
+        order = np.argsort(log_pressure)
+        self.lut_log_pressure = log_pressure[order]
+        self.lut_average = np.asarray(lut_average, dtype=float)[order]
+        self.lut_tolerance = np.abs(self.lut_average * np.asarray(percentage_adjustments, dtype=float)[order])
+
+        # Readings at the rails [mV] count as saturated; without known rails, readings outside
+        # the tolerance band at every LUT pressure do
+        low_rail, high_rail = rails
+        if len(self.lut_log_pressure):
+            low_rail = (self.lut_average - self.lut_tolerance).min() if low_rail is None else low_rail
+            high_rail = (self.lut_average + self.lut_tolerance).max() if high_rail is None else high_rail
+        self.low_rail = -np.inf if low_rail is None else low_rail
+        self.high_rail = np.inf if high_rail is None else high_rail
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the state and the latched alarms so that a new run is watched from scratch.
+        """
+        n = self.sensors
+        self.samples = 0
+        self.ewma = np.zeros(n)
+        self.baseline = np.zeros(n)  # Mean fractional deviation over the warm-up samples
+        self.cusum_high = np.zeros(n)
+        self.cusum_low = np.zeros(n)
+        self.step_ewma = np.zeros(n)
+        self.last_residual = np.zeros(n)
+        self.last_voltage = np.full(n, np.nan)
+        self.last_log_pressure = np.nan
+        self.stuck_count = np.zeros(n)
+        self.stuck_expected = np.zeros(n)  # LUT average when each channel's reading last changed
+        self.saturated_count = np.zeros(n)
+
+        # Span of the readings and of the LUT average since the pressure was last anchored
+        self.anchor_log_pressure = np.nan
+        self.anchor_tolerance = 0.0
+        self.expected_range = [np.inf, -np.inf]
+        self.voltage_min = np.full(n, np.inf)
+        self.voltage_max = np.full(n, -np.inf)
+
+        self.alarms = [set() for _ in range(n)]  # Latched alarm kinds of each sensor
+
+    def update(self, pressures, voltages):
+        """
+        Feed a batch of samples.
+
+        Parameters:
+            pressures (array): Gauge pressures [mbar], shape (n,).
+            voltages (array): Sensor voltages [mV], shape (n, sensors).
+
+        Returns:
+            list: (sensor, alarm) for each alarm raised by this batch.
+        """
+        pressures = np.asarray(pressures, dtype=float)
+        voltages = np.asarray(voltages, dtype=float)
+        valid = pressures > 0  # Gauge dropouts carry no residual
+        if not len(self.lut_log_pressure) or not valid.any():
+            return []
+
+        with registry.histogram("anomaly.update_seconds").time():
+            detected = self.detect(pressures[valid], voltages[valid])
+
+        raised = []
+        for alarm, mask in detected.items():
+            for sensor in np.nonzero(mask)[0]:
+                if alarm not in self.alarms[sensor]:
+                    self.alarms[sensor].add(alarm)
+                    raised.append((int(sensor), alarm))
+                    logger.warning("Sensor %d: %s anomaly", sensor + 1, alarm)
+                    registry.counter(f"anomaly.{alarm}").inc()
+        return raised
+
+    def detect(self, pressures, voltages):
+        """
+        Update the state with a batch of valid samples and return {alarm: sensors it was detected on}.
+        """
+        log_pressures = np.log10(pressures)
+        expected = np.interp(log_pressures, self.lut_log_pressure, self.lut_average)
+        tolerance = np.maximum(np.interp(log_pressures, self.lut_log_pressure, self.lut_tolerance), 1e-9)
+        residuals = (voltages - expected[:, None]) / tolerance[:, None]
+        deviations = voltages / np.maximum(np.abs(expected), 1e-9)[:, None] - 1
+
+        if self.samples == 0:
+            self.ewma = residuals[0].copy()
+            self.last_residual = residuals[0].copy()
+        start, self.samples = self.samples, self.samples + len(pressures)
+        armed = slice(max(0, self.warmup - start - 1), None)  # Rows from the warmup-th sample of the run on
+        detected = {}
+
+        # EWMA of the residual and of its absolute steps
+        lam = self.ewma_lambda
+        ewma_rows = ewma(residuals, lam, self.ewma)
+        steps = np.abs(np.diff(residuals, axis=0, prepend=self.last_residual[None, :]))
+        step_rows = ewma(steps, lam, self.step_ewma)
+        self.ewma, self.step_ewma, self.last_residual = ewma_rows[-1], step_rows[-1], residuals[-1]
+        detected[DRIFT] = (np.abs(ewma_rows[armed]) >= self.ewma_limit).any(axis=0)
+        detected[NOISY] = (step_rows[armed] >= self.noise_limit).any(axis=0)
+
+        # CUSUM of the change of the fractional deviation from the warm-up baseline
+        warming = max(0, min(len(pressures), self.warmup - start))
+        if warming:
+            self.baseline += (deviations[:warming].sum(axis=0) - warming * self.baseline) / (start + warming)
+        change = deviations[warming:] - self.baseline
+        if len(change):
+            high_rows = cusum(change - self.cusum_k, self.cusum_high)
+            low_rows = cusum(-change - self.cusum_k, self.cusum_low)
+            self.cusum_high, self.cusum_low = high_rows[-1], low_rows[-1]
+            detected[SHIFT] = (np.maximum(high_rows, low_rows) >= self.cusum_h).any(axis=0)
+
+        # Identical readings only count while the pressure moves, and only once the LUT average
+        # has moved enough that a working sensor would have changed (not in the flat tails)
+        moved = np.diff(log_pressures, prepend=self.last_log_pressure) != 0
+        repeated = voltages == np.vstack((self.last_voltage, voltages[:-1]))
+        stuck_rows, changed_at = run_lengths(repeated, moved[:, None], self.stuck_count)
+        stuck_expected = np.where(changed_at >= 0, expected[np.maximum(changed_at, 0)], self.stuck_expected)
+        missed_change = np.abs(expected[:, None] - stuck_expected) >= self.stuck_change * tolerance[:, None]
+        detected[STUCK] = ((stuck_rows >= self.stuck_samples) & missed_change).any(axis=0)
+        self.stuck_count, self.stuck_expected = stuck_rows[-1], stuck_expected[-1]
+        self.last_voltage, self.last_log_pressure = voltages[-1].copy(), log_pressures[-1]
+
+        saturated = (voltages <= self.low_rail) | (voltages >= self.high_rail)
+        saturated_rows, _ = run_lengths(saturated, 1, self.saturated_count)
+        detected[SATURATED] = (saturated_rows >= self.saturated_samples).any(axis=0)
+        self.saturated_count = saturated_rows[-1]
+
+        detected[FLATLINED] = self.update_flatline(log_pressures, expected, tolerance, voltages)
+        return detected
+
+    def update_flatline(self, log_pressures, expected, tolerance, voltages):
+        """
+        Compare the span of each channel's readings with the change of the LUT average once the
+        pressure has moved flat_decades from the anchor, checked at the end of each batch.
+        Returns the flatlined channels.
+        """
+        flatlined = np.zeros(self.sensors, dtype=bool)
+        if np.isnan(self.anchor_log_pressure):
+            self.anchor_log_pressure = log_pressures[0]
+            self.anchor_tolerance = tolerance[0]
+
+        self.expected_range = [min(self.expected_range[0], expected.min()), max(self.expected_range[1], expected.max())]
+        np.minimum(self.voltage_min, voltages.min(axis=0), out=self.voltage_min)
+        np.maximum(self.voltage_max, voltages.max(axis=0), out=self.voltage_max)
+
+        if abs(log_pressures[-1] - self.anchor_log_pressure) >= self.flat_decades:
+            expected_span = self.expected_range[1] - self.expected_range[0]
+            # Only where the LUT average moves by at least the tolerance, the tails are flat anyway
+            if expected_span >= self.anchor_tolerance:
+                flatlined = self.voltage_max - self.voltage_min < self.flat_fraction * expected_span
+            self.anchor_log_pressure = log_pressures[-1]
+            self.anchor_tolerance = tolerance[-1]
+            self.expected_range = [expected[-1], expected[-1]]
+            self.voltage_min[:] = voltages[-1]
+            self.voltage_max[:] = voltages[-1]
+        return flatlined
+
+    def describe(self, sensor):
+        """
+        Return the latched alarms of a sensor as text, empty if there are none.
+        """
+        return ", ".join(alarm for alarm in ALARMS if alarm in self.alarms[sensor])
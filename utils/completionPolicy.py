@@ -0,0 +1,103 @@
+import time
+import numpy as np
+from utils.voutCheck import VOUT_CAPTURE_PRESSURE
+
+# Stop reasons recorded in the run metadata
+STOP_OPERATOR = "operator"
+STOP_ALL_FAILED = "all_failed"
+STOP_ALL_PASSED = "all_passed"
+STOP_ALL_SETTLED = "all_settled"
+STOP_ACQUISITION_ERROR = "acquisition_error"  # The acquisition process lost the serial connection
+
+
+class CompletionPolicy:
+    """
+    Decides when a test can be stopped automatically because every channel's verdict is settled.
+
+    A channel is settled once it has latched "Fail", or once the pump-down has reached
+    VOUT_CAPTURE_PRESSURE and its Vout has been captured. Pressing Stop after that only costs
+    station time, so the test is stopped `delay_s` after the last channel settles.
+
+    The settling is tracked even when auto-stop is disabled, so that operator-stopped runs record
+    how long they kept running after their verdicts were settled.
+    """
+    def __init__(self, enabled=True, stop_on_all_fail=True, stop_when_settled=True, delay_s=2.0, expected_run_minutes=0):
+        self.enabled = enabled
+        self.stop_on_all_fail = stop_on_all_fail  # Stop as soon as every channel has failed
+        self.stop_when_settled = stop_when_settled  # Stop when every channel has failed or completed
+        self.delay_s = delay_s  # Keep logging this long after the verdicts settle
+        self.expected_run_minutes = expected_run_minutes  # Typical operator-stopped run, for the time saved (0 = unknown)
+        self.reset()
+
+    def reset(self):
+        """
+        Start watching a new run.
+        """
+        self.lowest_pressure = np.inf
+        self.settled_since = None
+        self.pending_reason = None
+        self.settled_at = None  # When every verdict first became settled, whatever the stop reason
+
+    def observe(self, pressures):
+        """
+        Track the pressure coverage of the run from a batch of samples.
+        """
+        if len(pressures):
+            self.lowest_pressure = min(self.lowest_pressure, float(np.min(pressures)))
+
+    def sensor_settled(self, verdict, vout_captured):
+        if verdict == "Fail":
+            return True
+        return verdict == "Pass" and vout_captured and self.lowest_pressure <= VOUT_CAPTURE_PRESSURE
+
+    def settled_reason(self, verdicts, vout_captured):
+        """
+        Return the stop reason the current channel states justify, or None.
+        """
+        if self.stop_on_all_fail and all(verdict == "Fail" for verdict in verdicts):
+            return STOP_ALL_FAILED
+        if self.stop_when_settled and all(self.sensor_settled(v, c) for v, c in zip(verdicts, vout_captured)):
+            return STOP_ALL_PASSED if all(verdict == "Pass" for verdict in verdicts) else STOP_ALL_SETTLED
+        return None
+
+    def evaluate(self, verdicts, vout_captured, now=None):
+        """
+        Parameters:
+            verdicts (list): "Pass", "Fail" or None for each sensor.
+            vout_captured (list): Whether each sensor's Vout has been captured.
+
+        Returns:
+            str or None: The stop reason once the test should be stopped.
+        """
+        now = time.monotonic() if now is None else now
+
+        reason = self.settled_reason(verdicts, vout_captured)
+        if reason is None:
+            self.settled_since = None
+            self.settled_at = None
+            return None
+        if self.settled_at is None:
+            self.settled_at = now
+        if self.settled_since is None or reason != self.pending_reason:
+            self.settled_since = now
+            self.pending_reason = reason
+        if not self.enabled:
+            return None
+        return reason if now - self.settled_since >= self.delay_s else None
+
+    def settled_for(self, now=None):
+        """
+        Seconds since every verdict settled, or None if they aren't settled.
+        """
+        if self.settled_at is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return round(now - self.settled_at, 1)
+
+    def time_saved(self, elapsed_s):
+        """
+        Estimate the station time saved by stopping after elapsed_s, or None if unknown.
+        """
+        if not self.expected_run_minutes:
+            return None
+        return round(max(0.0, self.expected_run_minutes * 60 - elapsed_s), 1)
@@ -0,0 +1,206 @@
+import logging
+import threading
+import warnings
+import numpy as np
+from scipy.optimize import curve_fit, OptimizeWarning
+from utils.limitProfile import logistic_with_offset
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class FitResult:
+    """
+    Latest fit of one sensor's response curve and its projection to pressures not yet reached.
+    """
+    def __init__(self, params, points, rms_residual, projected_pressure, projected_voltage, projected_margin, projected_sigma,
+                 confidence=3.0):
+        self.params = params  # logistic_with_offset parameters (C, L, k, x0) over log10(pressure)
+        self.points = points  # Number of points the fit used
+        self.rms_residual = rms_residual  # RMS fit residual [mV]
+        self.projected_pressure = projected_pressure  # Pressures below the lowest reached so far [mbar]
+        self.projected_voltage = projected_voltage  # Fitted curve at those pressures [mV]
+        self.projected_margin = projected_margin  # Distance to the nearer limit at those pressures [mV]
+        self.projected_sigma = projected_sigma  # Standard error of the projected voltage [mV]
+        self.confidence = confidence  # A failure is only predicted this many standard errors outside the limits
+
+    @property
+    def outside(self):
+        return self.projected_margin + self.confidence * self.projected_sigma < 0
+
+    @property
+    def predicted_fail(self):
+        return bool(self.outside.any())
+
+    @property
+    def predicted_fail_pressure(self):
+        """
+        Highest projected pressure at which the curve leaves the limits, i.e. the first one the
+        pump-down will reach, or None.
+        """
+        outside = np.nonzero(self.outside)[0]
+        return float(self.projected_pressure[outside[0]]) if len(outside) else None
+
+
+class OnlineCurveFitter:
+    """
+    Fits logistic_with_offset to each sensor's live data on a background thread.
+
+    Samples are only appended under a lock on the UI thread; the fitting itself runs every
+    `interval_s` on the fitter thread, warm-started from the sensor's previous parameters, so
+    it never delays ingest or plotting. Each fit is projected down to the lowest LUT pressure
+    to predict sensors that will leave the limits before the pump-down gets there.
+    """
+    def __init__(self, limit_profile, lut_pressure, initial_params, interval_s=2.0, min_points=20,
+                 min_decades=2.0, max_points=2000, max_buffer=20000, projection_points=50):
+        self.limit_profile = limit_profile
+        self.min_pressure = float(np.min(lut_pressure))
+        self.initial_params = np.asarray(initial_params, dtype=float)
+        self.interval_s = interval_s
+        self.min_points = min_points  # Don't fit before there is this much data
+        self.min_decades = min_decades  # ...or before the data spans this many decades of pressure
+        self.max_points = max_points  # Fit a decimated copy of longer runs
+        self.max_buffer = max_buffer  # Halve the buffered samples' density when a sensor has more than this
+        self.projection_points = projection_points
+
+        self.lock = threading.Lock()
+        self.pressure = [[] for _ in range(8)]
+        self.voltage = [[] for _ in range(8)]
+        self.dirty = [False] * 8
+        self.params = [None] * 8  # Warm start for the next fit
+        self.results = [None] * 8
+        self.version = 0  # Incremented whenever results change
+        self.generation = 0  # Incremented by reset(), so that fits of discarded data are dropped
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="curve-fitter", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def add_samples(self, pressures, voltages):
+        """
+        Queue a batch of samples for fitting.
+
+        Parameters:
+            pressures (array): Gauge pressures [mbar], shape (n,).
+            voltages (array): Sensor voltages [mV], shape (n, 8).
+        """
+        pressures = pressures.tolist()
+        with self.lock:
+            for i in range(8):
+                self.pressure[i].extend(pressures)
+                self.voltage[i].extend(voltages[:, i].tolist())
+                self.dirty[i] = True
+                if len(self.pressure[i]) > self.max_buffer:
+                    # Bounded memory for long soak tests; the fit only uses max_points anyway
+                    self.pressure[i] = self.pressure[i][::2]
+                    self.voltage[i] = self.voltage[i][::2]
+
+    def reset(self):
+        """
+        Forget all data and fits, e.g. when the plots are cleared for a new DUT.
+        """
+        with self.lock:
+            self.pressure = [[] for _ in range(8)]
+            self.voltage = [[] for _ in range(8)]
+            self.dirty = [False] * 8
+            self.params = [None] * 8
+            self.results = [None] * 8
+            self.version += 1
+            self.generation += 1
+
+    def latest_results(self):
+        """
+        Returns:
+            tuple: (version, list of FitResult or None per sensor)
+        """
+        with self.lock:
+            return self.version, list(self.results)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval_s):
+            for i in range(8):
+                try:
+                    self.fit_sensor(i)
+                except Exception as e:
+                    logger.debug("Fit of sensor %d failed: %s", i + 1, e)
+
+    def fit_sensor(self, i):
+        with self.lock:
+            if not self.dirty[i]:
+                return
+            self.dirty[i] = False
+            pressure = np.array(self.pressure[i])
+            voltage = np.array(self.voltage[i])
+            p0 = self.initial_params if self.params[i] is None else self.params[i]
+            generation = self.generation
+
+        valid = (pressure > 0) & ~np.isnan(voltage)
+        pressure, voltage = pressure[valid], voltage[valid]
+        if len(pressure) < self.min_points:
+            return
+        p_log = np.log10(pressure)
+        if p_log.max() - p_log.min() < self.min_decades:
+            return
+        if len(pressure) > self.max_points:
+            step = int(np.ceil(len(pressure) / self.max_points))
+            p_log, voltage, pressure = p_log[::step], voltage[::step], pressure[::step]
+
+        with registry.histogram("fit.seconds").time(), warnings.catch_warnings():
+            warnings.simplefilter("ignore", OptimizeWarning)  # Reported as an infinite covariance instead
+            params, covariance = curve_fit(logistic_with_offset, p_log, voltage, p0=p0, maxfev=2000)
+        rms_residual = float(np.sqrt(np.mean((logistic_with_offset(p_log, *params) - voltage) ** 2)))
+
+        # Project the fit to the pressures the pump-down has not reached yet
+        lowest = pressure.min()
+        if lowest > self.min_pressure:
+            projected_pressure = np.logspace(np.log10(lowest), np.log10(self.min_pressure), self.projection_points)[1:]
+        else:
+            projected_pressure = np.empty(0)
+        projected_voltage = logistic_with_offset(np.log10(projected_pressure), *params)
+        projected_margin = self.limit_profile.margins(projected_pressure, projected_voltage)
+        projected_sigma = self.projection_sigma(np.log10(projected_pressure), params, covariance)
+
+        result = FitResult(
+            params, len(pressure), rms_residual, projected_pressure, projected_voltage, projected_margin, projected_sigma
+        )
+        with self.lock:
+            if generation != self.generation:
+                return  # Reset while fitting
+            previous = self.results[i]
+            self.params[i] = params
+            self.results[i] = result
+            self.version += 1
+
+        if result.predicted_fail and not (previous and previous.predicted_fail):
+            logger.warning(
+                "Sensor %d is predicted to leave the limits at %.3g mbar.", i + 1, result.predicted_fail_pressure
+            )
+        registry.counter("fit.fits").inc()
+
+    @staticmethod
+    def projection_sigma(p_log, params, covariance):
+        """
+        Standard error of the fitted curve at p_log, propagated from the parameter covariance.
+        Extrapolating an under-constrained fit gives a large (or infinite) error, which keeps
+        early fits from predicting failures.
+        """
+        if not len(p_log):
+            return np.empty(0)
+        if not np.isfinite(covariance).all():
+            return np.full(len(p_log), np.inf)
+
+        # Numerical Jacobian of the curve with respect to the parameters
+        jacobian = np.empty((len(p_log), len(params)))
+        base = logistic_with_offset(p_log, *params)
+        for j in range(len(params)):
+            step = 1e-6 * max(abs(params[j]), 1.0)
+            shifted = np.array(params, dtype=float)
+            shifted[j] += step
+            jacobian[:, j] = (logistic_with_offset(p_log, *shifted) - base) / step
+        variance = np.einsum("ij,jk,ik->i", jacobian, covariance, jacobian)
+        return np.sqrt(np.clip(variance, 0, None))
@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def decimate_for_view(x, y, xlim, ylim, width_px, log_x=True):
+    """
+    Reduce points to what a view can show: keep the points inside the view and, per pixel
+    column, only the lowest and highest y. Never more than 2 * width_px points are returned.
+
+    Parameters:
+        x, y (array): Points to decimate.
+        xlim, ylim (tuple): View limits.
+        width_px (int): Width of the view in pixels.
+        log_x (bool): Whether the x axis is logarithmic.
+
+    Returns:
+        tuple: (x, y) arrays of the points to draw.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    (x0, x1), (y0, y1) = sorted(xlim), sorted(ylim)
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    x, y = x[inside], y[inside]
+    width_px = max(int(width_px), 1)
+    if len(x) <= 2 * width_px:
+        return x, y
+
+    # Pixel column of each point
+    if log_x:
+        position = (np.log10(x) - np.log10(x0)) / (np.log10(x1) - np.log10(x0))
+    else:
+        position = (x - x0) / (x1 - x0)
+    column = np.clip((position * width_px).astype(int), 0, width_px - 1)
+
+    # Lowest and highest point in each column
+    order = np.lexsort((y, column))
+    column, x, y = column[order], x[order], y[order]
+    starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+    ends = np.r_[starts[1:], len(column)] - 1
+    keep = np.unique(np.concatenate((starts, ends)))
+    return x[keep], y[keep]
@@ -1,12 +1,49 @@
 import os
-import csv
+import re
+import glob
+import json
+import time
+import statistics
 import configparser
-import tkinter as tk  # Import tkinter to use StringVar
+from datetime import datetime
+from utils.completionPolicy import STOP_OPERATOR
+from utils.runWriter import run_segment_files, run_metadata_filename
+
+
+class SettingVar:
+    """
+    Plain stand-in for tk.StringVar, so that FileManager can be used without a GUI.
+    """
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
 
 class FileManager:
-    def __init__(self):
-        self.filename_var = tk.StringVar()  # Use StringVar for filename
-        self.mode_var = tk.StringVar(value="Gauge Tube")  # Default mode
+    def __init__(self, string_var=SettingVar):
+        # The GUI passes tk.StringVar so that widgets can be bound to the filename and mode
+        self.filename_var = string_var()
+        self.mode_var = string_var(value="Gauge Tube")  # Default mode
+        self.segment_max_mb = 0  # Roll the run log over at this size (0 = never)
+        self.segment_max_minutes = 0  # Roll the run log over after this long (0 = never)
+        self.segment_compression = "gzip"  # Compression for completed segments ("gzip" or "none")
+        self.log_level = "INFO"  # Application log verbosity
+        self.log_rate_limit_s = 1.0  # Minimum interval between repeats of the same log message (0 = no limit)
+        self.report_on_stop = True  # Generate an end-of-run report when a logged test is stopped
+        self.report_dir = "Reports"  # Folder the reports are written to
+        self.auto_stop = True  # Stop the test automatically once every channel's verdict is settled
+        self.auto_stop_on_all_fail = True  # ...or as soon as every channel has failed
+        self.auto_stop_delay_s = 2.0  # Keep logging this long after the verdicts settle
+        self.expected_run_minutes = 0  # Typical operator-stopped run length, to estimate the time saved (0 = from recent runs)
+        self.station_changeover_s = 15.0  # Station mode: time to swap the DUT before the next test starts
+        self.live_retention_samples = 20000  # Samples per sensor kept in the live plots (0 = all)
+        self.live_retention_decades = 0  # Only keep samples within this many decades of the current pressure (0 = all)
+        self.run_start_ns = None  # time.perf_counter_ns() at run start, the zero of the log's time column
         self.load_settings()
 
     def load_settings(self):
@@ -18,7 +55,21 @@ class FileManager:
             config['Settings'] = {
                 'csv_filename': 'pressure_data.csv',
                 'logging_enabled': '1',
-                'mode': 'Gauge Tube'  # Default mode
+                'mode': 'Gauge Tube',  # Default mode
+                'segment_max_mb': '0',
+                'segment_max_minutes': '0',
+                'segment_compression': 'gzip',
+                'log_level': 'INFO',
+                'log_rate_limit_s': '1',
+                'report_on_stop': '1',
+                'report_dir': 'Reports',
+                'auto_stop': '1',
+                'auto_stop_on_all_fail': '1',
+                'auto_stop_delay_s': '2',
+                'expected_run_minutes': '0',
+                'station_changeover_s': '15',
+                'live_retention_samples': '20000',
+                'live_retention_decades': '0'
             }
             with open('settings.ini', 'w') as configfile:
                 config.write(configfile)
@@ -28,6 +79,32 @@ class FileManager:
         # Load mode from settings.ini
         self.mode_var.set(config['Settings'].get('mode', 'Gauge Tube'))
 
+        # Load log rotation settings
+        self.segment_max_mb = config['Settings'].getfloat('segment_max_mb', 0)
+        self.segment_max_minutes = config['Settings'].getfloat('segment_max_minutes', 0)
+        self.segment_compression = config['Settings'].get('segment_compression', 'gzip')
+
+        # Load application logging settings
+        self.log_level = config['Settings'].get('log_level', 'INFO')
+        self.log_rate_limit_s = config['Settings'].getfloat('log_rate_limit_s', 1.0)
+
+        # Load end-of-run report settings
+        self.report_on_stop = config['Settings'].getboolean('report_on_stop', True)
+        self.report_dir = config['Settings'].get('report_dir', 'Reports')
+
+        # Load test completion settings
+        self.auto_stop = config['Settings'].getboolean('auto_stop', True)
+        self.auto_stop_on_all_fail = config['Settings'].getboolean('auto_stop_on_all_fail', True)
+        self.auto_stop_delay_s = config['Settings'].getfloat('auto_stop_delay_s', 2.0)
+        self.expected_run_minutes = config['Settings'].getfloat('expected_run_minutes', 0)
+
+        # Load station mode settings
+        self.station_changeover_s = config['Settings'].getfloat('station_changeover_s', 15.0)
+
+        # Load live plot retention settings
+        self.live_retention_samples = config['Settings'].getint('live_retention_samples', 20000)
+        self.live_retention_decades = config['Settings'].getfloat('live_retention_decades', 0)
+
         # Use the filename from settings.ini but prepend the Logs folder
         base_filename = config['Settings']['csv_filename']
         self.filename_var.set(self.get_incremented_log_filename(base_filename))
@@ -40,23 +117,123 @@ class FileManager:
         config['Settings'] = {
             'csv_filename': self.filename_var.get(),  # Keep the current filename
             'logging_enabled': str(logging_enabled),
-            'mode': self.mode_var.get()  # Save the current mode
+            'mode': self.mode_var.get(),  # Save the current mode
+            'segment_max_mb': str(self.segment_max_mb),
+            'segment_max_minutes': str(self.segment_max_minutes),
+            'segment_compression': self.segment_compression,
+            'log_level': self.log_level,
+            'log_rate_limit_s': str(self.log_rate_limit_s),
+            'report_on_stop': str(int(self.report_on_stop)),
+            'report_dir': self.report_dir,
+            'auto_stop': str(int(self.auto_stop)),
+            'auto_stop_on_all_fail': str(int(self.auto_stop_on_all_fail)),
+            'auto_stop_delay_s': str(self.auto_stop_delay_s),
+            'expected_run_minutes': str(self.expected_run_minutes),
+            'station_changeover_s': str(self.station_changeover_s),
+            'live_retention_samples': str(self.live_retention_samples),
+            'live_retention_decades': str(self.live_retention_decades)
         }
         with open('settings.ini', 'w') as configfile:
             config.write(configfile)
 
-    def save_to_csv(self, filename, data, logging_enabled):
+    def run_writer_options(self):
         """
-        Save data to a CSV file if logging is enabled.
+        Return the RunWriter rotation options from the settings.
         """
+        return {
+            'max_segment_bytes': int(self.segment_max_mb * 1024 * 1024),
+            'max_segment_seconds': self.segment_max_minutes * 60,
+            'compression': self.segment_compression
+        }
+
+    def start_run(self, logging_enabled, run_start_ns=None, run_metadata=None):
+        """
+        Mark the start of a run: record the monotonic start time and, if logging is enabled,
+        write it with the wall-clock start time to the run's metadata file.
+        run_start_ns is the perf_counter_ns start time if it was taken elsewhere (e.g. by the acquisition process).
+        run_metadata holds extra values to record, e.g. the serial number in station mode.
+        """
+        self.run_start_ns = time.perf_counter_ns() if run_start_ns is None else run_start_ns
         if logging_enabled:
-            if not os.path.exists(filename):
-                with open(filename, mode='w', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(["Gauge Pressure", "Sensor 1", "Sensor 2", "Sensor 3", "Sensor 4", "Sensor 5", "Sensor 6", "Sensor 7", "Sensor 8"])
-            with open(filename, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(data)
+            self.write_run_metadata(self.filename_var.get(), {
+                'run_start': datetime.now().astimezone().isoformat(),
+                'run_start_perf_counter_ns': self.run_start_ns,
+                'mode': self.mode_var.get(),
+                **(run_metadata or {})
+            })
+
+    def read_run_metadata(self, filename):
+        """
+        Read the metadata stored next to a run log, or an empty dict if there is none.
+        """
+        try:
+            with open(run_metadata_filename(filename)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def run_mode(self, filename):
+        """
+        Return the mode a run was recorded in, or the current mode for logs without metadata.
+        """
+        return self.read_run_metadata(filename).get('mode') or self.mode_var.get()
+
+    def write_run_metadata(self, filename, updates):
+        """
+        Merge the given values into the metadata stored next to a run log.
+        """
+        metadata = self.read_run_metadata(filename)
+        metadata.update(updates)
+        path = run_metadata_filename(filename)
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(path, 'w') as file:
+            json.dump(metadata, file, indent=2)
+
+    def typical_run_minutes(self, folder="Logs", runs=20):
+        """
+        Return expected_run_minutes, or if it isn't set the median duration of the last `runs`
+        operator-stopped runs in folder (0 if there are none).
+        """
+        if self.expected_run_minutes:
+            return self.expected_run_minutes
+        paths = sorted(glob.glob(os.path.join(folder, "*.json")), key=os.path.getmtime, reverse=True)
+        durations = []
+        for path in paths:
+            try:
+                with open(path) as file:
+                    metadata = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if isinstance(metadata, dict) and metadata.get('stop_reason') == STOP_OPERATOR and metadata.get('duration_s'):
+                durations.append(float(metadata['duration_s']))
+                if len(durations) == runs:
+                    break
+        return round(statistics.median(durations) / 60, 2) if durations else 0
+
+    def finish_run(self, logging_enabled, stop_reason, time_saved_s=None, anomalies=None, settled_for_s=None):
+        """
+        Record how and when the run ended in its metadata file, with the anomaly alarms of each
+        sensor (its alarm text, empty where there were none). settled_for_s is how long the run
+        kept going after every verdict had settled.
+        """
+        if not logging_enabled or self.run_start_ns is None:
+            return
+        self.write_run_metadata(self.filename_var.get(), {
+            'run_end': datetime.now().astimezone().isoformat(),
+            'duration_s': round((time.perf_counter_ns() - self.run_start_ns) / 1e9, 3),
+            'stop_reason': stop_reason,
+            'time_saved_s': time_saved_s,
+            'settled_for_s': settled_for_s,
+            'anomalies': {str(i + 1): alarms for i, alarms in enumerate(anomalies or []) if alarms}
+        })
+
+    def close_run(self):
+        """
+        Forget the run that has ended. Its log is finalized by the acquisition process.
+        """
+        self.run_start_ns = None
 
     def get_incremented_log_filename(self, base_filename, folder="Logs"):
         """
@@ -84,12 +261,9 @@ class FileManager:
         current_filename = f"{name_part}_{number}{extension}"
         file_path = os.path.join(folder, current_filename)
 
-        # Check if the file exists and is empty
-        if os.path.exists(file_path):
-            if os.path.getsize(file_path) == 0:  # File exists but is empty
-                return file_path  # Return the current filename without incrementing
-        else:
-            return file_path  # File does not exist, return the current filename
+        # Check if the run exists and is empty
+        if not self.run_in_use(file_path):
+            return file_path  # Run does not exist or is empty, return the current filename
 
         # Increment the number if the file exists and is not empty
         number += 1
@@ -97,9 +271,30 @@ class FileManager:
         file_path = os.path.join(folder, new_filename)
 
         # Ensure the filename is unique
-        while os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        while self.run_in_use(file_path):
             number += 1
             new_filename = f"{name_part}_{number}{extension}"
             file_path = os.path.join(folder, new_filename)
 
-        return file_path
\ No newline at end of file
+        return file_path
+
+    def unit_log_filename(self, serial_number, folder="Logs"):
+        """
+        Return the log filename for the next test of a unit: its serial number, made safe for
+        filenames, and the attempt number, e.g. Logs/UNIT_5_1.csv then Logs/UNIT_5_2.csv on a
+        retest. The attempt is always appended, so a serial number ending in digits is never
+        mistaken for a retest counter.
+        """
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", serial_number)
+        attempt = 1
+        while self.run_in_use(os.path.join(folder, f"{safe_name}_{attempt}.csv")):
+            attempt += 1
+        return os.path.join(folder, f"{safe_name}_{attempt}.csv")
+
+    def run_in_use(self, file_path):
+        """
+        Check whether a run already has data, in its main file or any (compressed) segment.
+        """
+        return any(os.path.getsize(path) > 0 for path in run_segment_files(file_path))
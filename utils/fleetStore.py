@@ -0,0 +1,498 @@
+import os
+import re
+import glob
+import json
+import time
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.limitProfile import LimitProfile, load_lut, fit_limit_params
+from utils.logReader import LogReader
+from utils.runWriter import find_runs, run_base_filename, run_segment_files, run_metadata_filename
+from utils.voutCheck import capture_vout
+from utils.metrics import registry
+from utils.sampleRing import process_alive
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("runs", "sensors", "bins")
+BINS_PER_DECADE = 4  # Pressure bins of the "bins" table, centred on log10(pressure) multiples of 1/4
+COMPACT_AFTER = 32  # Merge a partition's per-run part files once it has this many
+LOCK_TIMEOUT_S = 60  # Longest wait for another process ingesting into the same store
+PARTITION_COLUMNS = ("mode",)
+DERIVED_COLUMNS = ("day", "week", "month")  # Computed from run_start at query time
+AGGREGATES = ("mean", "median", "min", "max", "sum", "count", "std")
+FILTER_OPS = {
+    "==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "in": lambda column, values: np.isin(column, list(values))
+}
+
+
+def summarise_run(run, profile):
+    """
+    Reduce a parsed run to the rows of the store's tables.
+
+    Returns:
+        dict: table name -> {column: array}. "runs" has one row, "sensors" one per sensor with
+              data and "bins" one per sensor and pressure bin with data.
+    """
+    pressure, voltages = run.pressure, run.voltages
+    valid = ~np.isnan(voltages)
+    outside = valid & ~profile.within_limits(pressure, voltages)
+    margins = np.where(valid, profile.margins(pressure, voltages), np.inf)
+
+    sensors = {"sensor": [], "points": [], "passed": [], "worst_margin": [], "vout_mv": [], "min_pressure": []}
+    bins = {"sensor": [], "log_pressure": [], "points": [], "failed": [], "mean_voltage": [], "worst_margin": []}
+    log_pressure = np.round(np.log10(pressure) * BINS_PER_DECADE) / BINS_PER_DECADE
+    bin_values, bin_index = np.unique(log_pressure, return_inverse=True)
+    for i in range(voltages.shape[1]):
+        points = int(valid[:, i].sum())
+        if not points:
+            continue
+        vout = capture_vout(pressure[valid[:, i]], voltages[valid[:, i], i])
+        sensors["sensor"].append(i + 1)
+        sensors["points"].append(points)
+        sensors["passed"].append(not outside[:, i].any())
+        sensors["worst_margin"].append(float(margins[:, i].min()))
+        sensors["vout_mv"].append(np.nan if vout is None else vout)
+        sensors["min_pressure"].append(float(pressure[valid[:, i]].min()))
+
+        # Per pressure bin of this sensor
+        bin_points = np.bincount(bin_index, weights=valid[:, i], minlength=len(bin_values))
+        bin_failed = np.bincount(bin_index, weights=outside[:, i], minlength=len(bin_values))
+        bin_sum = np.bincount(bin_index, weights=np.where(valid[:, i], voltages[:, i], 0.0), minlength=len(bin_values))
+        bin_margin = np.full(len(bin_values), np.inf)
+        np.minimum.at(bin_margin, bin_index, margins[:, i])
+        present = bin_points > 0
+        bins["sensor"].extend([i + 1] * int(present.sum()))
+        bins["log_pressure"].extend(bin_values[present])
+        bins["points"].extend(bin_points[present].astype(int))
+        bins["failed"].extend(bin_failed[present] > 0)
+        bins["mean_voltage"].extend(bin_sum[present] / bin_points[present])
+        bins["worst_margin"].extend(bin_margin[present])
+
+    return {
+        "runs": {"points": [len(pressure)], "passed": [len(sensors["passed"]) == voltages.shape[1] and all(sensors["passed"])]},
+        "sensors": sensors,
+        "bins": bins
+    }
+
+
+class FleetStore:
+    """
+    Local analytical store of every logged run, for questions across the whole fleet.
+
+    Each run is summarised once into three tables (runs, sensors and pressure bins) and stored
+    as compressed columnar .npz partitions by mode and month, so queries never touch the raw
+    CSVs. Runs are ingested incrementally: each one adds a small part file to its partition and
+    the parts are compacted once a partition has COMPACT_AFTER of them. Queries skip partitions
+    whose mode or date range can't match the filters and only load the columns they use.
+
+    Several processes may share a store (e.g. the GUI and the command line ingest): each ingest
+    holds the store's lock file and works on the index as it is on disk, not on its own copy.
+    """
+    def __init__(self, root=os.path.join("Logs", ".fleet"), limit_profile=None, log_reader=None):
+        self.root = root
+        self.limit_profile = limit_profile
+        self.log_reader = log_reader or LogReader(max_runs=4)
+        self.lock = threading.Lock()  # One ingest at a time
+        self.index_path = os.path.join(root, "index.json")
+        self.lock_path = os.path.join(root, "index.lock")
+        self.index = self.load_index()
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {"next_run_id": 0, "runs": {}, "partitions": {}}
+
+    def save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.index, file)
+        os.replace(temp_path, self.index_path)
+
+    @contextmanager
+    def index_lock(self, timeout=LOCK_TIMEOUT_S):
+        """
+        Hold the store's lock file, created exclusively and holding the owner's PID. A lock left
+        behind by a process that died is taken over.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                pass
+            try:
+                with open(self.lock_path) as file:
+                    owner = int(file.read() or 0)
+            except (OSError, ValueError):
+                owner = None  # Just released, or its owner hasn't written its PID yet
+            if owner is not None and owner != os.getpid() and not process_alive(owner):
+                logger.warning("Taking over the fleet store lock of process %d, which is no longer running.", owner)
+                try:
+                    os.remove(self.lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Fleet store {self.root} is locked by process {owner}")
+            time.sleep(0.05)
+        try:
+            try:
+                os.write(fd, str(os.getpid()).encode())
+            finally:
+                os.close(fd)
+            yield
+        finally:
+            os.remove(self.lock_path)
+
+    @staticmethod
+    def partition_key(mode, run_start):
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", mode).strip("_") or "unknown"
+        return f"mode={slug}/month={datetime.fromtimestamp(run_start).strftime('%Y-%m')}"
+
+    @staticmethod
+    def run_details(path, sources):
+        """
+        Read the start time, mode and serial number of a run from its metadata, falling back to
+        the log's modification time for runs logged before metadata was written.
+        """
+        try:
+            with open(run_metadata_filename(path)) as file:
+                metadata = json.load(file)
+        except (OSError, ValueError):
+            metadata = {}
+        try:
+            run_start = datetime.fromisoformat(metadata["run_start"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            run_start = os.path.getmtime(sources[0])
+        return run_start, metadata.get("mode", "Unknown"), metadata
+
+    def ingest_run(self, filename):
+        """
+        Add a finished run to the store, replacing its rows if the log changed since it was
+        last ingested. Returns False if the run was already up to date.
+        """
+        path = os.path.abspath(run_base_filename(filename))
+        sources = run_segment_files(path)
+        if not sources:
+            raise FileNotFoundError(f"No log segments found for {filename}")
+        stats = [os.stat(source) for source in sources]
+        signature = [sum(stat.st_size for stat in stats), max(stat.st_mtime_ns for stat in stats)]
+
+        with self.lock, self.index_lock(), registry.histogram("fleet.ingest_seconds").time():
+            # Another store on the same root may have ingested since the index was last read
+            self.index = self.load_index()
+            entry = self.index["runs"].get(path)
+            if entry and entry["signature"] == signature:
+                return False
+            if entry:
+                self.drop_run(entry)
+
+            run = self.log_reader.read_run(path)
+            run_start, mode, metadata = self.run_details(path, sources)
+            tables = summarise_run(run, self.limit_profile)
+            run_id = self.index["next_run_id"]
+            self.index["next_run_id"] += 1
+
+            tables["runs"].update({
+                "filename": [os.path.basename(path)],
+                "serial_number": [str(metadata.get("serial_number", ""))],
+                "stop_reason": [str(metadata.get("stop_reason") or "")],
+                "duration_s": [float(metadata.get("duration_s") or np.nan)],
+                "profile": [self.limit_profile.key]
+            })
+            partition = self.partition_key(mode, run_start)
+            for table, columns in tables.items():
+                rows = len(next(iter(columns.values())))
+                columns = {name: np.asarray(values) for name, values in columns.items()}
+                columns["run_id"] = np.full(rows, run_id)
+                columns["run_start"] = np.full(rows, run_start)
+                self.write_part(partition, table, run_id, columns)
+
+            info = self.index["partitions"].setdefault(
+                partition, {"mode": mode, "min_start": run_start, "max_start": run_start, "runs": 0}
+            )
+            info["min_start"] = min(info["min_start"], run_start)
+            info["max_start"] = max(info["max_start"], run_start)
+            info["runs"] += 1
+            self.index["runs"][path] = {"signature": signature, "run_id": run_id, "partition": partition}
+            self.save_index()
+            self.compact(partition)
+        registry.counter("fleet.runs_ingested").inc()
+        return True
+
+    def ingest_folder(self, folder="Logs"):
+        """
+        Ingest every run in a folder that is new or changed. Returns the number ingested.
+        """
+        ingested = 0
+        for path in find_runs(folder):
+            try:
+                ingested += self.ingest_run(path)
+            except Exception as e:
+                logger.warning("Skipping %s: %s", path, e)
+        return ingested
+
+    def ingest_in_background(self, filename, attempts=3):
+        """
+        Ingest a run that has just finished on a background thread. Its last segment may still
+        be being compressed, so missing files are retried.
+        """
+        def ingest_task():
+            for attempt in range(attempts):
+                try:
+                    self.ingest_run(filename)
+                    return
+                except FileNotFoundError:
+                    time.sleep(1)
+                except Exception as e:
+                    logger.error("Error adding %s to the fleet store: %s", filename, e)
+                    return
+            logger.error("Error adding %s to the fleet store: log not found", filename)
+
+        thread = threading.Thread(target=ingest_task, daemon=True)
+        thread.start()
+        return thread
+
+    def partition_files(self, partition, table):
+        return sorted(glob.glob(os.path.join(self.root, partition, f"{table}-*.npz")))
+
+    def write_part(self, partition, table, name, columns):
+        folder = os.path.join(self.root, partition)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{table}-{name}.npz")
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(temp_path, **columns)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def read_file(path, columns=None):
+        with np.load(path, allow_pickle=False) as npz:
+            unknown = sorted(set(columns or ()) - set(npz.files))
+            if unknown:
+                table = os.path.basename(path).split("-")[0]
+                raise ValueError(f"Unknown column(s) {', '.join(unknown)} for table {table!r}")
+            return {name: npz[name] for name in (npz.files if columns is None else columns)}
+
+    @staticmethod
+    def derive_columns(frame, columns):
+        """
+        Add the day/week/month columns in `columns` to a frame, formatting each run's start once.
+        """
+        if not columns:
+            return
+        run_starts, inverse = np.unique(frame["run_start"].to_numpy(dtype=float), return_inverse=True)
+        start_time = pd.to_datetime(run_starts, unit="s", utc=True).tz_convert(datetime.now().astimezone().tzinfo)
+        formats = {"day": "%Y-%m-%d", "week": "%G-W%V", "month": "%Y-%m"}
+        for column in columns:
+            frame[column] = np.asarray(start_time.strftime(formats[column]), dtype=object)[inverse.ravel()]
+
+    def compact(self, partition):
+        """
+        Merge a partition's part files into one once there are COMPACT_AFTER of them.
+        """
+        for table in TABLES:
+            files = self.partition_files(partition, table)
+            if len(files) < COMPACT_AFTER:
+                continue
+            parts = [self.read_file(path) for path in files]
+            merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+            name = f"c{int(merged['run_id'].max()):08d}"
+            self.write_part(partition, table, name, merged)
+            for path in files:
+                if os.path.basename(path) != f"{table}-{name}.npz":
+                    os.remove(path)
+
+    def drop_run(self, entry):
+        """
+        Remove a run's rows, e.g. before re-ingesting a run whose log changed.
+        """
+        partition = entry["partition"]
+        for table in TABLES:
+            for path in self.partition_files(partition, table):
+                columns = self.read_file(path)
+                keep = columns["run_id"] != entry["run_id"]
+                if keep.all():
+                    continue
+                if keep.any():
+                    np.savez_compressed(path[:-len(".npz")] + ".tmp.npz", **{name: values[keep] for name, values in columns.items()})
+                    os.replace(path[:-len(".npz")] + ".tmp.npz", path)
+                else:
+                    os.remove(path)
+        self.index["partitions"][partition]["runs"] -= 1
+
+    @staticmethod
+    def normalise_filter(column, op, value):
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter operator {op!r}")
+        if column == "run_start" and isinstance(value, str):
+            value = datetime.fromisoformat(value).timestamp()
+        return column, op, value
+
+    @staticmethod
+    def partition_matches(info, filters):
+        """
+        Whether a partition can hold rows matching the filters, from its mode and date range.
+        """
+        for column, op, value in filters:
+            if column == "mode" and not FILTER_OPS[op](np.array([info["mode"]]), value).all():
+                return False
+            if column == "run_start":
+                if op in (">", ">=") and info["max_start"] < value:
+                    return False
+                if op in ("<", "<=") and info["min_start"] > value:
+                    return False
+                if op == "==" and not info["min_start"] <= value <= info["max_start"]:
+                    return False
+        return True
+
+    def query(self, table, filters=(), group_by=(), aggregates=None, last_runs=None):
+        """
+        Filtered aggregation over all ingested runs.
+
+        Parameters:
+            table (str): "runs", "sensors" or "bins".
+            filters (list): (column, op, value) tuples, op one of FILTER_OPS, e.g.
+                [("mode", "==", "Pressure Sensor Assembly"), ("run_start", ">=", "2025-01-01")].
+                "day", "week" and "month" can be filtered on as well, e.g. ("month", "==", "2025-03").
+            group_by (list): Columns to group by, including "mode", "day", "week" and "month".
+            aggregates (dict): Column -> aggregate, one of AGGREGATES. Without aggregates the
+                matching rows are returned.
+            last_runs (int): Only use the most recent runs matching the filters.
+
+        Returns:
+            pandas.DataFrame: One row per group with a "<column>_<aggregate>" column per aggregate.
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}")
+        filters = [self.normalise_filter(*f) for f in filters]
+        aggregates = aggregates or {}
+        for column, aggregate in aggregates.items():
+            if aggregate not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate {aggregate!r} for {column}")
+
+        # Only load the columns the query uses
+        used = {column for column, _, _ in filters} | set(group_by) | set(aggregates) | {"run_id", "run_start"}
+        stored = sorted(used - set(PARTITION_COLUMNS) - set(DERIVED_COLUMNS))
+        derived = sorted(set(DERIVED_COLUMNS) & used)
+        # Filters on partition and derived columns can't be applied to the stored columns
+        stored_filters = [f for f in filters if f[0] not in PARTITION_COLUMNS and f[0] not in DERIVED_COLUMNS]
+        derived_filters = [f for f in filters if f[0] in DERIVED_COLUMNS]
+
+        started = time.monotonic()
+        self.index = self.load_index()  # Pick up the runs other stores on the same root ingested
+        frames = []
+        run_starts = set()  # Of the matching runs read so far, for last_runs
+        partitions = [(key, info) for key, info in self.index["partitions"].items() if self.partition_matches(info, filters)]
+        # Newest partitions first, so last_runs can stop once older partitions can't contribute
+        partitions.sort(key=lambda item: item[1]["max_start"], reverse=True)
+        for partition, info in partitions:
+            if last_runs and len(run_starts) >= last_runs and sorted(run_starts)[-last_runs] > info["max_start"]:
+                break
+            for path in self.partition_files(partition, table):
+                columns = self.read_file(path, stored)
+                mask = np.ones(len(columns["run_id"]), dtype=bool)
+                for column, op, value in stored_filters:
+                    mask &= FILTER_OPS[op](columns[column], value)
+                if not mask.any():
+                    continue
+                frame = pd.DataFrame({name: values[mask] for name, values in columns.items()})
+                self.derive_columns(frame, derived)
+                if derived_filters:
+                    mask = np.ones(len(frame), dtype=bool)
+                    for column, op, value in derived_filters:
+                        mask &= FILTER_OPS[op](frame[column].to_numpy(), value)
+                    if not mask.any():
+                        continue
+                    frame = frame[mask]
+                frame["mode"] = info["mode"]
+                frames.append(frame)
+                if last_runs:
+                    run_starts.update(np.unique(frame["run_start"]))
+
+        columns = stored + derived + ["mode"]
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        if last_runs:
+            latest = data.drop_duplicates("run_id").nlargest(last_runs, "run_start")["run_id"]
+            data = data[data["run_id"].isin(latest)]
+
+        if aggregates:
+            named = {f"{column}_{aggregate}": (column, aggregate) for column, aggregate in aggregates.items()}
+            if group_by:
+                data = data.groupby(list(group_by)).agg(**named).reset_index()
+            else:
+                data = pd.DataFrame({name: [data[column].agg(aggregate)] for name, (column, aggregate) in named.items()})
+        registry.histogram("fleet.query_seconds").observe(time.monotonic() - started)
+        return data
+
+
+def parse_filter(expression):
+    """
+    Parse a filter such as "sensor==3", "log_pressure==-2" or "mode==Gauge Tube".
+    """
+    match = re.fullmatch(r"\s*(\w+)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*", expression)
+    if not match:
+        raise ValueError(f"Can't parse filter {expression!r}")
+    column, op, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return column, op, value
+
+
+def main(argv=None):
+    """
+    e.g. mean Vout per sensor slot over the last 500 assemblies:
+        python -m utils.fleetStore query sensors --where "mode==Pressure Sensor Assembly" --group sensor --agg vout_mv:mean --last-runs 500
+    failure rate at 1e-2 mbar by week:
+        python -m utils.fleetStore query bins --where "log_pressure==-2" --group week --agg failed:mean
+    """
+    parser = argparse.ArgumentParser(description="Query all logged runs.")
+    parser.add_argument("--root", default=os.path.join("Logs", ".fleet"), help="Store folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Add new and changed runs to the store")
+    ingest.add_argument("--logs", default="Logs", help="Folder with the run logs")
+    ingest.add_argument("--lut", default="PLookUp.csv", help="LUT of the limits the runs are evaluated against")
+    query = commands.add_parser("query", help="Filtered aggregation")
+    query.add_argument("table", choices=TABLES)
+    query.add_argument("--where", action="append", default=[], help="Filter, e.g. \"sensor==3\" (repeatable)")
+    query.add_argument("--group", nargs="*", default=[], help="Columns to group by")
+    query.add_argument("--agg", nargs="*", default=[], help="column:aggregate, e.g. vout_mv:mean")
+    query.add_argument("--last-runs", type=int, default=None)
+    query.add_argument("--csv", default=None, help="Also write the result to this CSV file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "ingest":
+        lut_pressure, lut_average, _ = load_lut(args.lut)
+        store = FleetStore(args.root, LimitProfile(*fit_limit_params(lut_pressure, lut_average)))
+        started = time.monotonic()
+        ingested = store.ingest_folder(args.logs)
+        print(f"Ingested {ingested} runs in {time.monotonic() - started:.1f} s")
+        return
+
+    store = FleetStore(args.root)
+    aggregates = dict(item.split(":", 1) for item in args.agg)
+    try:
+        result = store.query(args.table, [parse_filter(f) for f in args.where], args.group, aggregates, args.last_runs)
+    except ValueError as e:
+        parser.error(str(e))
+    print(result.to_string(index=False))
+    if args.csv:
+        result.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
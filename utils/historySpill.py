@@ -0,0 +1,81 @@
+import threading
+import tempfile
+import numpy as np
+
+SPILL_WIDTH = 9  # pressure, then the 8 sensor voltages
+
+
+class HistorySpill:
+    """
+    Temporary file holding the live samples evicted from the plots, so that zooming into them
+    reads back only the chunks in view instead of re-parsing the run log that is still being written.
+
+    Samples are appended in chunks that each record their pressure range. A pump-down moves
+    through the pressures in order, so a zoom window only overlaps a few chunks.
+    """
+    def __init__(self, min_chunk_rows=4096):
+        self.min_chunk_rows = min_chunk_rows  # Smaller evictions are merged into the previous chunk
+        self.file = None
+        self.chunks = []  # [first row, rows, lowest pressure, highest pressure]
+        self.rows = 0
+        self.lock = threading.Lock()  # Appends come from the UI thread, reads from the reload threads
+
+    def __len__(self):
+        return self.rows
+
+    def pressure_range(self):
+        """
+        Return the (lowest, highest) pressure of the spilled samples, or None if there are none.
+        """
+        with self.lock:
+            if not self.chunks:
+                return None
+            return min(chunk[2] for chunk in self.chunks), max(chunk[3] for chunk in self.chunks)
+
+    def append(self, pressures, voltages):
+        """
+        Spill a block of samples: pressures of shape (n,) and voltages of shape (n, 8).
+        """
+        block = np.column_stack([np.asarray(pressures, dtype=np.float64), np.asarray(voltages, dtype=np.float64)])
+        if not len(block):
+            return
+        low, high = float(np.nanmin(block[:, 0])), float(np.nanmax(block[:, 0]))
+        with self.lock:
+            if self.file is None:
+                self.file = tempfile.TemporaryFile(prefix="history_spill_")
+            self.file.seek(0, 2)
+            self.file.write(block.tobytes())
+            if self.chunks and self.chunks[-1][1] < self.min_chunk_rows:
+                chunk = self.chunks[-1]
+                chunk[1] += len(block)
+                chunk[2], chunk[3] = min(chunk[2], low), max(chunk[3], high)
+            else:
+                self.chunks.append([self.rows, len(block), low, high])
+            self.rows += len(block)
+
+    def read(self, pressure_window):
+        """
+        Return the pressures (n,) and voltages (n, 8) of the chunks overlapping pressure_window.
+        Samples outside the window are included if their chunk overlaps it.
+        """
+        low, high = min(pressure_window), max(pressure_window)
+        blocks = []
+        with self.lock:
+            for first, rows, chunk_low, chunk_high in self.chunks:
+                if chunk_high < low or chunk_low > high:
+                    continue
+                self.file.seek(first * SPILL_WIDTH * 8)
+                blocks.append(np.frombuffer(self.file.read(rows * SPILL_WIDTH * 8), dtype=np.float64))
+        data = np.concatenate(blocks).reshape(-1, SPILL_WIDTH) if blocks else np.empty((0, SPILL_WIDTH))
+        return data[:, 0], data[:, 1:]
+
+    def reset(self):
+        """
+        Drop all spilled samples, e.g. when a new run starts.
+        """
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.chunks = []
+            self.rows = 0
@@ -0,0 +1,127 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit
+
+# Limit band around the LUT average at each LUT pressure, as a fraction of the average
+#                                          1     2    3      4     5     6     7     8     9      10     11    12     13    14    15    16    17    18    19   20   21
+DEFAULT_PERCENTAGE_ADJUSTMENTS = np.array([0.1, 0.13, 0.16, 0.18, 0.20, 0.20, 0.20, 0.20, 0.220, 0.240, 0.250, 0.350, 0.45, 0.50, 0.55, 0.60, 0.62, 0.65, 0.7, 0.8, 0.9])
+
+
+def logistic_with_offset(x, C, L, k, x0):
+    """
+    Logistic function with an offset.
+    """
+    return C + L / (1 + np.exp(-k * (x - x0)))
+
+
+def load_lut(file_path):
+    """
+    Load a LUT CSV (pressure in mTorr and the PLookUp voltage column).
+
+    Returns:
+        tuple: (pressures [mbar] list, average voltages array, per-row LUT values)
+    """
+    df = pd.read_csv(file_path)
+    df['Average'] = df[['PLookUp']].mean(axis=1)
+    df['Pressure'] = df['Pressure'] * 0.00133322  # Convert mTorr to mBar
+    lut_values = df[['PLookUp']].values.tolist()
+    return df['Pressure'].tolist(), np.array(df['Average'].tolist()), lut_values
+
+
+def fit_limit_params(lut_pressure, lut_average, percentage_adjustments=DEFAULT_PERCENTAGE_ADJUSTMENTS):
+    """
+    Fit logistic functions to the LUT average widened by the percentage adjustments to get the
+    lower and upper limit lines.
+
+    Returns:
+        tuple: (lower_params, upper_params)
+    """
+    p_log = np.log10(lut_pressure)  # Use log10(pressure) for fitting
+    percentage_adjustments = np.asarray(percentage_adjustments, dtype=float)
+    lut_average = np.asarray(lut_average, dtype=float)
+
+    # Ensure the array matches the number of pressure points
+    if len(percentage_adjustments) != len(lut_pressure):
+        raise ValueError("Percentage adjustments array must have the same length as the pressure array.")
+
+    # Calculate the adjusted limit curves
+    lower_v = lut_average * (1 - percentage_adjustments)
+    upper_v = lut_average * (1 + percentage_adjustments)
+
+    # Lower limit fit
+    lower_params, _ = curve_fit(
+        logistic_with_offset,
+        p_log,
+        lower_v,
+        p0=[min(lower_v), max(lower_v) - min(lower_v), 1, np.median(p_log)]
+    )
+
+    # Upper limit fit
+    upper_params, _ = curve_fit(
+        logistic_with_offset,
+        p_log,
+        upper_v,
+        p0=[min(upper_v), max(upper_v) - min(upper_v), 1, np.median(p_log)]
+    )
+
+    return lower_params, upper_params
+
+
+class LimitProfile:
+    """
+    Upper and lower logistic limit curves used to classify sensor voltages.
+    """
+    def __init__(self, lower_params, upper_params):
+        self.lower_params = np.asarray(lower_params, dtype=float)
+        self.upper_params = np.asarray(upper_params, dtype=float)
+
+        # Short fingerprint identifying this profile in cached pass/fail masks
+        digest = hashlib.sha1(np.concatenate((self.lower_params, self.upper_params)).round(12).tobytes())
+        self.key = digest.hexdigest()[:16]
+
+    def lower_limit(self, pressure):
+        """
+        Lower limit voltage [mV] at the given gauge pressure(s) [mbar].
+        """
+        return logistic_with_offset(np.log10(np.asarray(pressure, dtype=float)), *self.lower_params)
+
+    def upper_limit(self, pressure):
+        """
+        Upper limit voltage [mV] at the given gauge pressure(s) [mbar].
+        """
+        return logistic_with_offset(np.log10(np.asarray(pressure, dtype=float)), *self.upper_params)
+
+    def within_limits(self, pressure, voltages):
+        """
+        Vectorised pass/fail check.
+
+        Parameters:
+            pressure (array): Gauge pressures [mbar], shape (n,).
+            voltages (array): Sensor voltages [mV], shape (n,) or (n, sensors).
+
+        Returns:
+            array: Boolean mask with the shape of voltages, True where the point is within the limits.
+        """
+        lower_limit = self.lower_limit(pressure)
+        upper_limit = self.upper_limit(pressure)
+
+        voltages = np.asarray(voltages, dtype=float)
+        if voltages.ndim == 2:
+            lower_limit = lower_limit[:, None]
+            upper_limit = upper_limit[:, None]
+        return (lower_limit <= voltages) & (voltages <= upper_limit)
+
+    def margins(self, pressure, voltages):
+        """
+        Distance [mV] of each point to the nearer limit curve: positive inside the band,
+        negative outside. Same shapes as within_limits().
+        """
+        lower_limit = self.lower_limit(pressure)
+        upper_limit = self.upper_limit(pressure)
+
+        voltages = np.asarray(voltages, dtype=float)
+        if voltages.ndim == 2:
+            lower_limit = lower_limit[:, None]
+            upper_limit = upper_limit[:, None]
+        return np.minimum(voltages - lower_limit, upper_limit - voltages)
@@ -0,0 +1,150 @@
+from utils.sampleRing import SampleRing, SampleRingReader, SAMPLE_FIELDS, RECEIVED_NS
+
+# Well-known shared memory names so that other tools at the station can find the feed
+FEED_NAME = "pressure_sensor_feed"
+SAMPLES_SUFFIX = "_samples"
+VERDICTS_SUFFIX = "_verdicts"
+
+# Per-sensor verdict codes published in the verdict ring
+NO_VERDICT = 0
+PASS = 1
+FAIL = 2
+VERDICT_CODES = {None: NO_VERDICT, "Pass": PASS, "Fail": FAIL}
+VERDICT_NAMES = {NO_VERDICT: None, PASS: "Pass", FAIL: "Fail"}
+VERDICT_FIELDS = ["received_ns"] + [f"sensor_{i + 1}" for i in range(8)]
+
+
+def samples_ring_name(feed_name=FEED_NAME):
+    return feed_name + SAMPLES_SUFFIX
+
+
+def verdicts_ring_name(feed_name=FEED_NAME):
+    return feed_name + VERDICTS_SUFFIX
+
+
+class LiveFeedPublisher:
+    """
+    Publishes the per-sensor pass/fail verdicts next to the live sample ring.
+
+    The samples themselves are written by the acquisition process into the ring named
+    samples_ring_name(); this class owns the verdict ring, which the GUI updates after
+    evaluating each batch.
+    """
+    def __init__(self, feed_name=FEED_NAME, capacity=4096):
+        self.ring = SampleRing.create(capacity, width=len(VERDICT_FIELDS), name=verdicts_ring_name(feed_name))
+        self.last_verdicts = None
+
+    def publish_verdicts(self, received_ns, verdicts):
+        """
+        Publish the verdicts after a batch, only when one of them changed.
+
+        Parameters:
+            received_ns (int): Receive time of the last sample the verdicts include.
+            verdicts (list): "Pass", "Fail" or None for each sensor.
+        """
+        codes = [VERDICT_CODES.get(verdict, NO_VERDICT) for verdict in verdicts]
+        if codes == self.last_verdicts:
+            return
+        self.last_verdicts = codes
+        self.ring.write([received_ns] + codes)
+
+    def reset(self):
+        """
+        Publish "no verdict" for every sensor, e.g. at the start of a new test.
+        """
+        self.publish_verdicts(0, [None] * 8)
+
+    def close(self):
+        self.ring.close()
+
+
+class LiveFeedReader:
+    """
+    Reader library for local consumers of the live feed (line dashboard, SPC collector, ...).
+
+    Readers only copy out of shared memory and never take a lock, so attaching, polling and
+    detaching cannot slow down acquisition. A reader that polls less often than the ring
+    wraps around loses the oldest samples; the count is kept in samples_lost.
+
+    Example:
+        with LiveFeedReader() as feed:
+            while True:
+                for sample in feed.read_samples():
+                    ...
+                verdicts = feed.latest_verdicts()
+                time.sleep(0.1)
+
+    Raises FileNotFoundError on construction if the app is not running.
+    """
+    def __init__(self, feed_name=FEED_NAME, from_start=False):
+        self.sample_ring = SampleRing.attach(samples_ring_name(feed_name))
+        try:
+            self.verdict_ring = SampleRing.attach(verdicts_ring_name(feed_name))
+        except FileNotFoundError:
+            self.sample_ring.close()
+            raise
+        self.sample_reader = SampleRingReader(self.sample_ring, from_start)
+        self.verdict_reader = SampleRingReader(self.verdict_ring, from_start=True)
+        self.verdicts = [None] * 8
+
+    @property
+    def samples_lost(self):
+        return self.sample_reader.lost
+
+    def read_samples(self):
+        """
+        Return the samples published since the previous call as an (n, 11) array with
+        columns SAMPLE_FIELDS (received_ns, sensor_1..8 [mV], pressure [mbar], elapsed_s).
+        """
+        return self.sample_reader.read()
+
+    def read_records(self):
+        """
+        Same as read_samples(), as a list of {field: value} dicts.
+        """
+        samples = self.read_samples()
+        return [dict(zip(SAMPLE_FIELDS, row)) for row in samples.tolist()]
+
+    def read_verdicts(self):
+        """
+        Return the verdict changes published since the previous call as a list of
+        (received_ns, ["Pass" / "Fail" / None for each sensor]).
+        """
+        changes = []
+        for row in self.verdict_reader.read():
+            verdicts = [VERDICT_NAMES.get(int(code)) for code in row[1:]]
+            changes.append((int(row[RECEIVED_NS]), verdicts))
+            self.verdicts = verdicts
+        return changes
+
+    def latest_verdicts(self):
+        """
+        Return the current verdict of every sensor: "Pass", "Fail" or None.
+        """
+        self.read_verdicts()
+        return list(self.verdicts)
+
+    def close(self):
+        """
+        Detach from the feed. The shared memory stays available to other readers.
+        """
+        self.sample_ring.close()
+        self.verdict_ring.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def is_feed_available(feed_name=FEED_NAME):
+    """
+    Return True if a running app is publishing the named feed.
+    """
+    try:
+        LiveFeedReader(feed_name).close()
+    except FileNotFoundError:
+        return False
+    return True
@@ -0,0 +1,128 @@
+import os
+import time
+import logging
+import hashlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LogCache:
+    """
+    Compressed columnar sidecar cache for parsed run logs.
+
+    Each run log gets one .npz file holding its float arrays, log10 pressure and the
+    pass/fail masks of any limit profiles it has been evaluated against. A run may be
+    split over several segment files; a sidecar is reused while their total size and
+    latest mtime match, or their content hash if only the mtime changed. The cache directory is kept under max_bytes by evicting the least
+    recently used sidecars.
+
+    Logs modified within the last settle_s seconds, such as the run being recorded, are not
+    persisted: their sidecar would be stale after the next sample and hashing them on every
+    read is O(run size).
+    """
+    def __init__(self, cache_dir=os.path.join("Logs", ".cache"), max_bytes=256 * 1024 * 1024, settle_s=5.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.settle_s = settle_s
+
+    def sidecar_path(self, path):
+        """
+        Return the sidecar file used for the given source log.
+        """
+        name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.npz")
+
+    def source_signature(self, sources):
+        """
+        Return the (total size, latest mtime) of a run's segment files.
+        """
+        stats = [os.stat(source) for source in sources]
+        return sum(stat.st_size for stat in stats), max(stat.st_mtime_ns for stat in stats)
+
+    def file_hash(self, sources):
+        """
+        Hash the contents of a run's segment files.
+        """
+        digest = hashlib.sha1()
+        for source in sources:
+            with open(source, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self, path, sources=None):
+        """
+        Return the cached columns for a run log as a dict, or None if there is no valid sidecar.
+        """
+        sources = sources or [path]
+        sidecar = self.sidecar_path(path)
+        if not os.path.exists(sidecar):
+            return None
+
+        try:
+            with np.load(sidecar, allow_pickle=False) as npz:
+                columns = {name: npz[name] for name in npz.files}
+        except Exception as e:
+            logger.error("Error reading log cache %s: %s", sidecar, e)
+            return None
+
+        size, mtime_ns = self.source_signature(sources)
+        if int(columns["source_size"]) != size:
+            return None
+        if int(columns["source_mtime_ns"]) != mtime_ns:
+            # Same size but touched or copied: fall back to comparing contents
+            if str(columns["source_hash"]) != self.file_hash(sources):
+                return None
+
+        # Mark the sidecar as recently used for eviction
+        os.utime(sidecar)
+        return columns
+
+    def store(self, path, columns, sources=None):
+        """
+        Write the columns for a run log to its sidecar and evict old sidecars if needed.
+        """
+        sources = sources or [path]
+        size, mtime_ns = self.source_signature(sources)
+        if time.time_ns() - mtime_ns < self.settle_s * 1e9:
+            logger.debug("Not caching %s, it is still being written", path)
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        columns = dict(columns)
+        columns["source_size"] = np.int64(size)
+        columns["source_mtime_ns"] = np.int64(mtime_ns)
+        columns["source_hash"] = np.str_(self.file_hash(sources))
+
+        sidecar = self.sidecar_path(path)
+        temp_path = sidecar + ".tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                np.savez_compressed(file, **columns)
+            os.replace(temp_path, sidecar)
+        except OSError as e:
+            logger.error("Error writing log cache %s: %s", sidecar, e)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used sidecars until the cache is under its size limit.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
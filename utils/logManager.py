@@ -0,0 +1,99 @@
+import os
+import queue
+import time
+import logging
+import logging.handlers
+import threading
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+LOG_MAX_BYTES = 5 * 1024 * 1024  # Size at which log files are rotated
+LOG_BACKUP_COUNT = 3  # Rotated log files kept
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeats of the same message (same logger, level and format string, whatever its
+    arguments) that arrive within `interval` seconds of the last one let through, so that a call
+    site logging every bad serial line is throttled. The next message that is let through
+    reports how many repeats were suppressed.
+    """
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self.last_emitted = {}  # (logger, level, msg) -> (time, suppressed count)
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.interval <= 0:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        try:
+            hash(key)
+        except TypeError:
+            key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            last_time, suppressed = self.last_emitted.get(key, (None, 0))
+            if last_time is not None and now - last_time < self.interval:
+                self.last_emitted[key] = (last_time, suppressed + 1)
+                return False
+            self.last_emitted[key] = (now, 0)
+
+            # Forget expired entries so distinct messages do not accumulate forever
+            if len(self.last_emitted) > 1024:
+                self.last_emitted = {k: v for k, v in self.last_emitted.items() if now - v[0] < self.interval}
+
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread, so the calling (UI) thread
+    only pays for creating the record and putting it on the queue.
+    """
+    def prepare(self, record):
+        # Exception info is rendered here because traceback objects hold frames of the calling thread
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level="INFO", rate_limit_s=1.0, log_file=os.path.join("Logs", "app.log")):
+    """
+    Route all application logging through a queue to a background listener that writes to the
+    console and a rotating log file.
+
+    Returns:
+        QueueListener: The started listener; call stop() on exit to flush pending records.
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    if log_file:
+        folder = os.path.dirname(log_file)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_s))
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils.logCache import LogCache
+from utils.runWriter import run_base_filename, run_segment_files
+
+
+class ParsedRun:
+    """
+    Parsed contents of a single run log, stored as NumPy arrays.
+    """
+    def __init__(self, filename, pressure, voltages, time=None, log_pressure=None, pass_masks=None):
+        self.filename = filename
+        self.pressure = pressure  # Gauge pressure [mbar], shape (n,)
+        self.voltages = voltages  # Sensor voltages [mV], shape (n, 8)
+        self.time = np.full(len(pressure), np.nan) if time is None else time  # Seconds since run start, NaN for old logs
+        self.log_pressure = np.log10(pressure) if log_pressure is None else log_pressure
+        self.pass_masks = pass_masks or {}  # Limit profile key -> pass mask, shape (n, 8)
+
+    def sensor_points(self, sensor_index):
+        """
+        Return the valid (pressure, voltage) points for one sensor.
+        """
+        voltage = self.voltages[:, sensor_index]
+        valid = ~np.isnan(voltage)
+        return self.pressure[valid], voltage[valid]
+
+    def sensor_pass_mask(self, sensor_index, profile):
+        """
+        Return the pass/fail mask for one sensor's valid points under the given limit profile.
+        """
+        voltage = self.voltages[:, sensor_index]
+        valid = ~np.isnan(voltage)
+        return self.pass_masks[profile.key][valid, sensor_index]
+
+    def columns(self):
+        """
+        Return the arrays to store in a columnar sidecar.
+        """
+        columns = {"pressure": self.pressure, "voltages": self.voltages, "time": self.time, "log_pressure": self.log_pressure}
+        for key, mask in self.pass_masks.items():
+            columns[f"pass_{key}"] = mask
+        return columns
+
+    @classmethod
+    def from_columns(cls, filename, columns):
+        """
+        Rebuild a ParsedRun from the arrays stored in a columnar sidecar.
+        """
+        pass_masks = {name[len("pass_"):]: mask for name, mask in columns.items() if name.startswith("pass_")}
+        return cls(filename, columns["pressure"], columns["voltages"], columns.get("time"), columns["log_pressure"], pass_masks)
+
+
+class LogReader:
+    """
+    Read run logs from disk and keep recently parsed runs in an LRU cache.
+
+    Below the in-memory cache, parsed runs are persisted as columnar sidecars by the
+    LogCache, so re-opening a run skips CSV parsing entirely. A run split into
+    (possibly gzip-compressed) segment files is read as one logical run.
+    """
+    def __init__(self, max_runs=64, log_cache=None, limit_profile=None):
+        self.max_runs = max_runs
+        self.log_cache = log_cache or LogCache()
+        self.limit_profile = limit_profile  # Active LimitProfile used for cached pass/fail masks
+        self.cache = OrderedDict()  # (path, segment count, latest mtime) -> ParsedRun
+        self.cache_lock = threading.Lock()  # Runs are loaded from background threads
+
+    def read_run(self, filename):
+        """
+        Return the parsed run for the given log file, re-reading it only if it changed on disk.
+        """
+        path = os.path.abspath(run_base_filename(filename))
+        sources = run_segment_files(path)
+        if not sources:
+            raise FileNotFoundError(f"No log segments found for {filename}")
+        key = (path, len(sources), max(os.stat(source).st_mtime_ns for source in sources))
+
+        with self.cache_lock:
+            run = self.cache.get(key)
+            if run is not None:
+                self.cache.move_to_end(key)
+
+        if run is None:
+            run = self.load_run(path, sources)
+            with self.cache_lock:
+                # Drop any stale entry for the same file before inserting the new one
+                for stale_key in [k for k in self.cache if k[0] == path]:
+                    del self.cache[stale_key]
+                self.cache[key] = run
+                while len(self.cache) > self.max_runs:
+                    self.cache.popitem(last=False)
+
+        # Evaluate the active limit profile once and persist the mask alongside the run
+        profile = self.limit_profile
+        if profile is not None and profile.key not in run.pass_masks:
+            run.pass_masks[profile.key] = profile.within_limits(run.pressure, run.voltages)
+            self.log_cache.store(path, run.columns(), sources)
+        return run
+
+    def load_run(self, path, sources):
+        """
+        Load a run from its columnar sidecar, parsing the segments and writing the sidecar on a miss.
+        """
+        columns = self.log_cache.load(path, sources)
+        if columns is not None:
+            return ParsedRun.from_columns(path, columns)
+
+        run = self.parse_run(path, sources)
+        if self.limit_profile is not None:
+            run.pass_masks[self.limit_profile.key] = self.limit_profile.within_limits(run.pressure, run.voltages)
+        self.log_cache.store(path, run.columns(), sources)
+        return run
+
+    def parse_run(self, path, sources=None):
+        """
+        Parse a run's segment files into one ParsedRun, skipping rows without a valid pressure.
+        """
+        # Compressed segments are decompressed transparently based on their extension
+        frames = [pd.read_csv(source) for source in (sources or [path])]
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+        # Sensor voltages are the first 8 columns, followed by the pressure and, in newer logs, the time
+        voltages = df.iloc[:, :8].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        pressure = pd.to_numeric(df.iloc[:, 8], errors="coerce").to_numpy(dtype=float)
+        if df.shape[1] > 9:
+            time = pd.to_numeric(df.iloc[:, 9], errors="coerce").to_numpy(dtype=float)
+        else:
+            time = np.full(len(df), np.nan)
+
+        # Skip invalid rows, just like serial
+        valid = ~np.isnan(pressure) & (pressure != 0)
+        return ParsedRun(path, pressure[valid], voltages[valid], time[valid])
+
+    def clear(self):
+        """
+        Drop all cached runs.
+        """
+        with self.cache_lock:
+            self.cache.clear()
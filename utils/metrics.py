@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from utils.logManager import LOG_MAX_BYTES, LOG_BACKUP_COUNT
+
+
+class Counter:
+    """
+    Monotonically increasing count, e.g. lines read.
+    """
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """
+    Last observed value of a quantity, e.g. queue depth.
+    """
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """
+    Latency distribution. Totals cover every observation; percentiles are taken over the
+    most recent `window` observations.
+    """
+    def __init__(self, window=1024):
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.recent.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def observe_many(self, values):
+        """
+        Observe a batch of values (e.g. a NumPy array) under a single lock acquisition.
+        """
+        values = values.tolist() if hasattr(values, "tolist") else [float(value) for value in values]
+        if not values:
+            return
+        with self.lock:
+            self.recent.extend(values[-self.recent.maxlen:])
+            self.count += len(values)
+            self.total += sum(values)
+            self.max = max(self.max, max(values))
+
+    def time(self):
+        """
+        Context manager that observes the elapsed time of its block in seconds.
+        """
+        return _Timer(self)
+
+    def snapshot(self):
+        with self.lock:
+            recent = sorted(self.recent)
+            count, total, maximum = self.count, self.total, self.max
+        if not recent:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": recent[len(recent) // 2],
+            "p95": recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+            "max": maximum
+        }
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process registry of named counters, gauges and latency histograms for the acquisition pipeline.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.last_rate_time = time.monotonic()
+        self.last_rate_values = {}
+        self.rates = {}
+        self.remote = {}  # Prefix -> latest snapshot received from another process
+
+    def get_metric(self, metrics, name, metric_type):
+        """
+        Return the named metric, creating it on first use. Existing metrics are looked up
+        without taking the lock, since hot paths fetch them for every update.
+        """
+        metric = metrics.get(name)
+        if metric is None:
+            with self.lock:
+                if name not in metrics:
+                    metrics[name] = metric_type()
+                metric = metrics[name]
+        return metric
+
+    def counter(self, name):
+        return self.get_metric(self.counters, name, Counter)
+
+    def gauge(self, name):
+        return self.get_metric(self.gauges, name, Gauge)
+
+    def histogram(self, name):
+        return self.get_metric(self.histograms, name, Histogram)
+
+    def set_remote(self, prefix, snapshot):
+        """
+        Include a snapshot taken in another process (e.g. the acquisition process) under the given prefix.
+        """
+        with self.lock:
+            self.remote[prefix] = snapshot
+
+    def collect(self, kind):
+        """
+        Return {name: value} for one kind of metric ("counters", "gauges" or "histograms"),
+        including remote metrics.
+        """
+        with self.lock:
+            local = dict(getattr(self, kind))
+            remote = dict(self.remote)
+        values = {name: metric.snapshot() for name, metric in local.items()}
+        for prefix, snapshot in remote.items():
+            for name, value in snapshot.get(kind, {}).items():
+                values[f"{prefix}.{name}"] = value
+        return dict(sorted(values.items()))
+
+    def update_rates(self):
+        """
+        Recompute per-second rates of all counters since the previous call.
+        """
+        now = time.monotonic()
+        elapsed = now - self.last_rate_time
+        if elapsed <= 0:
+            return self.rates
+        for name, value in self.collect("counters").items():
+            self.rates[name] = (value - self.last_rate_values.get(name, 0)) / elapsed
+            self.last_rate_values[name] = value
+        self.last_rate_time = now
+        return self.rates
+
+    def snapshot(self):
+        """
+        Return the current value of every metric as a JSON-serialisable dict.
+        """
+        return {
+            "time": datetime.now().astimezone().isoformat(),
+            "counters": self.collect("counters"),
+            "rates": dict(sorted(self.rates.items())),
+            "gauges": self.collect("gauges"),
+            "histograms": self.collect("histograms")
+        }
+
+    def write_snapshot(self, path, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        """
+        Append a snapshot to a JSON-lines file for diagnosing performance problems after the fact.
+        The file is rotated like the app log once it reaches max_bytes (path.1 is the newest
+        backup), so stations running for weeks keep a bounded history.
+        """
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            for index in range(backup_count - 1, 0, -1):
+                if os.path.exists(f"{path}.{index}"):
+                    os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+            if backup_count:
+                os.replace(path, f"{path}.1")
+            else:
+                os.remove(path)
+        with open(path, "a") as file:
+            file.write(json.dumps(self.snapshot()) + "\n")
+
+
+# Shared registry for the whole application
+registry = MetricsRegistry()
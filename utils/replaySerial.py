@@ -0,0 +1,113 @@
+import time
+import logging
+from collections import deque
+import numpy as np
+from utils.logReader import LogReader
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class ReplaySerial:
+    """
+    Stand-in for serial.Serial that plays a recorded run back through the live ingest path.
+
+    It answers the same commands as the test fixture firmware (ENQ handshake/heartbeat, "p" to
+    start and "r" to stop a test) and, while a test is running, emits the recorded samples in
+    the firmware's line format. Samples are paced by the recorded time column divided by
+    `speed`; a speed of 0 emits them as fast as the reader consumes them. Logs without a time
+    column are paced at `nominal_interval_s` per sample.
+    """
+    def __init__(self, filename, speed=1.0, nominal_interval_s=0.5, log_reader=None):
+        self.filename = filename
+        self.speed = speed
+        self.is_open = True
+        self.responses = deque()  # Command responses waiting to be read
+        self.handshake_done = False
+        self.streaming = False
+        self.stream_start = 0.0
+        self.index = 0
+        self.reported = False
+
+        run = (log_reader or LogReader()).read_run(filename)
+        self.lines = [self.format_line(voltages, pressure) for voltages, pressure in zip(run.voltages, run.pressure)]
+
+        # Offsets (in recorded seconds) at which each sample should be emitted
+        if len(run.time) and not np.isnan(run.time).any():
+            self.offsets = (run.time - run.time[0]).tolist()
+        else:
+            self.offsets = (np.arange(len(self.lines)) * nominal_interval_s).tolist()
+
+        logger.info("Replay loaded %d samples from %s at %s speed", len(self.lines), filename, f"{speed}x" if speed else "maximum")
+
+    def format_line(self, voltages, pressure):
+        """
+        Convert a logged sample back to the line the firmware sends (sensor values before the mV conversion).
+        """
+        values = [f"{voltage * 300 / 1000:.6f}" for voltage in voltages]
+        return ",".join(values + [f"{pressure:.6e}"])
+
+    def sample_due(self):
+        if not self.streaming or self.index >= len(self.lines):
+            return False
+        if not self.speed:
+            return True
+        return time.perf_counter() - self.stream_start >= self.offsets[self.index] / self.speed
+
+    @property
+    def in_waiting(self):
+        if self.responses or self.sample_due():
+            return 1
+        if self.streaming and self.index >= len(self.lines):
+            self.report_throughput()
+        return 0
+
+    def readline(self):
+        if self.responses:
+            return (self.responses.popleft() + "\n").encode("utf-8")
+        if self.sample_due():
+            line = self.lines[self.index]
+            self.index += 1
+            return (line + "\n").encode("utf-8")
+        if self.streaming and self.index >= len(self.lines):
+            self.report_throughput()
+        return b""  # Behave like a serial read that timed out
+
+    def write(self, data):
+        command = data.decode("utf-8").strip()
+        if command == "ENQ":
+            self.responses.append("ACK")
+            if not self.handshake_done:
+                self.responses.append("Error status format: SD card initialisation, SD card log, ADC, RS485")
+                self.responses.append("0, 0, 0, 0")
+                self.handshake_done = True
+        elif command == "p":
+            self.responses.append("Simulated button press from serial.")
+            self.streaming = True
+            self.stream_start = time.perf_counter()
+            self.index = 0
+            self.reported = False
+        elif command == "r":
+            self.report_throughput()
+            self.streaming = False
+        return len(data)
+
+    def report_throughput(self):
+        """
+        Log and record the sample rate achieved once the replay has been consumed or stopped.
+        """
+        if not self.streaming or self.reported:
+            return
+
+        self.reported = True
+        elapsed = time.perf_counter() - self.stream_start
+        rate = self.index / elapsed if elapsed > 0 else 0.0
+        recorded = self.offsets[self.index - 1] if self.index else 0.0
+        registry.gauge("replay.samples_per_second").set(rate)
+        logger.info(
+            "Replay finished: %d samples in %.2f s (%.1f samples/s, %.1fx recorded speed)",
+            self.index, elapsed, rate, recorded / elapsed if elapsed > 0 else 0.0
+        )
+
+    def close(self):
+        self.is_open = False
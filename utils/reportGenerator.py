@@ -0,0 +1,233 @@
+import os
+import csv
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from utils.limitProfile import LimitProfile
+from utils.logReader import LogReader
+from utils.runWriter import run_base_filename
+from utils.voutCheck import capture_vout, get_resistor_values, describe_vout
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# "Verdict" is the limit check, like the live pass/fail label; "Vout check" is the Vout
+# interpretation shown in the live Vout annotation (describe_vout)
+SUMMARY_HEADER = ["Sensor", "Verdict", "Worst margin [mV]", "Vout", "Vout check", "R9 [ohm]", "R10"]
+
+
+def evaluate_sensor(sensor_index, pressure, voltage, profile, mode):
+    """
+    Summarise one sensor of a run.
+
+    Returns:
+        dict: Summary row with the keys of SUMMARY_HEADER.
+    """
+    row = {"Sensor": sensor_index + 1, "Verdict": "No data", "Worst margin [mV]": "", "Vout": "", "Vout check": "", "R9 [ohm]": "", "R10": ""}
+    if not len(pressure):
+        return row
+
+    margins = profile.margins(pressure, voltage)
+    row["Verdict"] = "Pass" if (margins >= 0).all() else "Fail"
+    row["Worst margin [mV]"] = round(float(margins.min()), 3)
+
+    vout = capture_vout(pressure, voltage)
+    if vout is None:
+        return row
+    row["Vout check"] = "Pass" if describe_vout(vout, mode)["passed"] else "Fail"
+    if mode == "Pressure Sensor Assembly":
+        row["Vout"] = f"{(vout / 1000) * 300:.4f} V"
+    else:
+        row["Vout"] = f"{vout:.2f} mV"
+        resistor_values = get_resistor_values(vout)
+        if resistor_values:
+            row["R9 [ohm]"], row["R10"] = resistor_values
+        else:
+            row["R9 [ohm]"] = "Out of range"
+    return row
+
+
+def render_sensor_page(job):
+    """
+    Render one sensor's plot to PNG. Runs in a worker process with the Agg backend.
+
+    Returns:
+        tuple: (summary row, PNG path)
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    i = job["sensor_index"]
+    pressure, voltage = job["pressure"], job["voltage"]
+    profile = LimitProfile(job["lower_params"], job["upper_params"])
+    row = evaluate_sensor(i, pressure, voltage, profile, job["mode"])
+
+    lut_pressure = np.asarray(job["lut_pressure"])
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(lut_pressure, job["lut_average"], label="LUT Average", color="red", linestyle="-")
+    ax.plot(lut_pressure, profile.upper_limit(lut_pressure), label="Upper Limit", color="green", linestyle="--")
+    ax.plot(lut_pressure, profile.lower_limit(lut_pressure), label="Lower Limit", color="green", linestyle="--")
+
+    if len(pressure):
+        passed = profile.within_limits(pressure, voltage)
+        ax.scatter(pressure[passed], voltage[passed], label=f"Sensor {i + 1} Pass", color="blue", marker="o", s=12)
+        if not passed.all():
+            ax.scatter(pressure[~passed], voltage[~passed], label=f"Sensor {i + 1} Failure", color="purple", marker="o", s=12)
+
+    verdict_color = {"Pass": "green", "Fail": "red"}.get(row["Verdict"], "gray")
+    ax.text(0.05, 0.95, row["Verdict"], color=verdict_color, fontsize=12, transform=ax.transAxes, verticalalignment="top")
+    if row["Vout"]:
+        details = f"Vout = {row['Vout']}"
+        if row["R10"]:
+            details += f"\nR9 = {row['R9 [ohm]']} Ω\nR10 = {row['R10']}"
+        ax.text(0.05, 0.05, details, color="blue", fontsize=10, transform=ax.transAxes, verticalalignment="bottom")
+
+    ax.set_title(f"{job['run_name']} - Sensor {i + 1}: Voltage vs Pressure", fontsize=14)
+    ax.set_xlabel("Gauge Pressure [mbar]", fontsize=12)
+    ax.set_ylabel("Sensor Voltage [mV]", fontsize=12)
+    ax.set_xscale("log")
+    ax.legend()
+
+    png_path = os.path.join(job["output_dir"], f"sensor_{i + 1}.png")
+    fig.savefig(png_path, dpi=120)
+    plt.close(fig)
+    return row, png_path
+
+
+def render_report_pdf(run_name, rows, png_paths, pdf_path):
+    """
+    Bundle the summary table and the sensor plots into one PDF. Runs in a worker process.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with PdfPages(pdf_path) as pdf:
+        fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 landscape
+        ax.axis("off")
+        ax.set_title(f"Test report: {run_name}", fontsize=16)
+        table = ax.table(
+            cellText=[[str(row[column]) for column in SUMMARY_HEADER] for row in rows],
+            colLabels=SUMMARY_HEADER, loc="center", cellLoc="center"
+        )
+        table.scale(1, 1.6)
+        for r, row in enumerate(rows, start=1):
+            for column in ("Verdict", "Vout check"):
+                color = {"Pass": "#c8e6c9", "Fail": "#ffcdd2"}.get(row[column], "white")
+                table[r, SUMMARY_HEADER.index(column)].set_facecolor(color)
+        pdf.savefig(fig)
+        plt.close(fig)
+
+        for png_path in png_paths:
+            fig, ax = plt.subplots(figsize=(11.69, 8.27))
+            ax.imshow(plt.imread(png_path))
+            ax.axis("off")
+            pdf.savefig(fig)
+            plt.close(fig)
+    return pdf_path
+
+
+class ReportGenerator:
+    """
+    Generates end-of-run reports (one PNG per sensor, a summary CSV and a PDF bundle) in the
+    background.
+
+    The sensor plots are rendered with the Agg backend in a pool of worker processes, so a
+    report never blocks the Tk main loop and the eight plots render in parallel.
+    """
+    def __init__(self, lut_pressure, lut_average, limit_profile, log_reader=None, output_root="Reports", max_workers=4):
+        self.lut_pressure = list(lut_pressure)
+        self.lut_average = list(lut_average)
+        self.limit_profile = limit_profile
+        self.log_reader = log_reader or LogReader(limit_profile=limit_profile)
+        self.output_root = output_root
+        self.max_workers = max_workers
+        self.pool = None  # Started on first use
+        self.pool_lock = threading.Lock()
+
+    def get_pool(self):
+        with self.pool_lock:
+            if self.pool is None:
+                # Spawn so that workers don't inherit the Tk process state
+                self.pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self.pool
+
+    def output_dir(self, filename):
+        run_name = os.path.splitext(os.path.basename(run_base_filename(filename)))[0]
+        return run_name, os.path.join(self.output_root, run_name)
+
+    def generate(self, filename, mode, on_done=None):
+        """
+        Start generating the report for a run log. Returns immediately.
+
+        on_done(pdf_path, rows) is called from a background thread when the report is written,
+        or on_done(None, error message) if it failed.
+        """
+        thread = threading.Thread(target=self.generate_report, args=(filename, mode, on_done), daemon=True)
+        thread.start()
+        return thread
+
+    def generate_report(self, filename, mode, on_done=None):
+        try:
+            with registry.histogram("report.generate_seconds").time():
+                pdf_path, rows = self.build_report(filename, mode)
+            logger.info("Report written to %s", pdf_path)
+            result = (pdf_path, rows)
+        except Exception as e:
+            logger.error("Error generating report for %s: %s", filename, e)
+            result = (None, str(e))
+        if on_done:
+            on_done(*result)
+
+    def build_report(self, filename, mode):
+        # The last segment of a run may still be being compressed when the test has just stopped
+        for attempt in range(3):
+            try:
+                run = self.log_reader.read_run(filename)
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+                time.sleep(1)
+        run_name, output_dir = self.output_dir(filename)
+        os.makedirs(output_dir, exist_ok=True)
+
+        pool = self.get_pool()
+        futures = []
+        for i in range(8):
+            pressure, voltage = run.sensor_points(i)
+            futures.append(pool.submit(render_sensor_page, {
+                "sensor_index": i,
+                "pressure": pressure,
+                "voltage": voltage,
+                "lut_pressure": self.lut_pressure,
+                "lut_average": self.lut_average,
+                "lower_params": self.limit_profile.lower_params,
+                "upper_params": self.limit_profile.upper_params,
+                "mode": mode,
+                "run_name": run_name,
+                "output_dir": output_dir
+            }))
+        results = [future.result() for future in futures]
+        rows = [row for row, _ in results]
+        png_paths = [png_path for _, png_path in results]
+
+        with open(os.path.join(output_dir, "summary.csv"), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=SUMMARY_HEADER)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        pdf_path = os.path.join(output_dir, f"{run_name}_report.pdf")
+        pool.submit(render_report_pdf, run_name, rows, png_paths, pdf_path).result()
+        return pdf_path, rows
+
+    def shutdown(self):
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
@@ -0,0 +1,55 @@
+import numpy as np
+from utils.voutCheck import VOUT_CAPTURE_PRESSURE, describe_vout
+
+
+class RunEvaluator:
+    """
+    Live pass/fail evaluation of the sensors during a run, independent of the GUI.
+
+    A sensor passes while all of its points are within the limits; once a point falls outside,
+    "Fail" is latched for the rest of the run. Each sensor's Vout is captured once, from the
+    first point at or below VOUT_CAPTURE_PRESSURE.
+    """
+    def __init__(self, limit_profile, sensors=8):
+        self.limit_profile = limit_profile
+        self.sensors = sensors
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the latched verdicts and captured Vout so that a new run is evaluated from scratch.
+        """
+        self.verdicts = [None] * self.sensors  # "Pass", "Fail" or None if not yet evaluated
+        self.vout = [None] * self.sensors  # describe_vout() of each captured Vout
+
+    def evaluate(self, pressures, voltages, mode):
+        """
+        Evaluate a batch of samples.
+
+        Parameters:
+            pressures (array): Gauge pressures [mbar], shape (n,).
+            voltages (array): Sensor voltages [mV], shape (n, sensors).
+            mode (str): Test mode, see describe_vout().
+
+        Returns:
+            tuple: (sensors whose verdict changed, sensors whose Vout was captured by this batch)
+        """
+        changed, captured = [], []
+        if not len(pressures):
+            return changed, captured
+
+        passed = self.limit_profile.within_limits(pressures, voltages).all(axis=0)
+        low_pressure = np.nonzero((pressures > 0) & (pressures <= VOUT_CAPTURE_PRESSURE))[0]
+        for i in range(self.sensors):
+            verdict = "Pass" if passed[i] and self.verdicts[i] != "Fail" else "Fail"
+            if verdict != self.verdicts[i]:
+                self.verdicts[i] = verdict
+                changed.append(i)
+
+            if len(low_pressure) and self.vout[i] is None:
+                self.vout[i] = describe_vout(float(voltages[low_pressure[0], i]), mode)
+                captured.append(i)
+        return changed, captured
+
+    def vout_captured(self):
+        return [vout is not None for vout in self.vout]
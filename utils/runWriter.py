@@ -0,0 +1,222 @@
+import os
+import logging
+import re
+import csv
+import glob
+import gzip
+import time
+import shutil
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Rows are 8 sensor voltages [mV], the gauge pressure [mbar] and the receive time [s] since run start.
+# Logs written before the time column was added have only the first 9 columns.
+CSV_HEADER = ["Sensor 1", "Sensor 2", "Sensor 3", "Sensor 4", "Sensor 5", "Sensor 6", "Sensor 7", "Sensor 8", "Gauge Pressure", "Time [s]"]
+
+SEGMENT_PATTERN = re.compile(r"\.part(\d+)$")
+
+
+def run_base_filename(filename):
+    """
+    Return the logical run filename for any of its segment files.
+    e.g. Logs/pressure_data_5.part002.csv.gz -> Logs/pressure_data_5.csv
+    """
+    if filename.endswith(".gz"):
+        filename = filename[:-len(".gz")]
+    base_name, extension = os.path.splitext(filename)
+    return SEGMENT_PATTERN.sub("", base_name) + extension
+
+
+def segment_index(path):
+    """
+    Return the segment number of a segment file (0 for the run file itself).
+    """
+    if path.endswith(".gz"):
+        path = path[:-len(".gz")]
+    match = SEGMENT_PATTERN.search(os.path.splitext(path)[0])
+    return int(match.group(1)) if match else 0
+
+
+def segment_filename(filename, index):
+    """
+    Return the filename of a run segment. Segment 0 is the run file itself.
+    """
+    if index == 0:
+        return filename
+    base_name, extension = os.path.splitext(filename)
+    return f"{base_name}.part{index:03d}{extension}"
+
+
+def run_metadata_filename(filename):
+    """
+    Return the JSON metadata file stored next to a run log.
+    """
+    return os.path.splitext(run_base_filename(filename))[0] + ".json"
+
+
+def run_segment_files(filename):
+    """
+    Return the existing segment files of a run in order, compressed or not.
+    """
+    filename = run_base_filename(filename)
+    base_name, extension = os.path.splitext(filename)
+
+    candidates = [filename, filename + ".gz"]
+    candidates += glob.glob(glob.escape(base_name) + ".part*" + extension)
+    candidates += glob.glob(glob.escape(base_name) + ".part*" + extension + ".gz")
+
+    segments = {}
+    for path in candidates:
+        if not os.path.exists(path):
+            continue
+        index = segment_index(path)
+        # Prefer the uncompressed file while compression of that segment is in progress
+        if index not in segments or not path.endswith(".gz"):
+            segments[index] = path
+    return [segments[index] for index in sorted(segments)]
+
+
+def find_runs(folder="Logs"):
+    """
+    Return the logical run logs in a folder, one per run however many segments it has.
+    """
+    paths = glob.glob(os.path.join(folder, "*.csv")) + glob.glob(os.path.join(folder, "*.csv.gz"))
+    runs = {run_base_filename(path) for path in paths}
+    # Batch summaries from station mode live next to the runs
+    return sorted(run for run in runs if not os.path.basename(run).startswith("batch_"))
+
+
+class SegmentCompressor:
+    """
+    Background worker that compresses completed run segments so the acquisition path
+    never blocks on compression.
+    """
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, path):
+        """
+        Queue a completed segment for compression.
+        """
+        self.jobs.put(path)
+
+    def run(self):
+        while True:
+            path = self.jobs.get()
+            try:
+                self.compress(path)
+            except Exception as e:
+                logger.error("Error compressing log segment %s: %s", path, e)
+            finally:
+                self.jobs.task_done()
+
+    def compress(self, path):
+        """
+        Gzip a segment next to itself and remove the original once the archive is complete.
+        """
+        temp_path = path + ".gz.tmp"
+        with open(path, "rb") as src, gzip.open(temp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(temp_path, path + ".gz")
+        os.remove(path)
+
+
+class RunWriter:
+    """
+    Append rows to a run log, rolling over into a new segment file once the current one
+    reaches max_segment_bytes or max_segment_seconds (0 disables either limit).
+    Completed segments are handed to the compressor when compression is "gzip".
+    """
+    def __init__(self, filename, max_segment_bytes=0, max_segment_seconds=0, compression="gzip", compressor=None):
+        self.filename = filename
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.compression = compression
+        self.compressor = compressor
+        self.file = None
+        self.writer = None
+        self.segment_index = 0
+        self.segment_started = 0.0
+
+        # Continue after the last existing segment if the run is being appended to
+        existing = run_segment_files(filename)
+        if existing:
+            self.segment_index = segment_index(existing[-1])
+            if existing[-1].endswith(".gz"):
+                self.segment_index += 1
+        self.open_segment()
+
+    def open_segment(self):
+        """
+        Open the current segment for appending, writing the header if it is new. An existing
+        segment with a different header, e.g. an old 9-column log, is left alone and the rows
+        go to the next segment instead.
+        """
+        path = segment_filename(self.filename, self.segment_index)
+        while not self.can_append(path):
+            logger.warning("%s has a different header, continuing the run in a new segment", path)
+            self.segment_index += 1
+            path = segment_filename(self.filename, self.segment_index)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, mode='a', newline='', buffering=1)  # Line buffered so rows reach disk promptly
+        self.writer = csv.writer(self.file)
+        if is_new:
+            self.writer.writerow(CSV_HEADER)
+        self.segment_started = time.monotonic()
+
+    @staticmethod
+    def can_append(path):
+        """
+        True if path doesn't exist yet, is empty or starts with CSV_HEADER.
+        """
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return True
+        with open(path, newline='') as file:
+            return next(csv.reader(file), None) == CSV_HEADER
+
+    def write_row(self, data):
+        """
+        Append one row, rolling over to a new segment first if the current one is full.
+        """
+        if self.segment_full():
+            self.roll_over()
+        self.writer.writerow(data)
+
+    def segment_full(self):
+        if self.max_segment_bytes and self.file.tell() >= self.max_segment_bytes:
+            return True
+        if self.max_segment_seconds and time.monotonic() - self.segment_started >= self.max_segment_seconds:
+            return True
+        return False
+
+    def roll_over(self):
+        """
+        Close the current segment, queue it for compression and start the next one.
+        """
+        self.close_segment()
+        self.segment_index += 1
+        self.open_segment()
+
+    def close_segment(self):
+        path = self.file.name
+        self.file.close()
+        self.file = None
+        if self.compression == "gzip" and self.compressor:
+            self.compressor.submit(path)
+
+    def close(self):
+        """
+        Close the run. The final segment is only compressed if the run was split into segments,
+        so unsegmented runs stay plain CSV files.
+        """
+        if self.file is None:
+            return
+        if self.segment_index == 0:
+            self.file.close()
+            self.file = None
+        else:
+            self.close_segment()
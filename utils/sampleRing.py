@@ -0,0 +1,185 @@
+import os
+import sys
+import numpy as np
+from multiprocessing import shared_memory
+
+# Columns of one sample slot
+SAMPLE_FIELDS = ["received_ns"] + [f"sensor_{i + 1}" for i in range(8)] + ["pressure", "elapsed_s"]
+RECEIVED_NS = 0
+SENSORS = slice(1, 9)
+PRESSURE = 9
+ELAPSED_S = 10
+
+HEADER_WORDS = 4  # write sequence, capacity, slot width, owner PID
+OWNER_PID = 3
+
+
+def process_alive(pid):
+    """
+    Return True if a process with the given PID is running.
+    """
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # Access denied: it exists but belongs to someone else
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def attach_shared_memory(name, untrack=True):
+    """
+    Attach to an existing shared memory block without letting this process's resource
+    tracker unlink it on exit (only the creator owns the block).
+
+    Child processes started by the creator share its resource tracker and must pass
+    untrack=False, otherwise they would remove the creator's own registration.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if not untrack:
+            return shm
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass  # Windows has no resource tracker for shared memory
+        return shm
+
+
+class SampleRing:
+    """
+    Single-writer, multi-reader ring buffer of samples in shared memory.
+
+    The header holds a monotonically increasing write sequence. The writer fills the slot for
+    sequence n and only then publishes n + 1, so readers never see a half-written slot. Readers
+    that fall more than `capacity` samples behind lose the oldest samples and are told how many.
+    """
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[1])
+        self.width = int(self.header[2])
+        self.slots = np.ndarray((self.capacity, self.width), dtype=np.float64, buffer=shm.buf, offset=HEADER_WORDS * 8)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, capacity=65536, width=len(SAMPLE_FIELDS), name=None):
+        """
+        Create a new ring. The creating process owns it and unlinks it on close().
+
+        A fixed name lets other processes find the ring. A block of that name left behind by a
+        process that crashed is replaced, but one whose owner is still running is not.
+
+        Raises:
+            FileExistsError: Another running process owns a ring of that name.
+        """
+        size = HEADER_WORDS * 8 + capacity * width * 8
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Untracked, so that refusing doesn't unlink the owner's block when this process exits
+            existing = attach_shared_memory(name)
+            owner_pid = int(np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=existing.buf)[OWNER_PID])
+            existing.close()
+            if process_alive(owner_pid) and owner_pid != os.getpid():
+                raise FileExistsError(f"Shared memory {name} is in use by process {owner_pid}")
+            stale = attach_shared_memory(name, untrack=False)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = [0, capacity, width, os.getpid()]
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name, untrack=True):
+        """
+        Attach to a ring created by another process (see attach_shared_memory for untrack).
+        """
+        return cls(attach_shared_memory(name, untrack), owner=False)
+
+    @property
+    def write_seq(self):
+        return int(self.header[0])
+
+    def write(self, row):
+        """
+        Append one sample. Only one process may write to a ring.
+        """
+        seq = int(self.header[0])
+        self.slots[seq % self.capacity] = row
+        self.header[0] = seq + 1
+
+    def read_since(self, next_seq):
+        """
+        Copy the samples written since next_seq.
+
+        Returns:
+            tuple: (samples array, new next_seq, number of samples lost to overruns)
+        """
+        end = int(self.header[0])
+        if end <= next_seq:
+            return np.empty((0, self.width)), next_seq, 0
+
+        start = max(next_seq, end - self.capacity)
+        indices = np.arange(start, end) % self.capacity
+        samples = self.slots[indices].copy()
+
+        # Slots the writer may have reused while we were copying are discarded
+        oldest_valid = int(self.header[0]) - self.capacity
+        if oldest_valid > start:
+            samples = samples[oldest_valid - start:]
+            start = oldest_valid
+        return samples, end, start - next_seq
+
+    def close(self):
+        # Views into the buffer must be released before the block can be closed
+        self.header = None
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SampleRingReader:
+    """
+    Cursor over a SampleRing that returns each sample once.
+    """
+    def __init__(self, ring, from_start=False):
+        self.ring = ring
+        self.next_seq = 0 if from_start else ring.write_seq
+        self.lost = 0
+
+    def read(self):
+        """
+        Return the samples written since the previous read, shape (n, width).
+        """
+        samples, self.next_seq, lost = self.ring.read_since(self.next_seq)
+        self.lost += lost
+        return samples
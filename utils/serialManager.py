@@ -1,11 +1,17 @@
 import serial
 import serial.tools.list_ports
-import threading
+import time
+import logging
+from utils.replaySerial import ReplaySerial
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
 
 class SerialManager:
     def __init__(self):
         self.ser = None
-        self.serial_lock = threading.Lock()  # Add a threading lock for thread-safe access
+        self.replay_file = None  # Recorded run to play back instead of opening the COM port
+        self.replay_speed = 1.0
 
 
     def find_com_port(self):
@@ -14,49 +20,76 @@ class SerialManager:
         """
         ports = serial.tools.list_ports.comports()
         for port in ports:
-            print(f"Found port: {port.device}")
-            print(f"port hwid: {port.hwid}")
-            print(f"port pid: {port.pid}")
-            print(f"port description: {port.description}")
+            logger.debug("Found port: %s (hwid: %s, pid: %s, description: %s)", port.device, port.hwid, port.pid, port.description)
 
             if "Arduino Leonardo ETH" in port.description:
                 return port.device
         return None
 
-    def initialize(self, baud_rate=9600, timeout=1):
+    def set_replay(self, filename, speed=1.0):
         """
-        Initialize the serial communication with the Arduino device.
+        Play back a recorded run instead of talking to the Arduino on the next initialize().
+        Pass filename=None to go back to the real device. A speed of 0 replays as fast as possible.
+        """
+        self.replay_file = filename
+        self.replay_speed = speed
+
+    def open_port(self, baud_rate, timeout):
         """
+        Open the Arduino's COM port, or the replay source if one is set.
+        """
+        if self.replay_file:
+            return ReplaySerial(self.replay_file, self.replay_speed)
+
         com_port = self.find_com_port()
         if not com_port:
-            print("No COM port found!")
-            return False
+            logger.error("No COM port found!")
+            return None
+        return serial.Serial(com_port, baud_rate, timeout=timeout)
 
+    def initialize(self, baud_rate=9600, timeout=1):
+        """
+        Initialize the serial communication with the Arduino device.
+        """
         try:
-            self.ser = serial.Serial(com_port, baud_rate, timeout=timeout)
+            self.ser = self.open_port(baud_rate, timeout)
+            if not self.ser:
+                return False
             self.ser.write(b'ENQ\n')  # Send handshake command
             response = self.ser.readline().decode('utf-8').strip()
             if response == "ACK":
-                print("Handshake successful!")
+                logger.info("Handshake successful!")
 
                 # Read the error status sent by the microcontroller
                 error_status_format = self.ser.readline().decode('utf-8').strip()
                 if "Error status format" in error_status_format:
                     error_status = self.ser.readline().decode('utf-8').strip()
-                    print(f"Initial Error Status: {error_status}")
+                    logger.info("Initial error status: %s", error_status)
                     return error_status.split(", ")  # Return the parsed error status as a list
                 else:
-                    print("No error status received after handshake.")
+                    logger.warning("No error status received after handshake.")
                     return ["N/A", "N/A", "N/A", "N/A"]  # Default to "N/A" if no error status is received
             else:
-                print("Handshake failed!")
+                logger.error("Handshake failed!")
                 self.ser.close()
                 self.ser = None
                 return False
         except Exception as e:
-            print(f"Error initializing serial communication: {e}")
+            logger.error("Error initializing serial communication: %s", e)
             return False
 
+    def read_line(self):
+        """
+        Read one line from the Arduino device and stamp it with a monotonic high-resolution
+        receive time (time.perf_counter_ns) taken immediately after the read returns.
+
+        Returns:
+            tuple: (line, received_ns)
+        """
+        raw_line = self.ser.readline()
+        received_ns = time.perf_counter_ns()
+        return raw_line.decode('utf-8').strip(), received_ns
+
     def send_command(self, command):
         """
         Send a command to the Arduino device.
@@ -64,16 +97,84 @@ class SerialManager:
         if self.ser:
             self.ser.write(command.encode())
 
-    def send_heartbeat(self):
+    def drain_lines(self):
         """
-        Send a heartbeat signal to the Arduino device.
+        Read and return lines until the device goes quiet (a read times out).
         """
-        if self.ser:
-            self.ser.write(b'ENQ\n')
-            response = self.ser.readline().decode('utf-8').strip()
-            return response == "ACK"
+        lines = []
+        line = self.ser.readline().decode('utf-8').strip()
+        while line != "":
+            lines.append(line)
+            line = self.ser.readline().decode('utf-8').strip()
+        return lines
+
+    def start_test(self, timeout=2, max_wait=10):
+        """
+        Send the start command and wait for the Arduino to confirm it, re-sending the command
+        every `timeout` seconds.
+
+        Returns:
+            bool: True once the start was confirmed, False if it was not within max_wait seconds.
+        """
+        for confirmation in self.drain_lines():
+            logger.debug("Confirmation: %s", confirmation)
+
+        self.send_command("p")
+        start_time = time.time()
+        sent_time = start_time
+        while time.time() - start_time < max_wait:
+            # Check for timeout
+            if time.time() - sent_time > timeout:
+                self.send_command("p")
+                sent_time = time.time()
+
+            # Read confirmation from Arduino
+            confirmation = self.ser.readline().decode('utf-8').strip()
+            logger.debug("Confirmation: %s", confirmation)
+            if confirmation == "Simulated button press from serial.":
+                logger.info("Button press confirmed!")
+                return True
+            time.sleep(0.1)
+
+        logger.error("Timeout waiting for confirmation from Arduino.")
         return False
 
+    def stop_test(self):
+        """
+        Send the stop command and discard whatever the Arduino sends until it goes quiet.
+        """
+        self.send_command("r")
+        for confirmation in self.drain_lines():
+            logger.debug("Confirmation: %s", confirmation)
+
+    def heartbeat(self):
+        """
+        Collect any error status the Arduino has sent, then check it still answers ENQ.
+
+        Returns:
+            tuple: (alive, latest error status list or None)
+        """
+        error_status_list = None
+        for response in self.drain_lines():
+            # Parse error status if present
+            if response.startswith("1") or response.startswith("0"):
+                logger.debug("Heartbeat error status: %s", response)
+                error_status_list = response.split(", ")
+
+        sent_at = time.perf_counter()
+        self.ser.write(b'ENQ\n')  # Send heartbeat command
+        response = self.ser.readline().decode('utf-8').strip()
+        logger.debug("Heartbeat response: %s", response)
+
+        if response == "ACK":
+            registry.histogram("heartbeat.round_trip_seconds").observe(time.perf_counter() - sent_at)
+            logger.debug("Heartbeat successful.")
+            return True, error_status_list
+
+        registry.counter("heartbeat.failures").inc()
+        logger.warning("Heartbeat failed.")
+        return False, error_status_list
+
     def close(self):
         """
         Close the serial connection.
@@ -81,4 +182,4 @@ class SerialManager:
         if self.ser and self.ser.is_open:
             self.ser.close()
             self.ser = None
-            print("Serial connection closed.")
\ No newline at end of file
+            logger.info("Serial connection closed.")
\ No newline at end of file
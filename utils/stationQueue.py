@@ -0,0 +1,131 @@
+import os
+import csv
+import time
+from datetime import datetime
+
+# Unit states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"
+
+
+class StationUnit:
+    """
+    One device under test in a batch.
+    """
+    def __init__(self, serial_number):
+        self.serial_number = serial_number
+        self.state = PENDING
+        self.log_filename = None
+        self.started = None  # time.monotonic() at test start
+        self.duration_s = None
+        self.stop_reason = None
+        self.verdicts = None  # "Pass", "Fail" or None for each sensor
+
+    @property
+    def result(self):
+        if self.verdicts is None:
+            return ""
+        if all(verdict == "Pass" for verdict in self.verdicts):
+            return "Pass"
+        return "Fail" if "Fail" in self.verdicts else "Incomplete"
+
+
+class StationQueue:
+    """
+    Batch of serial numbers tested one after another in station mode.
+
+    The queue only tracks units and their results; the Station tab sequences the tests.
+    Completed units are appended to a batch summary CSV as they finish.
+    """
+    def __init__(self, summary_folder="Logs"):
+        self.units = []
+        self.summary_folder = summary_folder
+        self.batch_id = None
+        self.batch_started = None
+        self.summary_filename = None
+
+    def add(self, serial_number):
+        """
+        Add a serial number to the end of the batch. Returns False for blanks and duplicates.
+        """
+        serial_number = serial_number.strip()
+        if not serial_number or any(unit.serial_number == serial_number and unit.state == PENDING for unit in self.units):
+            return False
+        self.units.append(StationUnit(serial_number))
+        return True
+
+    def clear(self):
+        """
+        Drop all units that have not been tested yet.
+        """
+        self.units = [unit for unit in self.units if unit.state != PENDING]
+
+    def pending(self):
+        return [unit for unit in self.units if unit.state == PENDING]
+
+    def current(self):
+        return next((unit for unit in self.units if unit.state == RUNNING), None)
+
+    def next_unit(self):
+        return next((unit for unit in self.units if unit.state == PENDING), None)
+
+    def begin_batch(self):
+        if self.batch_id is None:
+            self.batch_started = time.monotonic()
+            self.batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.summary_filename = os.path.join(self.summary_folder, f"batch_{self.batch_id}.csv")
+
+    def end_batch(self):
+        self.batch_id = None
+        self.batch_started = None
+
+    def position(self, unit):
+        """
+        1-based position of a unit in the batch.
+        """
+        return self.units.index(unit) + 1
+
+    def start_unit(self, unit, log_filename):
+        unit.state = RUNNING
+        unit.log_filename = log_filename
+        unit.started = time.monotonic()
+
+    def finish_unit(self, unit, stop_reason, verdicts):
+        unit.state = DONE
+        unit.stop_reason = stop_reason
+        unit.verdicts = list(verdicts)
+        unit.duration_s = round(time.monotonic() - unit.started, 1)
+        self.append_summary(unit)
+
+    def skip_unit(self, unit):
+        unit.state = SKIPPED
+
+    def units_per_hour(self):
+        done = [unit for unit in self.units if unit.state == DONE]
+        if not done or self.batch_started is None:
+            return 0.0
+        elapsed_h = (time.monotonic() - self.batch_started) / 3600
+        return len(done) / elapsed_h if elapsed_h > 0 else 0.0
+
+    def append_summary(self, unit):
+        """
+        Append a finished unit to the batch summary CSV.
+        """
+        if self.summary_filename is None:
+            return
+        new_file = not os.path.exists(self.summary_filename)
+        if not os.path.exists(self.summary_folder):
+            os.makedirs(self.summary_folder)
+        with open(self.summary_filename, "a", newline="") as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(
+                    ["Serial Number", "Result", "Stop Reason", "Duration [s]", "Log File"]
+                    + [f"Sensor {i + 1}" for i in range(8)]
+                )
+            writer.writerow(
+                [unit.serial_number, unit.result, unit.stop_reason, unit.duration_s, unit.log_filename]
+                + [verdict or "" for verdict in unit.verdicts]
+            )
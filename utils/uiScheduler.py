@@ -0,0 +1,127 @@
+import time
+import logging
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+def same_value(a, b):
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False  # e.g. arrays, treat as changed
+
+
+class UiScheduler:
+    """
+    Coalesces widget and artist updates and applies them at most once per frame.
+
+    Code that updates the UI records the state it wants with set(); properties that already
+    have that value are skipped, and the remaining changes of all tabs are applied together by
+    one after() callback. Redraws are requested by key with request(), so a canvas asked to
+    redraw several times in a frame is drawn once, after the state changes are applied.
+
+    Every change of a widget's scheduled properties must go through the scheduler, otherwise
+    its record of the applied state goes stale.
+    """
+    def __init__(self, frame_ms=16):
+        self.frame_ms = frame_ms
+        self.root = None  # Without a root, changes are applied immediately
+        self.applied = {}  # target -> {property: value} as last applied
+        self.pending = {}  # target -> {property: value} still to be applied
+        self.callbacks = {}  # key -> callback to run after the changes
+        self.scheduled = False
+        self.last_flush = 0.0
+
+    def attach(self, root):
+        self.root = root
+
+    def diff(self, target, state):
+        """
+        Return the properties in state that differ from the target's desired state.
+        """
+        applied = self.applied.get(target, {})
+        pending = self.pending.get(target)
+        changes = {}
+        for name, value in state.items():
+            current = pending[name] if pending and name in pending else applied.get(name, self)
+            if not same_value(current, value):
+                changes[name] = value
+        registry.counter("ui.changes_skipped").inc(len(state) - len(changes))
+        return changes
+
+    def set(self, target, **state):
+        """
+        Record the desired state of a Tk widget (configure options) or a matplotlib artist
+        (set() properties).
+        """
+        changes = self.diff(target, state)
+        if changes:
+            self.pending.setdefault(target, {}).update(changes)
+            self.schedule()
+
+    def apply(self, target, **state):
+        """
+        Apply the changed properties right away, e.g. to an artist that is being blitted now.
+        """
+        changes = self.diff(target, state)
+        changes = {**self.pending.pop(target, {}), **changes}
+        if changes:
+            self.apply_changes(target, changes)
+
+    def request(self, key, callback):
+        """
+        Run callback once at the next flush; a later request with the same key replaces it.
+        """
+        self.callbacks[key] = callback
+        self.schedule()
+
+    def forget(self, target):
+        """
+        Drop the recorded state of a target that was changed or recreated outside the scheduler.
+        """
+        self.applied.pop(target, None)
+        self.pending.pop(target, None)
+
+    def schedule(self):
+        if self.root is None:
+            self.flush()
+            return
+        if not self.scheduled:
+            self.scheduled = True
+            # Right away unless the previous flush was less than a frame ago
+            delay_ms = max(0, int(self.frame_ms - (time.monotonic() - self.last_flush) * 1000))
+            self.root.after(delay_ms, self.flush)
+
+    def apply_changes(self, target, changes):
+        if hasattr(target, "configure"):
+            target.configure(**changes)  # Tk and customtkinter widgets
+        else:
+            target.set(**changes)  # matplotlib artists
+        self.applied.setdefault(target, {}).update(changes)
+        registry.counter("ui.changes_applied").inc(len(changes))
+
+    def flush(self):
+        """
+        Apply all pending changes, then run the requested callbacks.
+        """
+        self.scheduled = False
+        self.last_flush = time.monotonic()
+        pending, self.pending = self.pending, {}
+        callbacks, self.callbacks = self.callbacks, {}
+
+        with registry.histogram("ui.flush_seconds").time():
+            for target, changes in pending.items():
+                try:
+                    self.apply_changes(target, changes)
+                except Exception as e:
+                    logger.error("Error updating %s: %s", target, e)
+            for callback in callbacks.values():
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error("Error in UI update %s: %s", callback, e)
+        registry.counter("ui.flushes").inc()
+
+
+ui = UiScheduler()
@@ -0,0 +1,103 @@
+import numpy as np
+
+# Vout is read from the first point at or below this pressure [mbar]
+VOUT_CAPTURE_PRESSURE = 2.5E-5
+
+# Acceptable Vout range of a pressure sensor assembly [V]
+ASSEMBLY_VOUT_RANGE = (2.97, 3.03)
+
+# Gauge tube Vout [mV] -> (R9 [ohm], R10)
+RESISTOR_TABLE = [
+    (9.00, 150, "18k"), (9.05, 150, "36k"), (9.10, 150, "100M"),
+    (9.15, 154, "8.2k"), (9.20, 154, "12k"), (9.25, 154, "18k"),
+    (9.30, 154, "100k"), (9.35, 158, "6.8k"), (9.40, 158, "8.2k"),
+    (9.45, 158, "12k"), (9.50, 158, "22k"), (9.55, 158, "100k"),
+    (9.60, 162, "8.2k"), (9.65, 162, "10k"), (9.70, 162, "15k"),
+    (9.75, 162, "30k"), (9.80, 162, "100k"), (9.85, 165, "12k"),
+    (9.90, 165, "22k"), (9.95, 165, "47k"), (10.00, 169, "6.8k"),
+    (10.05, 169, "10k"), (10.10, 169, "15k"), (10.15, 169, "22k"),
+    (10.20, 169, "100k"), (10.25, 174, "6.8k"), (10.30, 174, "8.2k"),
+    (10.35, 174, "10k"), (10.40, 174, "15k"), (10.45, 174, "22k"),
+    (10.50, 174, "100k"), (10.55, 178, "8.2k"), (10.60, 178, "10k"),
+    (10.65, 178, "15k"), (10.70, 178, "30k"), (10.75, 178, "100k"),
+    (10.80, 182, "10k"), (10.85, 182, "12k"), (10.90, 182, "18k"),
+    (10.95, 182, "30k"), (11.00, 182, "100k")
+]
+
+
+def get_resistor_values(voltage):
+    """
+    Get the resistor values (R9 and R10) based on the sensor voltage.
+
+    Parameters:
+        voltage (float): The captured sensor voltage in mV.
+
+    Returns:
+        tuple: (R9, R10) resistor values or None if out of range.
+    """
+    # Check if the voltage is out of range
+    if voltage < 9.0 or voltage > 11.0:
+        return None
+
+    # Find the closest voltage in the table
+    closest_entry = min(RESISTOR_TABLE, key=lambda x: abs(x[0] - voltage))
+    return closest_entry[1], closest_entry[2]
+
+
+def capture_vout(pressure, voltages):
+    """
+    Return the sensor voltage [mV] at the first point with 0 < pressure <= VOUT_CAPTURE_PRESSURE,
+    or None if the run never got that low.
+    """
+    pressure = np.asarray(pressure)
+    low_pressure = np.nonzero((pressure > 0) & (pressure <= VOUT_CAPTURE_PRESSURE))[0]
+    if not len(low_pressure):
+        return None
+    return float(np.asarray(voltages)[low_pressure[0]])
+
+
+def assembly_vout_passes(vout_volts):
+    """
+    Check a pressure sensor assembly's Vout (in V) against ASSEMBLY_VOUT_RANGE.
+    """
+    low, high = ASSEMBLY_VOUT_RANGE
+    return low <= round(vout_volts, 2) <= high
+
+
+def describe_vout(vout, mode):
+    """
+    Interpret a captured Vout for the selected mode.
+
+    Parameters:
+        vout (float): Sensor voltage [mV] captured at VOUT_CAPTURE_PRESSURE.
+        mode (str): "Gauge Tube" or "Pressure Sensor Assembly".
+
+    Returns:
+        dict: "passed" (bool), "text" and "color" for the plot annotation and a one-line "summary".
+    """
+    if mode == "Pressure Sensor Assembly":
+        vout_volts = (vout / 1000) * 300
+        passed = assembly_vout_passes(vout_volts)
+        status_text = "Pass" if passed else "Fail"
+        return {
+            "passed": passed,
+            "text": f"Vout = {vout_volts:.4f} V\n{status_text}",
+            "color": "green" if passed else "red",
+            "summary": f"Vout = {vout_volts:.2f} V ({status_text})"
+        }
+
+    resistor_values = get_resistor_values(vout)
+    if resistor_values is None:
+        return {
+            "passed": False,
+            "text": f"Vout = {vout:.2f} mV\nOut of Range!",
+            "color": "red",
+            "summary": f"Vout = {vout:.2f} mV is out of range!"
+        }
+    r9, r10 = resistor_values
+    return {
+        "passed": True,
+        "text": f"Vout = {vout:.2f} mV\nR9 = {r9} Ω\nR10 = {r10}",
+        "color": "blue",
+        "summary": f"Vout = {vout:.2f} mV, R9 = {r9} ohm, R10 = {r10}"
+    }
@@ -0,0 +1,305 @@
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from utils.limitProfile import LimitProfile, logistic_with_offset, load_lut, fit_limit_params, DEFAULT_PERCENTAGE_ADJUSTMENTS
+from utils.logReader import LogReader
+from utils.runWriter import find_runs, run_metadata_filename
+
+logger = logging.getLogger(__name__)
+
+# Per-sensor verdict codes
+NO_DATA = 0
+PASS = 1
+FAIL = 2
+VERDICT_NAMES = {NO_DATA: "No data", PASS: "Pass", FAIL: "Fail"}
+
+# Pressure bins for the failure rates: one per decade [mbar]
+DEFAULT_BIN_EDGES = 10.0 ** np.arange(-6, 4)
+
+MAX_MASK_ELEMENTS = 32 * 1024 * 1024  # Evaluate candidates in chunks above this many points x sensors x candidates
+
+worker_log_reader = None  # One reader per worker process, so sidecars are reused across jobs
+
+
+class YieldCandidate:
+    """
+    A candidate set of limits: a LUT and the tolerance band around its average.
+    """
+    def __init__(self, name, lut_pressure, lut_average, tolerances=DEFAULT_PERCENTAGE_ADJUSTMENTS):
+        self.name = name
+        self.tolerances = np.asarray(tolerances, dtype=float)
+        self.profile = LimitProfile(*fit_limit_params(lut_pressure, lut_average, self.tolerances))
+
+        # How far the fitted limit curves miss the requested band at the LUT pressures [mV]
+        lut_average = np.asarray(lut_average, dtype=float)
+        self.fit_error = float(max(
+            np.abs(self.profile.lower_limit(lut_pressure) - lut_average * (1 - self.tolerances)).max(),
+            np.abs(self.profile.upper_limit(lut_pressure) - lut_average * (1 + self.tolerances)).max()
+        ))
+
+    @classmethod
+    def from_spec(cls, spec, lut_pressure, lut_average):
+        """
+        Build a candidate from a dict such as {"name": "wider", "tolerances": [...], "lut": "PLookUp.csv"}.
+        Missing tolerances or LUT default to the current ones.
+        """
+        if spec.get("lut"):
+            lut_pressure, lut_average, _ = load_lut(spec["lut"])
+        tolerances = spec.get("tolerances", DEFAULT_PERCENTAGE_ADJUSTMENTS)
+        if "scale" in spec:
+            tolerances = np.asarray(tolerances, dtype=float) * spec["scale"]
+        return cls(spec["name"], lut_pressure, lut_average, tolerances)
+
+
+def classify_run(pressure, voltages, lower_params, upper_params, bin_edges):
+    """
+    Classify one run against every candidate at once.
+
+    Parameters:
+        pressure (array): Gauge pressures [mbar], shape (n,).
+        voltages (array): Sensor voltages [mV], shape (n, 8).
+        lower_params, upper_params (array): Limit curve parameters, shape (candidates, 4).
+        bin_edges (array): Pressure bin edges [mbar].
+
+    Returns:
+        tuple: (sensor verdicts (candidates, 8), failed channels per bin (candidates, bins),
+                channels with data per bin (bins,))
+    """
+    candidates, bins = len(lower_params), len(bin_edges) - 1
+    verdicts = np.full((candidates, 8), NO_DATA, dtype=np.int8)
+    bin_failed = np.zeros((candidates, bins), dtype=np.int64)
+    valid = ~np.isnan(voltages)
+    if not len(pressure):
+        return verdicts, bin_failed, np.zeros(bins, dtype=np.int64)
+
+    # Group the points by pressure bin so that each bin is one contiguous slice
+    bin_index = np.digitize(pressure, bin_edges) - 1
+    in_range = (bin_index >= 0) & (bin_index < bins)
+    order = np.argsort(np.where(in_range, bin_index, bins), kind="stable")
+    pressure, voltages, valid, bin_index = pressure[order], voltages[order], valid[order], bin_index[order]
+    binned = int(in_range.sum())
+    present = np.unique(bin_index[:binned])
+    starts = np.searchsorted(bin_index[:binned], present)
+    bin_channels = np.zeros(bins, dtype=np.int64)
+    if binned:
+        bin_channels[present] = np.logical_or.reduceat(valid[:binned], starts, axis=0).sum(axis=1)
+
+    has_data = valid.any(axis=0)
+    p_log = np.log10(pressure)
+    chunk = max(1, MAX_MASK_ELEMENTS // (len(pressure) * 8))
+    for first in range(0, candidates, chunk):
+        lower, upper = lower_params[first:first + chunk], upper_params[first:first + chunk]
+        lower_limit = logistic_with_offset(p_log[None, :], *lower.T[:, :, None])  # (chunk, n)
+        upper_limit = logistic_with_offset(p_log[None, :], *upper.T[:, :, None])
+        failed = valid & ~((lower_limit[:, :, None] <= voltages) & (voltages <= upper_limit[:, :, None]))  # (chunk, n, 8)
+
+        verdicts[first:first + chunk] = np.where(has_data, np.where(failed.any(axis=1), FAIL, PASS), NO_DATA)
+        if binned:
+            failed_in_bin = np.logical_or.reduceat(failed[:, :binned], starts, axis=1)  # (chunk, bins present, 8)
+            bin_failed[first:first + chunk, present] = failed_in_bin.sum(axis=2)
+    return verdicts, bin_failed, bin_channels
+
+
+def evaluate_runs(job):
+    """
+    Classify a chunk of runs against all candidates. Runs in a worker process.
+
+    Returns:
+        list: (run path, sensor verdicts, failed channels per bin, channels per bin) per readable run.
+    """
+    global worker_log_reader
+    if worker_log_reader is None:
+        worker_log_reader = LogReader(max_runs=1)
+
+    results = []
+    for path in job["paths"]:
+        try:
+            run = worker_log_reader.read_run(path)
+        except Exception as e:
+            logger.warning("Skipping %s: %s", path, e)
+            continue
+        results.append((path,) + classify_run(run.pressure, run.voltages, job["lower_params"], job["upper_params"], job["bin_edges"]))
+    return results
+
+
+class YieldAnalysis:
+    """
+    What-if yield analysis of candidate tolerances or LUTs over historical runs.
+
+    Every run is read once (from its columnar sidecar when available) and classified against
+    all candidates in one vectorised pass, with the runs spread over a pool of worker
+    processes. The first candidate is the baseline the verdict changes are reported against.
+    """
+    def __init__(self, candidates, bin_edges=DEFAULT_BIN_EDGES, max_workers=None, runs_per_job=16):
+        if not candidates:
+            raise ValueError("At least one candidate is required.")
+        self.candidates = candidates
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        self.max_workers = max_workers or os.cpu_count()
+        self.runs_per_job = runs_per_job
+
+        self.runs = []  # Run paths in the order of the arrays below
+        self.sensor_verdicts = np.empty((0, len(candidates), 8), dtype=np.int8)
+        self.bin_failed = np.zeros((len(candidates), len(self.bin_edges) - 1), dtype=np.int64)
+        self.bin_channels = np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+
+    def run(self, run_paths):
+        """
+        Classify all runs against all candidates.
+        """
+        started = time.monotonic()
+        lower_params = np.array([candidate.profile.lower_params for candidate in self.candidates])
+        upper_params = np.array([candidate.profile.upper_params for candidate in self.candidates])
+        jobs = [{
+            "paths": run_paths[first:first + self.runs_per_job],
+            "lower_params": lower_params,
+            "upper_params": upper_params,
+            "bin_edges": self.bin_edges
+        } for first in range(0, len(run_paths), self.runs_per_job)]
+
+        runs, verdicts = [], []
+        # Spawn so that workers start clean, as for the report generator
+        with ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for done, results in enumerate(pool.map(evaluate_runs, jobs), start=1):
+                for path, sensor_verdicts, bin_failed, bin_channels in results:
+                    runs.append(path)
+                    verdicts.append(sensor_verdicts)
+                    self.bin_failed += bin_failed
+                    self.bin_channels += bin_channels
+                logger.info("Evaluated %d/%d run chunks", done, len(jobs))
+
+        self.runs = runs
+        if verdicts:
+            self.sensor_verdicts = np.stack(verdicts)
+        logger.info(
+            "Evaluated %d runs against %d candidates in %.1f s",
+            len(runs), len(self.candidates), time.monotonic() - started
+        )
+        return self
+
+    def unit_verdicts(self):
+        """
+        A unit passes only if every sensor has data and stays within the limits.
+
+        Returns:
+            array: Unit verdict per run and candidate, shape (runs, candidates).
+        """
+        return np.where((self.sensor_verdicts == PASS).all(axis=2), PASS, FAIL)
+
+    def yield_rows(self):
+        units = self.unit_verdicts()
+        changed = (units != units[:, :1]).sum(axis=0)
+        rows = []
+        for c, candidate in enumerate(self.candidates):
+            passed = int((units[:, c] == PASS).sum())
+            row = {
+                "Candidate": candidate.name,
+                "Units": len(self.runs),
+                "Passed": passed,
+                "Yield [%]": round(100 * passed / len(self.runs), 2) if self.runs else "",
+                "Changed verdicts": int(changed[c]),
+                "Limit fit error [mV]": round(candidate.fit_error, 3)
+            }
+            for i in range(8):
+                tested = (self.sensor_verdicts[:, c, i] != NO_DATA).sum()
+                sensor_passed = (self.sensor_verdicts[:, c, i] == PASS).sum()
+                row[f"Sensor {i + 1} yield [%]"] = round(100 * sensor_passed / tested, 2) if tested else ""
+            rows.append(row)
+        return rows
+
+    def bin_rows(self):
+        rows = []
+        for c, candidate in enumerate(self.candidates):
+            for b in range(len(self.bin_edges) - 1):
+                channels = int(self.bin_channels[b])
+                rows.append({
+                    "Candidate": candidate.name,
+                    "Pressure from [mbar]": f"{self.bin_edges[b]:.0e}",
+                    "Pressure to [mbar]": f"{self.bin_edges[b + 1]:.0e}",
+                    "Channels": channels,
+                    "Failed": int(self.bin_failed[c, b]),
+                    "Failure rate [%]": round(100 * self.bin_failed[c, b] / channels, 2) if channels else ""
+                })
+        return rows
+
+    def change_rows(self):
+        """
+        Runs whose unit verdict differs from the baseline's, per candidate.
+        """
+        units = self.unit_verdicts()
+        rows = []
+        for c, candidate in enumerate(self.candidates[1:], start=1):
+            for r in np.nonzero(units[:, c] != units[:, 0])[0]:
+                changed = np.nonzero(self.sensor_verdicts[r, c] != self.sensor_verdicts[r, 0])[0]
+                rows.append({
+                    "Candidate": candidate.name,
+                    "Run": os.path.basename(self.runs[r]),
+                    "Serial Number": self.serial_number(self.runs[r]),
+                    "Baseline": VERDICT_NAMES[units[r, 0]],
+                    "Verdict": VERDICT_NAMES[units[r, c]],
+                    "Changed sensors": " ".join(str(i + 1) for i in changed)
+                })
+        return rows
+
+    @staticmethod
+    def serial_number(path):
+        try:
+            with open(run_metadata_filename(path)) as file:
+                return json.load(file).get("serial_number", "")
+        except (OSError, ValueError):
+            return ""
+
+    def write_reports(self, output_dir):
+        """
+        Write yield.csv, bin_failure_rates.csv and verdict_changes.csv to output_dir.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        for name, rows in (("yield.csv", self.yield_rows()), ("bin_failure_rates.csv", self.bin_rows()),
+                           ("verdict_changes.csv", self.change_rows())):
+            with open(os.path.join(output_dir, name), "w", newline="") as file:
+                if rows:
+                    writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+                    writer.writeheader()
+                    writer.writerows(rows)
+        logger.info("Yield analysis written to %s", output_dir)
+        return output_dir
+
+
+def main(argv=None):
+    """
+    e.g. python -m utils.yieldAnalysis --candidates candidates.json --scale 0.9 1.1
+    """
+    parser = argparse.ArgumentParser(description="What-if yield of candidate tolerances or LUTs over historical runs.")
+    parser.add_argument("--candidates", help="JSON list of {\"name\", \"tolerances\", \"lut\", \"scale\"} candidates")
+    parser.add_argument("--scale", type=float, nargs="*", default=[], help="Also try the current tolerances scaled by these factors")
+    parser.add_argument("--lut", default="PLookUp.csv", help="LUT of the current (baseline) limits")
+    parser.add_argument("--logs", default="Logs", help="Folder with the run logs")
+    parser.add_argument("--output", default=None, help="Output folder (default Reports/yield_<timestamp>)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    lut_pressure, lut_average, _ = load_lut(args.lut)
+    candidates = [YieldCandidate("current", lut_pressure, lut_average)]
+    candidates += [YieldCandidate(f"scale {scale:g}", lut_pressure, lut_average, DEFAULT_PERCENTAGE_ADJUSTMENTS * scale)
+                   for scale in args.scale]
+    if args.candidates:
+        with open(args.candidates) as file:
+            candidates += [YieldCandidate.from_spec(spec, lut_pressure, lut_average) for spec in json.load(file)]
+
+    analysis = YieldAnalysis(candidates, max_workers=args.workers).run(find_runs(args.logs))
+    output_dir = args.output or os.path.join("Reports", datetime.now().strftime("yield_%Y%m%d_%H%M%S"))
+    analysis.write_reports(output_dir)
+    for row in analysis.yield_rows():
+        print(f"{row['Candidate']:<24}{row['Yield [%]']:>8} %  ({row['Passed']}/{row['Units']}, {row['Changed verdicts']} changed)")
+
+
+if __name__ == "__main__":
+    main()